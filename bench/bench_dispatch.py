@@ -0,0 +1,112 @@
+"""
+Microbenchmark for command dispatch latency.
+
+Builds synthetic command trees (wide: many siblings, deep: long command paths)
+and times CmdDispatcher.dispatch against the previous per-word filesystem
+probing approach.
+
+Usage:
+    python -m bench.bench_dispatch [--wide 500] [--deep 12] [--repeat 2000]
+"""
+import argparse
+import importlib
+import os
+import shlex
+import sys
+import tempfile
+import time
+from unittest.mock import MagicMock
+
+from command_dispatcher import CmdDispatcher
+from src.command_registry import CommandRegistry
+
+COMMAND_SOURCE = """
+class Command:
+    def __init__(self, cmds, terminal):
+        self.cmds = cmds
+
+    def execute(self):
+        return None
+"""
+
+
+def make_command(root: str, path) -> None:
+    directory = os.path.join(root, *path)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'command.py'), 'w') as f:
+        f.write(COMMAND_SOURCE)
+
+
+def build_tree(root: str, wide: int, deep: int):
+    """
+    Create `wide` commands under one group and a chain of `deep` nested groups
+    with a command at every level. Returns the command lines to dispatch.
+    """
+    for i in range(wide):
+        make_command(root, ('wide', f'cmd{i}'))
+    chain = []
+    for i in range(deep):
+        chain.append(f'level{i}')
+        make_command(root, ['deep'] + chain)
+        for j in range(wide // deep):
+            make_command(root, ['deep'] + chain + [f'leaf{j}'])
+    wide_cmds = [f'wide cmd{i}' for i in range(0, wide, max(1, wide // 50))]
+    deep_cmds = ['deep ' + ' '.join(chain)]
+    return wide_cmds, deep_cmds
+
+
+def legacy_dispatch(cmd: str, cmds_dir: str, package: str) -> None:
+    """
+    The previous algorithm: re-split the line, probe the filesystem and import
+    the module for every word of every command.
+    """
+    cmds = shlex.split(cmd)
+    top_level = [entry.name for entry in os.scandir(cmds_dir) if entry.is_dir()]
+    for depth in range(1, len(cmds) + 1):
+        cmds = shlex.split(' '.join(cmds))
+        if cmds[depth - 1] in top_level and len(cmds) > depth:
+            continue
+        module_path = [cmds_dir] + cmds[:depth]
+        if os.path.exists(os.path.join(*module_path, 'command.py')):
+            module = importlib.import_module('.'.join([package] + cmds[:depth]) + '.command')
+            module.Command(cmds, None).execute()
+            return
+
+
+def timeit(func, cmds, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for cmd in cmds:
+            func(cmd)
+    return (time.perf_counter() - start) / (repeat * len(cmds)) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--wide', type=int, default=500)
+    parser.add_argument('--deep', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        package = 'benchcmds'
+        root = os.path.join(tmp, package)
+        wide_cmds, deep_cmds = build_tree(root, args.wide, args.deep)
+        sys.path.insert(0, tmp)
+
+        start = time.perf_counter()
+        registry = CommandRegistry(root)
+        build_ms = (time.perf_counter() - start) * 1e3
+        count = sum(1 for node in registry.iter_nodes() if node.is_executable)
+        dispatcher = CmdDispatcher(root, registry)
+        terminal = MagicMock()
+
+        print(f"commands: {count}, registry build: {build_ms:.2f} ms")
+        for label, cmds in (('wide', wide_cmds), ('deep', deep_cmds)):
+            trie_us = timeit(lambda c: dispatcher.dispatch(c, terminal), cmds, args.repeat)
+            legacy_us = timeit(lambda c: legacy_dispatch(c, root, package), cmds, max(1, args.repeat // 10))
+            print(f"{label:5s} trie dispatch: {trie_us:8.2f} us/cmd   legacy: {legacy_us:8.2f} us/cmd")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark for building the charging stations model from a raw Redis payload.
+
+Times bytes -> decoded JSON -> ChargingStationsStatus on synthetic payloads,
+once as before (decode to str, then the stdlib parser) and once per available
+backend of src.json_backend parsing the bytes directly.
+
+Usage:
+    python -m bench.bench_json_decode [--chargers 1000 10000] [--connectors 2] [--repeat 20]
+"""
+import argparse
+import json
+import time
+from typing import Callable
+
+from src import json_backend
+from src.charging_stations_status import ChargingStationsStatus
+
+
+def make_payload(chargers: int, connectors: int) -> bytes:
+    ocpp_error = {'error_code': 'NoError', 'info': '', 'timestamp': '2024-05-01T12:00:00.000+00:00',
+                  'vendor_error_code': '', 'vendor_id': ''}
+    return json.dumps({'chargers': [{
+        'connectors': [{'id': c + 1, 'ocpp_error': dict(ocpp_error), 'ocpp_error_code': 'NoError',
+                        'priority': False, 'status': 'Available'} for c in range(connectors)],
+        'firmware_version': '1.2.3',
+        'id': f"CHG{i:05d}",
+        'ip_address': f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+        'ocpp_error': dict(ocpp_error),
+        'ocpp_error_code': 'NoError',
+        'status': 'Available',
+    } for i in range(chargers)]}).encode()
+
+
+def legacy_decode(payload: bytes) -> ChargingStationsStatus:
+    """
+    The previous behaviour: the value is decoded to str before parsing.
+    """
+    return ChargingStationsStatus.from_json(json.loads(payload.decode('utf-8')))
+
+
+def backend_decode(payload: bytes) -> ChargingStationsStatus:
+    return ChargingStationsStatus.from_json(json_backend.loads(payload))
+
+
+def timeit(func: Callable[[bytes], ChargingStationsStatus], payload: bytes, repeat: int) -> float:
+    func(payload)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(payload)
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--chargers', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--connectors', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    for chargers in args.chargers:
+        payload = make_payload(chargers, args.connectors)
+        legacy_ms = timeit(legacy_decode, payload, args.repeat)
+        line = f"{chargers:6d} chargers ({len(payload) / 1e6:.1f} MB)  str+json: {legacy_ms:8.2f} ms"
+        for name in json_backend.BACKENDS:
+            previous = json_backend.set_backend(name)
+            try:
+                backend_ms = timeit(backend_decode, payload, args.repeat)
+            finally:
+                json_backend.set_backend(previous.name)
+            line += f"   {name}: {backend_ms:8.2f} ms ({legacy_ms / backend_ms:.1f}x)"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
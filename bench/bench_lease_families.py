@@ -0,0 +1,128 @@
+"""
+Benchmark for parsing dnsmasq leases files with DHCPv4 and DHCPv6 leases.
+
+Parses an IPv4-only file with the previous IPv4-only LeaseTable parser and with
+the current one, then parses files with a growing share of DHCPv6 leases and
+times lookups of IPv4 and IPv6 addresses.
+
+Usage:
+    python -m bench.bench_lease_families [--leases 100000] [--repeat 5]
+"""
+import argparse
+import sys
+import time
+from array import array
+from itertools import compress
+from typing import Dict
+
+from src.lease_table import (NO_IPV4, NO_MAC, LeaseTable, _first_rows, _is_none, int_to_ipv6, ip_key, ipv4_to_int,
+                             mac_to_int)
+
+
+class LegacyTable(LeaseTable):
+    """
+    The previous behaviour: IPv4 leases only, other addresses kept as text.
+    """
+
+    def __init__(self, expires, ip, mac, hostnames, client_ids, ip_text, mac_text):
+        self.expires, self.ip, self.mac = expires, ip, mac
+        self.hostnames, self.client_ids = hostnames, client_ids
+        self.ip_text, self.mac_text = ip_text, mac_text
+        self.by_ip = self._index(ip, ip_text)
+        self.by_mac = self._index(mac, mac_text)
+
+    @staticmethod
+    def _index(column, text):
+        keys = column.tolist()
+        for row, value in text.items():
+            keys[row] = value
+        return _first_rows(keys)
+
+    @classmethod
+    def from_columns(cls, expires, macs, ips, hostnames, client_ids):
+        expires_column = array('q', map(int, expires))
+        ip_values = list(map(ipv4_to_int, ips))
+        mac_values = list(map(mac_to_int, macs))
+        ip_text = {row: ips[row].decode('utf-8', 'replace')
+                   for row in compress(range(len(ip_values)), map(_is_none, ip_values))}
+        mac_text = {row: macs[row].decode('utf-8', 'replace')
+                    for row in compress(range(len(mac_values)), map(_is_none, mac_values))}
+        for row in ip_text:
+            ip_values[row] = NO_IPV4
+        for row in mac_text:
+            mac_values[row] = NO_MAC
+
+        names: Dict[bytes, str] = {}
+
+        def intern(value: bytes) -> str:
+            name = names.get(value)
+            if name is None:
+                name = names[value] = sys.intern(value.decode('utf-8', 'replace'))
+            return name
+
+        return cls(expires_column, array('I', ip_values), array('q', mac_values),
+                   list(map(intern, hostnames)), list(map(intern, client_ids)), ip_text, mac_text)
+
+    @classmethod
+    def parse(cls, data: bytes) -> 'LegacyTable':
+        tokens = data.split()
+        return cls.from_columns(tokens[0::5], tokens[1::5], tokens[2::5], tokens[3::5], tokens[4::5])
+
+
+def ip4(i: int) -> str:
+    return f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+
+
+def ip6(i: int) -> str:
+    return int_to_ipv6(0xfd00 << 112 | i)
+
+
+def make_leases(leases: int, v6_share: float) -> bytes:
+    v6 = int(leases * v6_share)
+    lines = [f"{1716897600 + i} 02:00:{i >> 16 & 255:02x}:{i >> 8 & 255:02x}:{i & 255:02x}:00 {ip4(i)} "
+             f"charger-{i % 500} *\n" for i in range(leases - v6)]
+    if v6:
+        lines.append("duid 00:01:00:01:2d:7f:4c:10:02:42:ac:16:00:02\n")
+        lines.extend(f"{1716897600 + i} {i} {ip6(i)} charger-{i % 500} 00:04:{i >> 8 & 255:02x}:{i & 255:02x}\n"
+                     for i in range(v6))
+    return ''.join(lines).encode()
+
+
+def timeit(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--leases', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    data = make_leases(args.leases, 0.0)
+    legacy, table = LegacyTable.parse(data), LeaseTable.parse(data)
+    assert legacy.by_ip == table.by_ip and legacy.by_mac == table.by_mac
+    legacy_ms = timeit(lambda: LegacyTable.parse(data), args.repeat)
+    table_ms = timeit(lambda: LeaseTable.parse(data), args.repeat)
+    print(f"{args.leases} IPv4 leases  IPv4-only parser: {legacy_ms:7.1f} ms   current: {table_ms:7.1f} ms"
+          f"   ({table_ms / legacy_ms - 1:+.1%})")
+
+    for share in (0.1, 0.5, 0.9):
+        data = make_leases(args.leases, share)
+        table = LeaseTable.parse(data)
+        v6 = int(args.leases * share)
+        keys4 = [ip_key(ip4(i)) for i in range(0, args.leases - v6, 7)]
+        keys6 = [ip_key(ip6(i)) for i in range(0, v6, 7)]
+        assert all(key in table.by_ip for key in keys4 + keys6)
+        parse_ms = timeit(lambda: LeaseTable.parse(data), args.repeat)
+        by_ip = table.by_ip
+        lookup4 = timeit(lambda: [by_ip[key] for key in keys4], args.repeat) / max(1, len(keys4)) * 1e6
+        lookup6 = timeit(lambda: [by_ip[key] for key in keys6], args.repeat) / max(1, len(keys6)) * 1e6
+        print(f"{args.leases} leases, {share:4.0%} DHCPv6  parse: {parse_ms:7.1f} ms"
+              f"   lookup IPv4: {lookup4:5.0f} ns   IPv6: {lookup6:5.0f} ns")
+
+
+if __name__ == '__main__':
+    main()
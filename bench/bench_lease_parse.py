@@ -0,0 +1,93 @@
+"""
+Benchmark for parsing a large dnsmasq leases file.
+
+Reads a synthetic leases file, once with the previous parser that built a Lease
+object and index entries per line, and once with the packed LeaseTable
+columns. Reports the parse time and the memory held by the parsed leases.
+
+Usage:
+    python -m bench.bench_lease_parse [--leases 100000] [--repeat 3]
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List
+
+from src.dnsmasq_leases import Lease, LeaseSnapshot
+
+
+class LegacySnapshot:
+    """
+    The previous behaviour: one Lease of strings per line, indexed by address text.
+    """
+
+    def __init__(self, filepath: str):
+        self.leases: List[Lease] = []
+        self.lines: Dict[str, Lease] = {}
+        with open(filepath, 'r') as file:
+            text = file.read()
+        for line in text.splitlines():
+            fields = line.split()
+            if len(fields) < 5:
+                continue
+            lease = Lease(*fields[:5])
+            self.lines[line] = lease
+            self.leases.append(lease)
+        self.by_ip: Dict[str, Lease] = {}
+        self.by_mac: Dict[str, Lease] = {}
+        for lease in self.leases:
+            self.by_ip.setdefault(lease.ip_address, lease)
+            self.by_mac.setdefault(lease.mac_address, lease)
+
+
+def ip(i: int) -> str:
+    return f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+
+
+def make_leases(leases: int, directory: str) -> str:
+    filename = os.path.join(directory, 'dnsmasq.leases')
+    with open(filename, 'w') as f:
+        for i in range(leases):
+            f.write(f"{1716897600 + i} 02:00:{i >> 16 & 255:02x}:{i >> 8 & 255:02x}:{i & 255:02x}:00 {ip(i)} "
+                    f"charger-{i % 500} *\n")
+    return filename
+
+
+def measure(parse, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse()
+    elapsed_ms = (time.perf_counter() - start) / repeat * 1e3
+    gc.collect()
+    tracemalloc.start()
+    result = parse()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed_ms, size / 2 ** 20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--leases', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = make_leases(args.leases, directory)
+        legacy, table = LegacySnapshot(filename), LeaseSnapshot.read(filename)
+        sample = ip(args.leases // 2)
+        assert table.lease_for_ip(sample).mac_address == legacy.by_ip[sample].mac_address
+
+        legacy_ms, legacy_mb = measure(lambda: LegacySnapshot(filename), args.repeat)
+        table_ms, table_mb = measure(lambda: LeaseSnapshot.read(filename), args.repeat)
+    print(f"{args.leases} leases  per-line objects: {legacy_ms:8.1f} ms {legacy_mb:7.1f} MiB"
+          f"   columns: {table_ms:7.1f} ms {table_mb:6.1f} MiB"
+          f"   ({legacy_ms / table_ms:.1f}x faster, {legacy_mb / table_mb:.1f}x smaller)")
+
+
+if __name__ == '__main__':
+    main()
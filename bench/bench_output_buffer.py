@@ -0,0 +1,71 @@
+"""
+Soak benchmark for the output pane.
+
+Appends a site-status sized block of text many times and reports the mean
+append+render cost and the process RSS per window of appends, for the ring
+buffer and for the previous whole-document string concatenation.
+
+Usage:
+    python -m bench.bench_output_buffer [--appends 100000] [--scrollback 10000]
+"""
+import argparse
+import resource
+import time
+
+from prompt_toolkit.document import Document
+
+from src.output_buffer import OutputBuffer, create_output_window
+
+BLOCK = '\n'.join(f"| {i:6d} | 1 | NoError | 240528_1200 | | Available | 172.22.0.{i % 250} |" for i in range(30))
+
+
+def rss_mb() -> float:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def soak_ring_buffer(appends: int, scrollback: int, window: int) -> None:
+    buffer = OutputBuffer(max_lines=scrollback)
+    control = create_output_window(buffer).content
+    print(f"ring buffer, scrollback {scrollback} lines")
+    start = time.perf_counter()
+    for i in range(1, appends + 1):
+        buffer.append(BLOCK)
+        content = control.create_content(120, 40)  # render the visible lines only
+        for row in range(content.cursor_position.y - 39, content.cursor_position.y + 1):
+            content.get_line(row)
+        if i % window == 0:
+            now = time.perf_counter()
+            print(f"  {i:7d} appends: {(now - start) / window * 1e6:8.2f} us/append  rss {rss_mb():7.1f} MB")
+            start = now
+
+
+def soak_document(appends: int, window: int) -> None:
+    print("previous Document concatenation")
+    text = ""
+    start = time.perf_counter()
+    for i in range(1, appends + 1):
+        text = text + '\n' + BLOCK
+        Document(text=text, cursor_position=len(text))
+        if i % window == 0:
+            now = time.perf_counter()
+            print(f"  {i:7d} appends: {(now - start) / window * 1e6:8.2f} us/append  rss {rss_mb():7.1f} MB")
+            start = now
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--appends', type=int, default=100000)
+    parser.add_argument('--scrollback', type=int, default=10000)
+    parser.add_argument('--legacy-appends', type=int, default=5000)
+    args = parser.parse_args()
+
+    soak_ring_buffer(args.appends, args.scrollback, max(1, args.appends // 10))
+    soak_document(args.legacy_appends, max(1, args.legacy_appends // 5))
+
+
+if __name__ == '__main__':
+    main()
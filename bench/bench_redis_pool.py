@@ -0,0 +1,63 @@
+"""
+Benchmark for per-command Redis latency against a running redis-server.
+
+Times the reads one site-status command makes, once with a fresh client and
+ping per command as before, and once through the shared pooled handler.
+
+Usage:
+    python -m bench.bench_redis_pool [--host localhost] [--port 6379] [--repeat 500]
+"""
+import argparse
+import time
+
+import redis
+
+from src.redis_handler import get_redis_handler
+from src.site_snapshot import KEY_CHARGING_STATIONS, KEY_SITE_STATUS
+
+KEYS = (KEY_SITE_STATUS, KEY_CHARGING_STATIONS)
+
+
+def legacy_command(host: str, port: int) -> None:
+    """
+    The previous behaviour: every command builds its own client and pings it.
+    """
+    client = redis.StrictRedis(host=host, port=port)
+    client.ping()
+    for key in KEYS:
+        client.get(key)
+    client.close()
+
+
+def pooled_command(host: str, port: int) -> None:
+    handler = get_redis_handler(host=host, port=port)
+    for key in KEYS:
+        handler.get_value(key)
+
+
+def timeit(func, host: str, port: int, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(host, port)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=6379)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    # Warm up both paths so the first connect is not counted
+    legacy_command(args.host, args.port)
+    pooled_command(args.host, args.port)
+
+    legacy_us = timeit(legacy_command, args.host, args.port, args.repeat)
+    pooled_us = timeit(pooled_command, args.host, args.port, args.repeat)
+    print(f"per command  fresh client: {legacy_us:8.1f} us   pooled: {pooled_us:8.1f} us"
+          f"   ({legacy_us / pooled_us:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark for joining chargers to their IP address and dnsmasq lease.
+
+Times SiteStatus.charger_rows on a synthetic site, once with the previous
+linear scans of chargers and leases per lookup, and once with the indexes of
+ChargingStationsStatus and DnsmasqLeases.
+
+Usage:
+    python -m bench.bench_site_view [--chargers 5000] [--leases 20000] [--repeat 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from src.charging_stations_status import ChargingStationsStatus
+from src.dnsmasq_leases import DnsmasqLeases
+from src.site_status import SiteStatus
+
+
+class LinearStatus:
+    """
+    The previous behaviour: every lookup scans all chargers.
+    """
+
+    def __init__(self, status: ChargingStationsStatus):
+        self.chargers = status.chargers
+
+    def get_ip_from_charger_id(self, charger_id: str) -> str:
+        for charger in self.chargers:
+            if charger.id == charger_id:
+                return charger.ip_address
+        return "IP not found"
+
+
+class LinearLeases:
+    """
+    The previous behaviour: every lookup scans all leases.
+    """
+
+    def __init__(self, leases: DnsmasqLeases):
+        self.entries = leases.entries
+
+    def get_mac_from_ip(self, ip_address: str) -> str:
+        for entry in self.entries:
+            if entry['ip_address'] == ip_address:
+                return entry['mac_address']
+        return None
+
+    def get_lease_time_from_ip(self, ip_address: str) -> str:
+        for entry in self.entries:
+            if entry['ip_address'] == ip_address:
+                return entry['lease_time']
+        return None
+
+
+def ip(i: int) -> str:
+    return f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+
+
+def make_site(chargers: int, leases: int, directory: str):
+    filename = os.path.join(directory, 'dnsmasq.leases')
+    with open(filename, 'w') as f:
+        for i in range(leases):
+            f.write(f"{1716897600 + i} 02:00:{i >> 16 & 255:02x}:{i >> 8 & 255:02x}:{i & 255:02x}:00 {ip(i)} "
+                    f"host{i} *\n")
+    dnsmasq_leases = DnsmasqLeases(filename)
+    dnsmasq_leases.read_leases()
+    # Chargers are spread over the lease file so the scans do not stop early
+    step = max(1, leases // chargers)
+    status = ChargingStationsStatus.from_json({'chargers': [
+        {'id': f"CHG{i:05d}", 'ip_address': ip(i * step)} for i in range(chargers)]})
+    site_status = SiteStatus([{'id': f"CHG{i:05d}"} for i in range(chargers)], '2024-05-28 12:00:00', [], [])
+    return site_status, status, dnsmasq_leases
+
+
+def timeit(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--chargers', type=int, default=5000)
+    parser.add_argument('--leases', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        site_status, status, dnsmasq_leases = make_site(args.chargers, args.leases, directory)
+    linear_status, linear_leases = LinearStatus(status), LinearLeases(dnsmasq_leases)
+    assert site_status.charger_rows(linear_leases, linear_status) == site_status.charger_rows(dnsmasq_leases, status)
+
+    linear_ms = timeit(lambda: site_status.charger_rows(linear_leases, linear_status), args.repeat)
+    indexed_ms = timeit(lambda: site_status.charger_rows(dnsmasq_leases, status), args.repeat)
+    print(f"{args.chargers} chargers, {args.leases} leases  linear scans: {linear_ms:9.2f} ms"
+          f"   indexed: {indexed_ms:7.2f} ms   ({linear_ms / indexed_ms:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark for rendering the connector table of a large site.
+
+Times ChargingStationsStatus.table_rows over repeated renders, once with the
+previous strptime call per connector and once with src.timestamps, whose LRU
+memo makes unchanged timestamps free after the first render.
+
+Usage:
+    python -m bench.bench_timestamps [--connectors 10000] [--distinct 10000] [--repeat 10]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from src import timestamps
+from src.charging_stations_status import ChargingStationsStatus
+
+START = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+
+def make_status(connectors: int, distinct: int) -> ChargingStationsStatus:
+    return ChargingStationsStatus.from_json({'chargers': [{
+        'id': f"CHG{i:05d}",
+        'connectors': [{'id': 1, 'status': 'Faulted', 'ocpp_error': {
+            'error_code': 'GroundFailure',
+            'timestamp': (START + timedelta(minutes=i % distinct)).strftime("%Y-%m-%dT%H:%M:%S.000%z")}}],
+    } for i in range(connectors)]})
+
+
+def legacy_rows(status: ChargingStationsStatus) -> list:
+    """
+    The previous behaviour: every connector's timestamp is parsed on every render.
+    """
+    table_data = []
+    for charger in status.chargers:
+        for connector in charger.connectors:
+            formatted_time = "UNKNOWN"
+            if connector.ocpp_error.timestamp:
+                formatted_time = datetime.strptime(connector.ocpp_error.timestamp,
+                                                   "%Y-%m-%dT%H:%M:%S.%f%z").strftime("%y%m%d_%H%M")
+            table_data.append([charger.id, connector.id, connector.ocpp_error.error_code, formatted_time,
+                               connector.ocpp_error.info, connector.status, charger.ip_address])
+    return sorted(table_data, key=lambda x: x[0])
+
+
+def timeit(func, status: ChargingStationsStatus, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(status)
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--connectors', type=int, default=10000)
+    parser.add_argument('--distinct', type=int, default=10000, help="distinct error timestamps")
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    status = make_status(args.connectors, args.distinct)
+    assert legacy_rows(status) == status.table_rows()
+    timestamps.cache_clear()
+
+    legacy_ms = timeit(legacy_rows, status, args.repeat)
+    first_ms = timeit(ChargingStationsStatus.table_rows, status, 1)
+    cached_ms = timeit(ChargingStationsStatus.table_rows, status, args.repeat)
+    print(f"{args.connectors} connectors  strptime: {legacy_ms:8.2f} ms   first render: {first_ms:8.2f} ms"
+          f"   later renders: {cached_ms:8.2f} ms   ({legacy_ms / cached_ms:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,84 +1,110 @@
 # cmd_dispatcher.py
 import os
 import shlex
-import importlib
-from typing import List, Union
-from src.terminal_screen import TerminalScreen
-from prompt_toolkit.completion import NestedCompleter
-from prompt_toolkit.shortcuts import CompleteStyle
+import logging
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from src.command_registry import CommandNode, CommandRegistry, CommandNotFound
+from src.batch_executor import BatchExecutor, BatchResult, format_batch_results
+
+if TYPE_CHECKING:
+    from src.terminal_screen import TerminalScreen
 
 class CmdDispatcher:
-    completer: Union[None, NestedCompleter] = None
-    complete_style: CompleteStyle = CompleteStyle.READLINE_LIKE
-    cmds_avail: List[os.DirEntry] = []
     cmds_dir: str = ""
     batchfilename: str = "commands.batch"
+    batch_workers: int = 4
 
-    def __init__(self, cmds_dir: str) -> None:
+    def __init__(self, cmds_dir: str, registry: CommandRegistry = None) -> None:
         self.cmds_dir = cmds_dir
+        self.registry = registry if registry is not None else CommandRegistry(cmds_dir)
         self.read_batch_file()
-        self.cmds_avail = [entry for entry in os.scandir(self.cmds_dir) if entry.is_dir()]
 
     def read_batch_file(self) -> bool:
         try:
             with open(os.path.join(self.cmds_dir, self.batchfilename)) as file:
                 self.batch = [line.rstrip() for line in file.readlines()]
-            print(f"Batch commands: {self.batch}")
+            logging.debug(f"Batch commands: {self.batch}")
             return True
         except FileNotFoundError:
             self.batch = []
-            print("Cannot open batch file:", os.path.join(self.cmds_dir, self.batchfilename))
+            logging.warning(f"Cannot open batch file: {os.path.join(self.cmds_dir, self.batchfilename)}")
             return False
 
-    def dispatch(self, cmd: str, cmds_dir: str, terminal: TerminalScreen, depth: int = 0) -> str:
-        if not cmd:
-            return None
+    def run_batch(self, terminal: 'TerminalScreen', commands: List[str] = None) -> List[BatchResult]:
+        """
+        Run the batch commands, independent ones concurrently.
 
-        cmds = shlex.split(cmd)
-        depth += 1
+        Args:
+            terminal (TerminalScreen): The screen the commands write to.
+            commands (List[str]): Commands to run, the batch file by default.
 
-        print(f"Dispatching command: {cmd}")
-        print(f"Available commands: {[entry.name for entry in self.cmds_avail]}")
+        Returns:
+            List[BatchResult]: One result per command, in batch order.
+        """
+        if commands is None:
+            commands = self.batch
+        commands = [cmd for cmd in commands if cmd.strip() and cmd.split()[0] != 'batch']
+        executor = BatchExecutor(lambda cmd: self.dispatch(cmd, terminal), max_workers=self.batch_workers)
+        return executor.run(commands)
 
-        try:
-            command = cmds[depth - 1]
-        except IndexError:
-            print("Command not implemented:", cmd)
+    def dispatch(self, cmd: str, terminal: 'TerminalScreen') -> str:
+        if not cmd:
+            return None
+
+        cmds: List[str] = shlex.split(cmd)
+        if not cmds:
             return None
 
-        if command == 'q':
+        logging.debug(f"Dispatching command: {cmd}")
+
+        if cmds[0] == 'q':
             exit(0)
-        if command == '?':
-            if not self.cmds_avail:
-                print("No subcommands")
-                return None
+        if cmds[0] == 'batch':
+            return format_batch_results(self.run_batch(terminal))
 
-            names_list = [entry.name for entry in self.cmds_avail if not entry.name.startswith('__')]
-            names_str = '\n'.join(names_list)
-            terminal.display_string(names_str)
-            return None
+        node, depth = self.registry.resolve(cmds)
 
-        for entry in self.cmds_avail:
-            if command == entry.name:
-                if len(cmds) > depth:
-                    return self.dispatch(' '.join(cmds), os.path.join(cmds_dir, command), terminal, depth)
+        if depth < len(cmds) and cmds[depth] == '?':
+            names_list = list(node.children)
+            if not names_list:
+                terminal.display_string("No subcommands")
                 return None
+            terminal.display_string('\n'.join(names_list))
+            return None
+
+        try:
+            command_instance = self.create_command(cmds, terminal, (node, depth))
+        except CommandNotFound as e:
+            return str(e)
+        if command_instance is None:
+            return None
+        return command_instance.execute()
 
-        module_path = ["commands"] + cmds[:depth]
-        module_dir = os.path.join(*module_path)
-        if os.path.exists(os.path.join(module_dir, 'command.py')):
-            module_name = '.'.join(module_path) + '.command'
-            try:
-                module = importlib.import_module(module_name)
-            except ImportError as e:
-                return str(e)
+    def create_command(self, cmds: List[str], terminal: 'TerminalScreen',
+                       resolved: Optional[Tuple[CommandNode, int]] = None):
+        """
+        Resolve a split command line and instantiate its Command class.
 
-            command_module = getattr(module, 'Command', None)
-            if not command_module:
-                return "Command module not found."
+        Args:
+            cmds (List[str]): The split command line, arguments included.
+            terminal (TerminalScreen): The screen the command writes to.
+            resolved (Tuple[CommandNode, int]): The result of ``registry.resolve(cmds)``
+                if the caller already walked the trie.
 
-            command_instance = command_module(cmds, terminal)
-            return command_instance.execute()
-        else:
-            return f"Command not found: {' '.join(cmds)}"
+        Returns:
+            Command: The command instance, ready to execute, or None if the
+            words name a command group without a command of its own.
 
+        Raises:
+            CommandNotFound: If the words do not name an executable command.
+        """
+        node, depth = resolved if resolved is not None else self.registry.resolve(cmds)
+        if 0 < depth == len(cmds) and not node.is_executable:
+            return None
+        if depth == 0 or not node.is_executable:
+            raise CommandNotFound(f"Command not found: {' '.join(cmds)}")
+        try:
+            command_module = node.load()
+        except ImportError as e:
+            raise CommandNotFound(str(e)) from e
+        return command_module(cmds, terminal)
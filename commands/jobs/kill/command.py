@@ -0,0 +1,23 @@
+from src.scheduler import JobNotFound
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.terminal_screen import TerminalScreen
+
+
+class Command():
+    def __init__(self, cmds, terminal_screen: 'TerminalScreen'):
+        self.cmds = cmds
+        self.terminal_screen = terminal_screen
+
+    def execute(self) -> str:
+        if len(self.cmds) < 3:
+            return "Usage: jobs kill <id>"
+        scheduler = self.terminal_screen.scheduler
+        try:
+            job = scheduler.find(' '.join(self.cmds[2:]))
+        except JobNotFound as e:
+            return str(e)
+        scheduler.cancel(job)
+
+        return f"Killed job {job.id} ({job.name})"
@@ -0,0 +1 @@
+# commands/jobs/list/__init__.py
\ No newline at end of file
@@ -0,0 +1,30 @@
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    from src.scheduler import Job
+    from src.terminal_screen import TerminalScreen
+
+
+def format_ms(seconds: Optional[float]) -> str:
+    return '-' if seconds is None else f"{seconds * 1000:.1f}"
+
+
+def format_jobs(jobs: Iterable['Job']) -> str:
+    from tabulate import tabulate
+
+    headers = ["ID", "Name", "State", "Interval (s)", "Ticks", "Last (ms)", "Mean (ms)", "p95 (ms)", "Overruns"]
+    rows = [[job.id, job.name, job.state, job.interval, job.ticks, format_ms(job.last_duration),
+             format_ms(job.mean_duration), format_ms(job.p95_duration), job.overruns]
+            for job in sorted(jobs, key=lambda job: job.id)]
+    if not rows:
+        return "No jobs"
+    return tabulate(rows, headers=headers, tablefmt="psql")
+
+
+class Command():
+    def __init__(self, cmds, terminal_screen: 'TerminalScreen'):
+        self.cmds = cmds
+        self.terminal_screen = terminal_screen
+
+    def execute(self) -> str:
+        return format_jobs(self.terminal_screen.scheduler.jobs.values())
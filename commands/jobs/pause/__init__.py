@@ -0,0 +1 @@
+# commands/jobs/pause/__init__.py
\ No newline at end of file
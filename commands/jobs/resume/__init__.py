@@ -0,0 +1 @@
+# commands/jobs/resume/__init__.py
\ No newline at end of file
@@ -0,0 +1 @@
+# commands/show/cache/__init__.py
\ No newline at end of file
@@ -0,0 +1,24 @@
+# commands/show/cache/command.py
+from src.redis_handler import get_redis_handler
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.terminal_screen import TerminalScreen
+
+class Command:
+    def __init__(self, cmds, terminal_screen: 'TerminalScreen'):
+        self.cmds = cmds
+        self.terminal_screen = terminal_screen
+        self.redis_handler = get_redis_handler()
+
+    def execute(self) -> str:
+        from tabulate import tabulate
+
+        stats = self.collect()
+        hit_rate = stats['hit_rate']
+        stats['hit_rate'] = 'N/A' if hit_rate is None else f"{hit_rate:.1%}"
+        stats['tracked_keys'] = ', '.join(stats['tracked_keys']) or 'none (TTL only)'
+        return tabulate(list(stats.items()), headers=["Cache", "Value"], tablefmt="psql")
+
+    def collect(self) -> dict:
+        return self.redis_handler.cache.stats()
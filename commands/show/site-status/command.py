@@ -1,55 +1,21 @@
 # commands/show/site-status/command.py
-from src.redis_handler import RedisHandler
-from src.site_status import SiteStatus
-from src.charging_stations_status import ChargingStationsStatus
+from src.redis_handler import get_redis_handler
 from src.dnsmasq_leases import DnsmasqLeases
-from src.terminal_screen import TerminalScreen
-import json
+from src.site_snapshot import load_site_snapshot
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.terminal_screen import TerminalScreen
 
 class Command:
-    def __init__(self, cmds, terminal_screen: TerminalScreen):
+    def __init__(self, cmds, terminal_screen: 'TerminalScreen'):
         self.cmds = cmds
         self.terminal_screen = terminal_screen
-        self.redis_handler = RedisHandler()
-        self.key_site_status = 'cgw/SiteStatus'
-        self.key_charging_stations = 'cgw/ChargingStationsStatus'
+        self.redis_handler = get_redis_handler()
         self.dnsmasq_leases = DnsmasqLeases("/data/dnsmasq/dnsmasq.leases")
 
     def execute(self) -> str:
-        site_status = None
-        try:
-            site_status_json = self.redis_handler.get_value(self.key_site_status)
-            if site_status_json is not None:
-                site_status = json.loads(site_status_json)
-        except Exception as e:
-            try:
-                with open('site_status.json', 'r') as f:
-                    site_status = json.load(f)
-            except FileNotFoundError:
-                print("Warning: site_status.json not found.")
-            except json.JSONDecodeError:
-                print("Error: Unable to decode site_status.json.")
-
-        charging_stations_status = None
-        try:
-            charging_stations_status_json = self.redis_handler.get_value(self.key_charging_stations)
-            if charging_stations_status_json is not None:
-                charging_stations_status = json.loads(charging_stations_status_json)
-        except Exception as e:
-            try:
-                with open('charging_stations_status.json', 'r') as f:
-                    charging_stations_status = json.load(f)
-            except FileNotFoundError:
-                print("Warning: charging_stations_status.py not found.")
-            except json.JSONDecodeError:
-                print("Error: Unable to decode charging_stations_status.py.")
-
-        try:
-            self.dnsmasq_leases.read_leases()
-        except Exception as e:
-            print(f"Error: {e}")
-
-        charging_stations_status = ChargingStationsStatus.from_json(charging_stations_status)
-        site_status = SiteStatus.from_json(site_status)
+        return load_site_snapshot(self.redis_handler, self.dnsmasq_leases).display()
 
-        return site_status.display(self.dnsmasq_leases, charging_stations_status)
+    def collect(self) -> dict:
+        return load_site_snapshot(self.redis_handler, self.dnsmasq_leases).to_json()
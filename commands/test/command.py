@@ -1,15 +1,19 @@
-from src.terminal_screen import TerminalScreen
 import multiprocessing
 import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.terminal_screen import TerminalScreen
 
 
 class Command():
-    def __init__(self, cmds, terminal: TerminalScreen):
+    def __init__(self, cmds, terminal: 'TerminalScreen'):
         self.cmds = cmds
         self.terminal = terminal
 
     def execute(self) -> None:
         process = multiprocessing.Process(target=self.send_counter)
+        process.daemon = True  # Do not keep batch and headless runs alive
         self.terminal.display("Starting")
         process.start()
 
@@ -1,9 +1,12 @@
-from src.terminal_screen import TerminalScreen
 import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.terminal_screen import TerminalScreen
 
 
 class Command():
-    def __init__(self, cmds, terminal_screen: TerminalScreen):
+    def __init__(self, cmds, terminal_screen: 'TerminalScreen'):
         self.cmds = cmds
         self.terminal_screen = terminal_screen
 
@@ -13,6 +16,7 @@ class Command():
 
     def execute(self) -> str:
         # Start the interval process (execute the function every 2 seconds in this example)
-        self.terminal_screen.start_interval_process(interval_seconds=2, func=self.example_interval_function)
+        self.terminal_screen.start_interval_process(interval_seconds=2, func=self.example_interval_function,
+                                                    name=' '.join(self.cmds))
 
         return str(self.cmds)
\ No newline at end of file
@@ -1,9 +1,12 @@
-from src.terminal_screen import TerminalScreen
 import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.terminal_screen import TerminalScreen
 
 
 class Command():
-    def __init__(self, cmds, terminal_screen: TerminalScreen):
+    def __init__(self, cmds, terminal_screen: 'TerminalScreen'):
         self.cmds = cmds
         self.terminal_screen = terminal_screen
 
@@ -1,61 +1,83 @@
-from src.redis_handler import RedisHandler
-from src.site_status import SiteStatus
-from src.charging_stations_status import ChargingStationsStatus
+import asyncio
+
+from src.redis_handler import get_redis_handler
 from src.dnsmasq_leases import DnsmasqLeases
-import json
-from src.terminal_screen import TerminalScreen
-from functools import partial
+from src.async_redis_handler import get_async_redis_handler
+from src.site_snapshot import KEY_CHARGING_STATIONS, KEY_SITE_STATUS, load_site_snapshot_async
+from src.charging_stations_status import STATUS_CHANGE_LOG
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.terminal_screen import TerminalScreen
 
 
 class Command():
-    def __init__(self, cmds, terminal_screen: TerminalScreen):
+    keys = [KEY_SITE_STATUS, KEY_CHARGING_STATIONS]
+    poll_interval = 2  # Seconds between refreshes when the server does not publish keyspace notifications
+    resync_interval = 30  # Seconds between refreshes on notifications, in case one was lost
+
+    def __init__(self, cmds, terminal_screen: 'TerminalScreen'):
         self.cmds = cmds
         self.terminal_screen = terminal_screen
-        self.redis_handler = RedisHandler()
-        self.key_site_status = 'cgw/SiteStatus'
-        self.key_charging_stations = 'cgw/ChargingStationsStatus'
+        self.redis_handler = get_redis_handler()
         self.dnsmasq_leases = DnsmasqLeases("/data/dnsmasq/dnsmasq.leases")
+        self.pane = None
+        self.job = None
+        self.key_listener = None
+        self.lease_listener = None
 
-    def execute(self) -> str:
-        site_status = None
-        try:
-            site_status_json = self.redis_handler.get_value(self.key_site_status)
-            if site_status_json is not None:
-                site_status = json.loads(site_status_json)
-        except Exception as e:
-            # If Redis is not reachable, load site status from file
-            try:
-                with open('site_status.json', 'r') as f:
-                    site_status = json.load(f)
-            except FileNotFoundError:
-                print("Warning: site_status.json not found.")
-            except json.JSONDecodeError:
-                print("Error: Unable to decode site_status.json.")
-
-        charging_stations_status = None
-        try:
-            charging_stations_status_json = self.redis_handler.get_value(self.key_charging_stations)
-            if charging_stations_status_json is not None:
-                charging_stations_status = json.loads(charging_stations_status_json)
-        except Exception as e:
-            # If Redis is not reachable, load charging station status from file
-            try:
-                with open('charging_stations_status.json', 'r') as f:
-                    charging_stations_status = json.load(f)
-            except FileNotFoundError:
-                print("Warning: charging_stations_status.py not found.")
-            except json.JSONDecodeError:
-                print("Error: Unable to decode charging_stations_status.py.")
+    async def refresh(self) -> None:
+        # Fetch on the event loop, parse, diff and log on the job threads, and only update the pane on the loop
+        executor = self.terminal_screen.scheduler.executor
+        snapshot = await load_site_snapshot_async(get_async_redis_handler(), self.dnsmasq_leases, executor)
+        sections, status = await asyncio.get_running_loop().run_in_executor(executor, self.render, snapshot)
+        self.pane.update(sections, status)
+        if self.job is not None:
+            # The snapshot load tracks the keys: only poll while their changes are not pushed
+            self.job.interval = self.resync_interval if self.redis_handler.tracked(self.keys) else self.poll_interval
+
+    def render(self, snapshot):
+        charging_stations_status = snapshot.charging_stations_status
+        STATUS_CHANGE_LOG.record(charging_stations_status, snapshot.previous_charging_stations_status)
+        site_status = snapshot.site_status
+        return site_status.sections(snapshot.dnsmasq_leases, charging_stations_status), site_status.status_line()
 
+    def stop(self, job=None) -> None:
+        if self.key_listener is not None:
+            self.redis_handler.unwatch(self.key_listener)
+        # Joining the file watcher thread waits up to its poll interval, so it is done off the event loop
         try:
-            self.dnsmasq_leases.read_leases()
-        except Exception as e:
-            print(f"Error: {e}")
+            self.terminal_screen.scheduler.executor.submit(self._stop_watchers)
+        except RuntimeError:
+            # The scheduler is shut down
+            self._stop_watchers()
+
+    def _stop_watchers(self) -> None:
+        if self.lease_listener is not None:
+            self.dnsmasq_leases.unwatch(self.lease_listener)
 
-        charging_stations_status = ChargingStationsStatus.from_json(charging_stations_status)
-        site_status = SiteStatus.from_json(site_status)
+    def notifications_lost(self, job) -> None:
+        # The keyspace notifications stopped: poll again, starting now
+        job.interval = self.poll_interval
+        job.trigger()
+
+    def execute(self) -> str:
+        self.pane = self.terminal_screen.open_pane('site-status')
+        job = self.terminal_screen.start_interval_process(interval_seconds=self.poll_interval, func=self.refresh,
+                                                          name=' '.join(self.cmds), pane=self.pane,
+                                                          on_cancel=self.stop)
+        if job is None:
+            # Ran once as a snapshot
+            return ""
 
-        partial_func = partial(site_status.display, self.dnsmasq_leases, charging_stations_status)
-        self.terminal_screen.start_interval_process(interval_seconds=2, func=partial_func)
+        # Refresh when the leases file changes
+        self.lease_listener = lambda delta: job.trigger()
+        self.dnsmasq_leases.watch(self.lease_listener)
 
-        return ""
\ No newline at end of file
+        # Refresh when either key changes, through the handler's cache tracking subscription. No Redis
+        # call is made here on the event loop: the refreshes track the keys, and poll until they are tracked.
+        self.job = job
+        self.key_listener = self.redis_handler.watch(self.keys, job.trigger,
+                                                     on_lost=lambda: self.notifications_lost(job))
+        return (f"Job {job.id}: refreshing site-status on keyspace notifications, "
+                f"or every {self.poll_interval}s if the server does not publish them")
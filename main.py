@@ -1,17 +1,80 @@
 # main.py
+import argparse
 import os
-from src.terminal_screen import TerminalScreen
+import sys
+from src.command_registry import CommandRegistry
 from command_dispatcher import CmdDispatcher
 
-COMMANDS_DIR = "./commands"
+COMMANDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "commands")
 
-cmd_dispatcher = CmdDispatcher(COMMANDS_DIR)
+# Statement profiled by --import-profile: everything needed to show the prompt.
+STARTUP_STATEMENT = "import main; main.create_terminal(main.create_dispatcher())"
 
-terminal = TerminalScreen(COMMANDS_DIR)
 
-def command_handler(command: str) -> str:
-    return cmd_dispatcher.dispatch(command, COMMANDS_DIR, terminal)
+def create_dispatcher(cmds_dir: str = COMMANDS_DIR) -> CmdDispatcher:
+    return CmdDispatcher(cmds_dir, CommandRegistry(cmds_dir))
 
-terminal.set_command_handler(command_handler)
 
-terminal.run()
+def create_terminal(cmd_dispatcher: CmdDispatcher, scrollback_lines: int = 10000, max_refresh_rate: float = 20.0):
+    # prompt_toolkit is only needed for the interactive screen
+    from src.terminal_screen import TerminalScreen
+
+    terminal = TerminalScreen(cmd_dispatcher.cmds_dir, cmd_dispatcher.registry,
+                              scrollback_lines=scrollback_lines, max_refresh_rate=max_refresh_rate)
+
+    def command_handler(command: str) -> str:
+        return cmd_dispatcher.dispatch(command, terminal)
+
+    terminal.set_command_handler(command_handler)
+    return terminal
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Site status diagnostics")
+    parser.add_argument('--import-profile', action='store_true',
+                        help="print an import-time report of the interactive startup and exit")
+    parser.add_argument('--batch', action='store_true',
+                        help="run the commands of commands.batch before showing the prompt")
+    parser.add_argument('--scrollback', type=int, default=10000,
+                        help="number of output lines kept for scrolling back")
+    parser.add_argument('--refresh-rate', type=float, default=20.0,
+                        help="maximum screen redraws per second")
+    subparsers = parser.add_subparsers(dest='mode')
+    exec_parser = subparsers.add_parser('exec', help="run commands without the interactive screen")
+    exec_parser.add_argument('commands', nargs='*',
+                             help="commands to run, e.g. \"show site-status\"; read from stdin if omitted or '-'")
+    exec_parser.add_argument('--format', choices=('table', 'json'), default='table',
+                             help="output format, json writes one object per command")
+    exec_parser.add_argument('--batch', action='store_true', dest='exec_batch',
+                             help="run the commands of commands.batch")
+    exec_parser.add_argument('--jobs', type=int, default=CmdDispatcher.batch_workers,
+                             help="number of workers for commands that can run concurrently")
+    args = parser.parse_args(argv)
+
+    if args.import_profile:
+        from src.import_profile import profile_imports, format_report
+        print(format_report(profile_imports(STARTUP_STATEMENT, cwd=os.path.dirname(os.path.abspath(__file__)))))
+        return 0
+
+    if args.mode == 'exec':
+        from src.headless import run_headless, read_commands
+        cmd_dispatcher = create_dispatcher()
+        commands = args.commands
+        if args.exec_batch:
+            commands = [cmd for cmd in cmd_dispatcher.batch if cmd.strip()]
+        elif not commands or commands == ['-']:
+            commands = read_commands(sys.stdin)
+        return run_headless(cmd_dispatcher, commands, fmt=args.format, max_workers=args.jobs)
+
+    cmd_dispatcher = create_dispatcher()
+    terminal = create_terminal(cmd_dispatcher, scrollback_lines=args.scrollback,
+                               max_refresh_rate=args.refresh_rate)
+    if args.batch:
+        from src.batch_executor import format_batch_results
+        terminal.display(format_batch_results(cmd_dispatcher.run_batch(terminal)))
+    terminal.run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
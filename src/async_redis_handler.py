@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import weakref
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import redis
+import redis.asyncio
+
+from src.redis_handler import CacheEntry, RedisHandler, get_redis_handler
+
+
+class AsyncRedisHandler:
+    """
+    asyncio counterpart of RedisHandler for code running on the event loop.
+
+    Shares the endpoints, pool options, circuit breakers and client-side cache of
+    a RedisHandler. Its connection pool is bound to the loop it is first used on,
+    so many fetches can run concurrently without a thread each. Keyspace
+    subscriptions and background reconnects stay with the RedisHandler, whose
+    threads also serve callers without an event loop.
+    """
+
+    def __init__(self, handler: RedisHandler):
+        """
+        Initializes the AsyncRedisHandler instance.
+
+        Args:
+            handler (RedisHandler): The synchronous handler whose configuration and cache are shared.
+        """
+        self.handler = handler
+        self.cache = handler.cache
+        self.endpoint: Optional[str] = None  # Name of the connected endpoint
+        self.pool: Optional[redis.asyncio.BlockingConnectionPool] = None
+        self._client: Optional[redis.asyncio.StrictRedis] = None
+        self._connect_lock = asyncio.Lock()
+
+    async def redis_client(self) -> redis.asyncio.StrictRedis:
+        """
+        The client, connected on first use. Failed connects are retried on the next call.
+        """
+        if self._client is None:
+            async with self._connect_lock:
+                if self._client is None:
+                    self._client = await self.connect()
+        return self._client
+
+    async def _probe(self, name: str, config: dict) -> Tuple[str, redis.asyncio.StrictRedis]:
+        # Concurrent tasks wait for a free connection instead of failing when the pool is exhausted
+        pool = redis.asyncio.BlockingConnectionPool(**config, **self.handler.pool_options,
+                                                    timeout=self.handler.pool_options['socket_timeout'])
+        client = redis.asyncio.StrictRedis(connection_pool=pool)
+        try:
+            await client.ping()
+        except asyncio.CancelledError:
+            # Lost the race against a faster endpoint
+            await pool.disconnect()
+            raise
+        except Exception as e:
+            await pool.disconnect()
+            self.handler.breakers[name].record_failure()
+            logging.error(f"Could not connect to {name} Redis server: {e}")
+            if isinstance(e, redis.RedisError):
+                raise
+            raise redis.ConnectionError(f"Bad reply from {name} Redis server: {e}") from e
+        self.handler.breakers[name].record_success()
+        return name, client
+
+    async def connect(self) -> redis.asyncio.StrictRedis:
+        """
+        Establish a pooled connection to the Redis server.
+        Probe the endpoints concurrently and use the first that answers, skipping
+        endpoints whose circuit breaker is open.
+        """
+        endpoints = [(name, config) for name, config in self.handler.endpoints
+                     if self.handler.breakers[name].allow()]
+        if not endpoints:
+            raise redis.ConnectionError("No Redis server reachable, waiting for the breaker cooldown")
+
+        probes = [asyncio.ensure_future(self._probe(name, config)) for name, config in endpoints]
+        winner = None
+        error = None
+        try:
+            for probe in asyncio.as_completed(probes):
+                try:
+                    winner = await probe
+                    break
+                except redis.RedisError as e:
+                    error = e
+        finally:
+            for probe in probes:
+                probe.cancel()
+        for probe in probes:
+            # Probes that finished alongside the winner are not needed
+            if probe.done() and not probe.cancelled() and probe.exception() is None and probe.result() != winner:
+                await probe.result()[1].connection_pool.disconnect()
+        if winner is None:
+            raise error
+
+        self.endpoint, client = winner
+        self.pool = client.connection_pool
+        logging.info(f"Connected to {self.endpoint} Redis server successfully")
+        return client
+
+    async def close(self) -> None:
+        """
+        Disconnect every pooled connection. The next call connects again.
+        """
+        client, self._client = self._client, None
+        self.pool = None
+        self.endpoint = None
+        if client is not None:
+            await client.aclose()
+            await client.connection_pool.disconnect()
+
+    async def track(self, keys: Sequence[str]) -> bool:
+        """
+        Async form of RedisHandler.track. The first call for a key probes the
+        server, so it runs off the event loop.
+        """
+        if not self.handler.tracking_attempted(keys):
+            return await asyncio.to_thread(self.handler.track, keys)
+        return self.handler.tracked(keys)
+
+    async def get_value(self, key: str) -> Optional[str]:
+        """
+        Retrieve a value from Redis by key.
+        """
+        try:
+            value = await (await self.redis_client()).get(key)
+            return value.decode('utf-8') if value is not None else None
+        except redis.RedisError as e:
+            logging.error(f"Error retrieving key {key} from Redis: {e}")
+            return None
+
+    async def get_many(self, keys: Sequence[str], raw: bool = True) -> List[Optional[Union[bytes, str]]]:
+        """
+        Retrieve several values in one round trip with MGET.
+
+        Args:
+            keys (Sequence[str]): The keys to fetch.
+            raw (bool): Return the payloads as bytes, without decoding them.
+
+        Returns:
+            List: The values in the order of the keys, None for missing keys.
+            All values are None if Redis fails.
+        """
+        if not keys:
+            return []
+        try:
+            values = await (await self.redis_client()).mget(keys)
+        except redis.RedisError as e:
+            logging.error(f"Error retrieving keys {', '.join(keys)} from Redis: {e}")
+            return [None] * len(keys)
+        if raw:
+            return values
+        return [value.decode('utf-8') if value is not None else None for value in values]
+
+    async def get_many_cached(self, keys: Sequence[str]) -> List[CacheEntry]:
+        """
+        Retrieve several values through the shared client-side cache, fetching all misses with one MGET.
+
+        Args:
+            keys (Sequence[str]): The keys to fetch.
+
+        Returns:
+            List[CacheEntry]: The entries in the order of the keys.
+
+        Raises:
+            redis.RedisError: If the misses cannot be fetched.
+        """
+        entries, missed_keys, generations = self.cache.lookup(keys)
+        if missed_keys:
+            values = await (await self.redis_client()).mget(missed_keys)
+            self.cache.fill(entries, missed_keys, generations, values)
+        return entries
+
+    async def set_value(self, key: str, value) -> None:
+        """
+        Set a value in Redis by key.
+        """
+        try:
+            await (await self.redis_client()).set(key, value)
+            logging.info(f"Key {key} set successfully")
+        except redis.RedisError as e:
+            logging.error(f"Error setting key {key} in Redis: {e}")
+
+
+_handlers: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, AsyncRedisHandler]]' = \
+    weakref.WeakKeyDictionary()
+
+
+def get_async_redis_handler(**config) -> AsyncRedisHandler:
+    """
+    Get the AsyncRedisHandler for a configuration on the running event loop.
+
+    It shares the configuration, circuit breakers and cache of the process-wide
+    RedisHandler returned by get_redis_handler for the same configuration.
+
+    Args:
+        **config: RedisHandler keyword arguments.
+
+    Returns:
+        AsyncRedisHandler: The handler for the running loop.
+    """
+    handlers = _handlers.setdefault(asyncio.get_running_loop(), {})
+    key = tuple(sorted(config.items()))
+    handler = handlers.get(key)
+    if handler is None:
+        handler = handlers[key] = AsyncRedisHandler(get_redis_handler(**config))
+    return handler
+
+
+async def close_async_redis_handlers() -> None:
+    """
+    Close and forget the handlers of the running event loop.
+    """
+    handlers = _handlers.pop(asyncio.get_running_loop(), {})
+    for handler in handlers.values():
+        await handler.close()
@@ -0,0 +1,102 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class BatchResult:
+    """
+    The outcome of one command of a batch run.
+    """
+    command: str
+    output: Any
+    error: Optional[str]
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class BatchExecutor:
+    """
+    Runs a list of commands, executing independent commands concurrently on a worker pool.
+
+    Commands starting with one of ``concurrent_prefixes`` only read state and may overlap.
+    Any other command is a barrier: it starts after every earlier command finished and
+    before any later one starts. Results are always returned in input order.
+    """
+
+    concurrent_prefixes: Tuple[str, ...] = ('show',)
+
+    def __init__(self, func: Callable[[str], Any], max_workers: int = 4,
+                 concurrent_prefixes: Optional[Tuple[str, ...]] = None):
+        """
+        Initializes the BatchExecutor instance.
+
+        Args:
+            func (Callable[[str], Any]): Runs a single command line and returns its output.
+            max_workers (int): Size of the worker pool.
+            concurrent_prefixes (Tuple[str, ...]): First words of commands that may run concurrently.
+        """
+        self.func = func
+        self.max_workers = max(1, max_workers)
+        if concurrent_prefixes is not None:
+            self.concurrent_prefixes = concurrent_prefixes
+
+    def is_concurrent(self, cmd: str) -> bool:
+        words = cmd.split(None, 1)
+        return bool(words) and words[0] in self.concurrent_prefixes
+
+    def _run_one(self, cmd: str) -> BatchResult:
+        start = time.perf_counter()
+        output, error = None, None
+        try:
+            output = self.func(cmd)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return BatchResult(command=cmd, output=output, error=error, elapsed=time.perf_counter() - start)
+
+    def iter_results(self, commands: Iterable[str]) -> Iterator[BatchResult]:
+        """
+        Run the commands and yield their results in input order as soon as they are available.
+
+        Commands are submitted while the input is consumed, so a slow producer (e.g. stdin)
+        overlaps with the commands already running.
+        """
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='batch') as pool:
+            for cmd in commands:
+                if self.is_concurrent(cmd):
+                    pending.append(pool.submit(self._run_one, cmd))
+                else:
+                    while pending:
+                        yield pending.popleft().result()
+                    yield self._run_one(cmd)
+                while pending and pending[0].done():
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def run(self, commands: Iterable[str]) -> List[BatchResult]:
+        return list(self.iter_results(commands))
+
+
+def format_batch_results(results: List[BatchResult]) -> str:
+    """
+    Format batch results for display, one header line per command followed by its output.
+    """
+    lines = []
+    for result in results:
+        status = 'ok' if result.ok else 'FAILED'
+        lines.append(f"[{status} {result.elapsed:.3f}s] {result.command}")
+        if result.error:
+            lines.append(result.error)
+        elif result.output:
+            lines.append(str(result.output))
+    total = sum(result.elapsed for result in results)
+    failed = sum(1 for result in results if not result.ok)
+    lines.append(f"Batch: {len(results)} commands, {failed} failed, {total:.3f}s command time")
+    return '\n'.join(lines)
@@ -1,29 +1,70 @@
-from dataclasses import dataclass
-from typing import List, Optional
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
 from tabulate import tabulate
 from datetime import datetime
-import json
 import csv
 from io import StringIO
 
+from src.json_backend import fingerprint
 
-@dataclass
+if TYPE_CHECKING:
+    from src.connector_columns import ConnectorColumns
+
+
+@dataclass(frozen=True)
 class OcppError:
     """
     Represents an OCPP error with its attributes.
+
+    Immutable, so equal errors parsed from JSON share a single instance.
     """
+    __slots__ = ('error_code', 'info', 'timestamp', 'vendor_error_code', 'vendor_id')
     error_code: str
     info: str
     timestamp: str
     vendor_error_code: str
     vendor_id: str
 
+    def __reduce__(self):
+        # Frozen slots cannot be restored by assignment, so copies go through __init__
+        return OcppError, (self.error_code, self.info, self.timestamp, self.vendor_error_code, self.vendor_id)
+
+
+NO_OCPP_ERROR = OcppError('', '', '', '', '')
+
+# Interned OcppError instances by field values. Most connectors report the same few
+# errors; the table is bounded because timestamps make some of them unique.
+_ocpp_errors: Dict[Tuple, OcppError] = {}
+_OCPP_ERRORS_MAX = 4096
+
+
+def _intern(value):
+    # Status and error code strings repeat across every charger and connector
+    return sys.intern(value) if type(value) is str else value
+
+
+def _ocpp_error_from_json(data: Optional[dict]) -> OcppError:
+    if not data:
+        return NO_OCPP_ERROR
+    get = data.get
+    key = (get('error_code', ''), get('info', ''), get('timestamp', ''),
+           get('vendor_error_code', ''), get('vendor_id', ''))
+    error = _ocpp_errors.get(key)
+    if error is None:
+        if len(_ocpp_errors) >= _OCPP_ERRORS_MAX:
+            _ocpp_errors.clear()
+        error = _ocpp_errors[key] = OcppError(*map(_intern, key))
+    return error
+
 
 @dataclass
 class Connector:
     """
     Represents a connector with its attributes.
     """
+    __slots__ = ('id', 'ocpp_error', 'ocpp_error_code', 'priority', 'status')
     id: int
     ocpp_error: OcppError
     ocpp_error_code: str
@@ -36,6 +77,7 @@ class Charger:
     """
     Represents a charger with its connectors and attributes.
     """
+    __slots__ = ('connectors', 'firmware_version', 'id', 'ip_address', 'ocpp_error', 'ocpp_error_code', 'status')
     connectors: List[Connector]
     firmware_version: str
     id: str
@@ -45,20 +87,82 @@ class Charger:
     status: str
 
 
+def _charger_from_json(charger_data: dict) -> Charger:
+    # One walk over the charger's sub-document, building each model positionally
+    get = charger_data.get
+    connectors = [
+        Connector(
+            connector_data.get('id', 0),
+            _ocpp_error_from_json(connector_data.get('ocpp_error')),
+            _intern(connector_data.get('ocpp_error_code', '')),
+            connector_data.get('priority', False),
+            _intern(connector_data.get('status', '')),
+        )
+        for connector_data in get('connectors', ())
+    ]
+    return Charger(
+        connectors,
+        _intern(get('firmware_version', '')),
+        get('id', ''),
+        get('ip_address', ''),
+        _ocpp_error_from_json(get('ocpp_error')),
+        _intern(get('ocpp_error_code', '')),
+        _intern(get('status', '')),
+    )
+
+
+class StatusChange(NamedTuple):
+    charger_id: str
+    connector_id: int
+    old_status: str
+    new_status: str
+
+
+@dataclass
+class ChangeSet:
+    """
+    The connectors that differ between two charging stations statuses.
+    """
+    added: List[Tuple[str, int]] = field(default_factory=list)  # (charger ID, connector ID)
+    removed: List[Tuple[str, int]] = field(default_factory=list)
+    status_changed: List[StatusChange] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.status_changed)
+
+    def log_rows(self) -> List[List[str]]:
+        """
+        Rows for the status change log. Connectors without a previous status are not logged.
+
+        Returns:
+            List[List[str]]: Rows of [time, charger ID, new status].
+        """
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return [[now, change.charger_id, change.new_status] for change in self.status_changed if change.old_status]
+
+
 @dataclass
 class ChargingStationsStatus:
     """
     Represents the status of charging stations.
     """
     chargers: List[Charger]
+    # Fingerprint of each charger's JSON sub-document by charger ID, or the sub-document
+    # itself when the JSON backend cannot fingerprint cheaply
+    digests: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+    _charger_index: Optional[Dict[str, Charger]] = field(default=None, init=False, compare=False, repr=False)
 
     @classmethod
-    def from_json(cls, json_dict: Optional[dict]) -> 'ChargingStationsStatus':
+    def from_json(cls, json_dict: Optional[dict],
+                  previous: Optional['ChargingStationsStatus'] = None) -> 'ChargingStationsStatus':
         """
         Create a ChargingStationsStatus object from JSON data.
 
         Args:
             json_dict (dict): JSON data representing the charging station status.
+            previous (ChargingStationsStatus): A status parsed from an earlier payload. Its
+                chargers are reused, not re-parsed, where their sub-document is unchanged:
+                compared by fingerprint with orjson, and as decoded values otherwise.
 
         Returns:
             ChargingStationsStatus: The created ChargingStationsStatus object.
@@ -66,44 +170,64 @@ class ChargingStationsStatus:
         if json_dict is None:
             return cls(chargers=[])
 
+        reusable = {}
+        previous_digests = {}
+        if previous is not None:
+            reusable = {charger.id: charger for charger in previous.chargers}
+            previous_digests = previous.digests
         chargers = []
-        for charger_data in json_dict.get('chargers', []):
-            connectors = []
-            for connector_data in charger_data.get('connectors', []):
-                ocpp_error_data = connector_data.get('ocpp_error', {})
-                ocpp_error = OcppError(
-                    error_code=ocpp_error_data.get('error_code', ''),
-                    info=ocpp_error_data.get('info', ''),
-                    timestamp=ocpp_error_data.get('timestamp', ''),
-                    vendor_error_code=ocpp_error_data.get('vendor_error_code', ''),
-                    vendor_id=ocpp_error_data.get('vendor_id', '')
-                )
-                connector = Connector(
-                    id=connector_data.get('id', 0),
-                    ocpp_error=ocpp_error,
-                    ocpp_error_code=connector_data.get('ocpp_error_code', ''),
-                    priority=connector_data.get('priority', False),
-                    status=connector_data.get('status', '')
-                )
-                connectors.append(connector)
-            ocpp_error_data = charger_data.get('ocpp_error', {})
-            charger = Charger(
-                connectors=connectors,
-                firmware_version=charger_data.get('firmware_version', ''),
-                id=charger_data.get('id', ''),
-                ip_address=charger_data.get('ip_address', ''),
-                ocpp_error=OcppError(
-                    error_code=ocpp_error_data.get('error_code', ''),
-                    info=ocpp_error_data.get('info', ''),
-                    timestamp=ocpp_error_data.get('timestamp', ''),
-                    vendor_error_code=ocpp_error_data.get('vendor_error_code', ''),
-                    vendor_id=ocpp_error_data.get('vendor_id', '')
-                ),
-                ocpp_error_code=charger_data.get('ocpp_error_code', ''),
-                status=charger_data.get('status', '')
-            )
+        digests = {}
+        for charger_data in json_dict.get('chargers', ()):
+            digest = fingerprint(charger_data)
+            if digest is None:
+                # Comparing the decoded dicts is still much cheaper than building the models again
+                digest = charger_data
+            charger_id = charger_data.get('id', '')
+            # Popped so that a repeated charger ID is never reused twice
+            charger = reusable.pop(charger_id, None)
+            if charger is None or previous_digests.get(charger_id) != digest:
+                charger = _charger_from_json(charger_data)
+            digests[charger_id] = digest
             chargers.append(charger)
-        return cls(chargers=chargers)
+        return cls(chargers, digests)
+
+    @classmethod
+    def update(cls, json_dict: Optional[dict], previous: 'ChargingStationsStatus') -> 'ChargingStationsStatus':
+        """
+        Incremental form of ``from_json``, called by the snapshot loader with the model of the previous value.
+        """
+        return cls.from_json(json_dict, previous)
+
+    def changes_since(self, previous: Optional['ChargingStationsStatus']) -> ChangeSet:
+        """
+        Compare the connectors with those of an earlier status.
+
+        Chargers reused by ``from_json`` are the same objects in both and are skipped.
+
+        Args:
+            previous (ChargingStationsStatus): The earlier status, None if there is none.
+
+        Returns:
+            ChangeSet: The added, removed and status-changed connectors.
+        """
+        changes = ChangeSet()
+        old_chargers = {} if previous is None else {charger.id: charger for charger in previous.chargers}
+        for charger in self.chargers:
+            old = old_chargers.pop(charger.id, None)
+            if old is charger:
+                continue
+            old_status = {} if old is None else {connector.id: connector.status for connector in old.connectors}
+            for connector in charger.connectors:
+                if connector.id not in old_status:
+                    changes.added.append((charger.id, connector.id))
+                    continue
+                status = old_status.pop(connector.id)
+                if status != connector.status:
+                    changes.status_changed.append(StatusChange(charger.id, connector.id, status, connector.status))
+            changes.removed.extend((charger.id, connector_id) for connector_id in old_status)
+        for old in old_chargers.values():
+            changes.removed.extend((old.id, connector.id) for connector in old.connectors)
+        return changes
 
     def to_json(self) -> dict:
         """
@@ -146,6 +270,18 @@ class ChargingStationsStatus:
             })
         return {'chargers': chargers_json}
 
+    @property
+    def charger_index(self) -> Dict[str, Charger]:
+        """
+        The chargers by ID, built on first use. The first charger wins when an ID repeats.
+        """
+        if self._charger_index is None:
+            index = {}
+            for charger in self.chargers:
+                index.setdefault(charger.id, charger)
+            self._charger_index = index
+        return self._charger_index
+
     def get_ip_from_charger_id(self, charger_id: str) -> str:
         """
         Get the IP address associated with a charger ID.
@@ -156,27 +292,8 @@ class ChargingStationsStatus:
         Returns:
             str: The IP address of the charger.
         """
-        for charger in self.chargers:
-            if charger.id == charger_id:
-                return charger.ip_address
-        return "IP not found"
-
-    def read_previous_status(self, file_path: str) -> dict:
-        """
-        Read the previous status from a JSON file.
-
-        Args:
-            file_path (str): Path to the JSON file.
-
-        Returns:
-            dict: Previous status data.
-        """
-        try:
-            with open(file_path, 'r') as json_file:
-                previous_data = json.load(json_file)
-                return {tuple(entry[:2]): entry[-1] for entry in previous_data}
-        except FileNotFoundError:
-            return {}
+        charger = self.charger_index.get(charger_id)
+        return charger.ip_address if charger is not None else "IP not found"
 
     def write_status_changes(self, file_path: str, status_changes: List[List[str]]):
         """
@@ -191,57 +308,91 @@ class ChargingStationsStatus:
                 writer = csv.writer(csv_file)
                 writer.writerows(status_changes)
 
-    def display(self) -> str:
+    headers = ["Chg ID", "Conn ID", "OCPP Err", "OCPP Err Ts", "Info", "Status", "IP Address"]
+
+    def columns(self) -> 'ConnectorColumns':
+        """
+        Column-oriented view of the connectors for filtering, counting and sorting.
+
+        Returns:
+            ConnectorColumns: One row per connector, in charger order.
+        """
+        from src.connector_columns import ConnectorColumns
+        return ConnectorColumns.from_status(self)
+
+    def table_rows(self) -> List[list]:
         """
-        Display the charging stations status, compare with the previous status,
-        and write changes to 'status_changes.csv'.
+        Build the connector table, one row per connector, sorted by charger ID.
+
+        Returns:
+            List[list]: Rows matching ``ChargingStationsStatus.headers``.
+        """
+        return self.columns().sort('charger_id').table_rows()
+
+    def display(self, previous: Optional['ChargingStationsStatus'] = None) -> str:
+        """
+        Display the charging stations status, and append the status changes since
+        the last logged status to 'status_changes.csv'.
+
+        Args:
+            previous (ChargingStationsStatus): The status this one replaced, compared
+                with if no status was logged yet.
 
         Returns:
             str: The formatted text displaying charging stations status.
         """
         output = StringIO()
-        previous_status = self.read_previous_status('tabledata.json')
+        table = tabulate(self.table_rows(), headers=self.headers, tablefmt="psql")
+        print(table, file=output)
 
-        table_data = []
-        status_changes = []
+        STATUS_CHANGE_LOG.record(self, previous)
 
-        for charger in self.chargers:
-            ip_address = charger.ip_address  # Get the IP address of the charger
-            for connector in charger.connectors:
-                formatted_time = "UNKNOWN"
-                if connector.ocpp_error.timestamp:
-                    formatted_time = datetime.strptime(connector.ocpp_error.timestamp,
-                                                       "%Y-%m-%dT%H:%M:%S.%f%z").strftime("%y%m%d_%H%M")
-                table_data.append([
-                    charger.id,
-                    connector.id,
-                    connector.ocpp_error.error_code,
-                    formatted_time,
-                    connector.ocpp_error.info,
-                    connector.status,
-                    ip_address  # Include the IP address in the output
-                ])
-
-                # Check if status has changed
-                prev_status = previous_status.get((charger.id, connector.id))
-                if prev_status and prev_status != connector.status:
-                    status_changes.append([datetime.now().strftime("%Y-%m-%d %H:%M:%S"), charger.id, connector.status])
-
-        # Sort table data by charger ID
-        sorted_table_data = sorted(table_data, key=lambda x: x[0])
-
-        headers = ["Chg ID", "Conn ID", "OCPP Err", "OCPP Err Ts", "Info", "Status", "IP Address"]
-        table = tabulate(sorted_table_data, headers=headers, tablefmt="psql")
-        print(table, file=output)
+        return output.getvalue()
 
-        # Write the data to JSON file
-        with open('tabledata.json', 'w') as json_file:
-            json.dump(sorted_table_data, json_file, indent=4)
 
-        # Write status changes to CSV file
-        self.write_status_changes('status_changes.csv', status_changes)
+class StatusChangeLog:
+    """
+    Appends the connector status changes between successive statuses to a CSV file.
 
-        return output.getvalue()
+    Remembers the last status it logged, so that a change is logged once however
+    many commands display or watch the status.
+    """
+
+    def __init__(self, file_path: str = 'status_changes.csv'):
+        """
+        Initializes the StatusChangeLog instance.
+
+        Args:
+            file_path (str): Path to the CSV file.
+        """
+        self.file_path = file_path
+        self.last: Optional[ChargingStationsStatus] = None
+        self._lock = threading.Lock()
+
+    def record(self, status: ChargingStationsStatus,
+               previous: Optional[ChargingStationsStatus] = None) -> ChangeSet:
+        """
+        Log the status changes since the last recorded status.
+
+        Args:
+            status (ChargingStationsStatus): The current status.
+            previous (ChargingStationsStatus): The status it replaced, e.g. the model the
+                cache kept for the previous value. Used if no status was recorded yet.
+
+        Returns:
+            ChangeSet: The changes, empty if the status was already recorded.
+        """
+        with self._lock:
+            baseline = self.last if self.last is not None else previous
+            if status is baseline:
+                return ChangeSet()
+            changes = status.changes_since(baseline)
+            self.last = status
+            status.write_status_changes(self.file_path, changes.log_rows())
+            return changes
+
+
+STATUS_CHANGE_LOG = StatusChangeLog()
 
 
 # # Define the path to the JSON file
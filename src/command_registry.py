@@ -0,0 +1,146 @@
+import importlib
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+
+class CommandNotFound(Exception):
+    """
+    Raised when a command line does not resolve to an executable command.
+    """
+
+
+class CommandNode:
+    """
+    A single node in the command trie.
+
+    A node maps to a directory below the commands directory. It is executable
+    when that directory contains a ``command.py`` module defining ``Command``.
+    """
+
+    __slots__ = ('name', 'path', 'children', 'module_name', '_command_cls')
+
+    def __init__(self, name: str, path: Tuple[str, ...], module_name: Optional[str] = None):
+        self.name = name
+        self.path = path
+        self.children: Dict[str, 'CommandNode'] = {}
+        self.module_name = module_name
+        self._command_cls = None
+
+    @property
+    def is_executable(self) -> bool:
+        return self.module_name is not None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._command_cls is not None
+
+    def load(self):
+        """
+        Import the command module on first use and return its ``Command`` class.
+
+        Returns:
+            type: The ``Command`` class of this node.
+
+        Raises:
+            ImportError: If the module cannot be imported or defines no ``Command``.
+        """
+        if self._command_cls is None:
+            if self.module_name is None:
+                raise ImportError(f"No command module for: {' '.join(self.path)}")
+            module = importlib.import_module(self.module_name)
+            command_cls = getattr(module, 'Command', None)
+            if command_cls is None:
+                raise ImportError("Command module not found.")
+            self._command_cls = command_cls
+        return self._command_cls
+
+
+class CommandRegistry:
+    """
+    Trie of every command below the commands directory, built once at startup.
+
+    The directory tree is scanned a single time. Command modules are imported
+    lazily on first dispatch unless ``eager`` is set.
+    """
+
+    command_filename: str = "command.py"
+
+    def __init__(self, cmds_dir: str, package: Optional[str] = None, eager: bool = False) -> None:
+        """
+        Initializes the CommandRegistry instance.
+
+        Args:
+            cmds_dir (str): The path to the commands directory.
+            package (str): Python package name of the commands directory.
+                Defaults to the directory's base name.
+            eager (bool): Import every command module while building the trie.
+        """
+        self.cmds_dir = cmds_dir
+        self.package = package or os.path.basename(os.path.normpath(cmds_dir))
+        self.root = CommandNode(self.package, ())
+        self._scan(cmds_dir, self.root)
+        if eager:
+            for node in self.iter_nodes():
+                if node.is_executable:
+                    try:
+                        node.load()
+                    except ImportError as e:
+                        logging.error(f"Could not load command {' '.join(node.path)}: {e}")
+
+    def _scan(self, path: str, node: CommandNode) -> None:
+        with os.scandir(path) as it:
+            entries = sorted((entry for entry in it if entry.is_dir() and not entry.name.startswith('__')),
+                             key=lambda entry: entry.name)
+        for entry in entries:
+            child_path = node.path + (entry.name,)
+            module_name = None
+            if os.path.isfile(os.path.join(entry.path, self.command_filename)):
+                module_name = '.'.join((self.package,) + child_path + ('command',))
+            child = CommandNode(entry.name, child_path, module_name)
+            node.children[entry.name] = child
+            self._scan(entry.path, child)
+
+    def resolve(self, words: List[str]) -> Tuple[CommandNode, int]:
+        """
+        Walk the trie along the given words.
+
+        Args:
+            words (List[str]): The split command line.
+
+        Returns:
+            Tuple[CommandNode, int]: The deepest matching node and the number of
+            words consumed. Remaining words are arguments for that node.
+        """
+        node = self.root
+        depth = 0
+        children = node.children
+        for word in words:
+            child = children.get(word)
+            if child is None:
+                break
+            node = child
+            children = node.children
+            depth += 1
+        return node, depth
+
+    def iter_nodes(self):
+        """
+        Iterate over every node of the trie in depth-first order, excluding the root.
+        """
+        stack = list(reversed(self.root.children.values()))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children.values()))
+
+    def to_nested_dict(self, node: Optional[CommandNode] = None) -> Dict:
+        """
+        Convert the trie to the nested dictionary used by prompt_toolkit's NestedCompleter.
+
+        Returns:
+            Dict: Command names mapped to their subcommands, or None for leaves.
+        """
+        node = node or self.root
+        return {name: (self.to_nested_dict(child) if child.children else None)
+                for name, child in node.children.items()}
@@ -0,0 +1,251 @@
+import itertools
+import operator
+from array import array
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+from src.timestamps import format_iso
+
+if TYPE_CHECKING:
+    from src.charging_stations_status import ChargingStationsStatus
+
+# Columns holding codes into a Categories table, in table row order
+CATEGORICAL = ('charger_id', 'connector_id', 'status', 'error_code', 'timestamp', 'info', 'ip_address',
+               'firmware_version')
+
+
+def _sort_key(value: Any) -> tuple:
+    # Numbers first, then the other values grouped by type, None last, so that mixed types never compare
+    if value is None:
+        return 2, '', 0
+    if isinstance(value, (int, float)):
+        return 0, '', value
+    return 1, type(value).__name__, value
+
+
+class Categories:
+    """
+    The distinct values of a categorical column, numbered in order of appearance.
+    """
+    __slots__ = ('values', 'index')
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self.index: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value: Hashable) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def ranks(self) -> List[int]:
+        """
+        Position of each code when the values are sorted: numbers, then other values by type, None last.
+        """
+        order = sorted(range(len(self.values)), key=lambda code: _sort_key(self.values[code]))
+        ranks = [0] * len(order)
+        for rank, code in enumerate(order):
+            ranks[code] = rank
+        return ranks
+
+
+def _format_timestamp(timestamp: Optional[str]) -> str:
+    return format_iso(timestamp) if timestamp else "UNKNOWN"
+
+
+class ConnectorColumns:
+    """
+    Column-oriented view of a ChargingStationsStatus with one row per connector.
+
+    Every column holds int32 codes into a Categories table shared by all views
+    derived from the same status, so IDs of any JSON type are stored. Filters,
+    counts and sorts work on the codes, with numpy when it is installed and with
+    C-level map/compress over ``array.array`` otherwise.
+    """
+
+    def __init__(self, categories: Dict[str, Categories], columns: Dict[str, array]):
+        self.categories = categories
+        self.columns = columns
+
+    @classmethod
+    def from_status(cls, status: 'ChargingStationsStatus') -> 'ConnectorColumns':
+        """
+        Build the columns from the charger models.
+
+        Args:
+            status (ChargingStationsStatus): The status to convert.
+
+        Returns:
+            ConnectorColumns: The connectors in charger order.
+        """
+        categories = {name: Categories() for name in CATEGORICAL}
+        columns = {name: array('i') for name in CATEGORICAL}
+        charger_codes, status_codes, error_codes = columns['charger_id'], columns['status'], columns['error_code']
+        timestamp_codes, info_codes = columns['timestamp'], columns['info']
+        ip_codes, firmware_codes = columns['ip_address'], columns['firmware_version']
+        connector_codes = columns['connector_id']
+        code = {name: categories[name].code for name in CATEGORICAL}
+        for charger in status.chargers:
+            charger_code = code['charger_id'](charger.id)
+            ip_code = code['ip_address'](charger.ip_address)
+            firmware_code = code['firmware_version'](charger.firmware_version)
+            for connector in charger.connectors:
+                error = connector.ocpp_error
+                charger_codes.append(charger_code)
+                connector_codes.append(code['connector_id'](connector.id))
+                status_codes.append(code['status'](connector.status))
+                error_codes.append(code['error_code'](error.error_code))
+                timestamp_codes.append(code['timestamp'](error.timestamp))
+                info_codes.append(code['info'](error.info))
+                ip_codes.append(ip_code)
+                firmware_codes.append(firmware_code)
+        return cls(categories, columns)
+
+    def __len__(self) -> int:
+        return len(self.columns['connector_id'])
+
+    def _numpy(self, name: str):
+        return np.frombuffer(self.columns[name], dtype=np.int32)
+
+    def take(self, indices: Iterable[int]) -> 'ConnectorColumns':
+        """
+        Select rows by position.
+
+        Args:
+            indices (Iterable[int]): Row positions, in the order of the new view.
+
+        Returns:
+            ConnectorColumns: A view sharing the categories of this one.
+        """
+        indices = list(indices)
+        return ConnectorColumns(self.categories, {
+            name: array(column.typecode, map(column.__getitem__, indices)) for name, column in self.columns.items()})
+
+    def _mask(self, name: str, wanted) -> Sequence[bool]:
+        if name not in self.categories:
+            raise ValueError(f"Not a categorical column: {name}")
+        if isinstance(wanted, str) or not isinstance(wanted, Iterable):
+            wanted = (wanted,)
+        index = self.categories[name].index
+        codes = [index[value] for value in wanted if value in index]
+        if np is not None:
+            return np.isin(self._numpy(name), codes)
+        hit = [False] * len(self.categories[name])
+        for code in codes:
+            hit[code] = True
+        return list(map(hit.__getitem__, self.columns[name]))
+
+    def where(self, **conditions) -> 'ConnectorColumns':
+        """
+        Select the rows matching every condition, e.g. ``where(status='Faulted')``.
+
+        Args:
+            **conditions: A value, or a collection of accepted values, per categorical column.
+
+        Returns:
+            ConnectorColumns: The matching rows in their current order.
+
+        Raises:
+            ValueError: If a condition names a column that is not categorical.
+        """
+        mask = None
+        for name, wanted in conditions.items():
+            column_mask = self._mask(name, wanted)
+            if mask is None:
+                mask = column_mask
+            elif np is not None:
+                mask = mask & column_mask
+            else:
+                mask = list(map(operator.and_, mask, column_mask))
+        if mask is None:
+            return self
+        if np is not None:
+            return self.take(np.flatnonzero(mask).tolist())
+        return self.take(itertools.compress(range(len(self)), mask))
+
+    def count_by(self, name: str) -> Dict[Any, int]:
+        """
+        Count the rows per value of a categorical column.
+
+        Args:
+            name (str): The column, e.g. 'error_code'.
+
+        Returns:
+            Dict[Any, int]: The row count per value, most frequent first.
+        """
+        if name not in self.categories:
+            raise ValueError(f"Not a categorical column: {name}")
+        values = self.categories[name].values
+        if np is not None:
+            counts = Counter({code: int(count) for code, count in
+                              enumerate(np.bincount(self._numpy(name), minlength=len(values))) if count})
+        else:
+            counts = Counter(self.columns[name])
+        return {values[code]: count for code, count in counts.most_common()}
+
+    def sort(self, *names: str, reverse: bool = False) -> 'ConnectorColumns':
+        """
+        Stable sort by one or more columns, compared by value rather than by code.
+
+        Args:
+            *names (str): The columns, most significant first.
+            reverse (bool): Sort in descending order.
+
+        Returns:
+            ConnectorColumns: The sorted rows.
+        """
+        keys = []
+        for name in names:
+            ranks = self.categories[name].ranks()
+            keys.append(array('i', map(ranks.__getitem__, self.columns[name])))
+        if not keys:
+            return self
+        if np is not None:
+            # lexsort is stable and sorts by the last key first; negated keys sort descending
+            sign = -1 if reverse else 1
+            order = np.lexsort([sign * np.frombuffer(key, dtype=np.int32) for key in reversed(keys)])
+            return self.take(order.tolist())
+        key = keys[0].__getitem__ if len(keys) == 1 else lambda i: tuple(column[i] for column in keys)
+        return self.take(sorted(range(len(self)), key=key, reverse=reverse))
+
+    def values(self, name: str) -> List[Any]:
+        """
+        Decode a column.
+
+        Args:
+            name (str): The column.
+
+        Returns:
+            List[Any]: The value of each row.
+        """
+        return list(map(self.categories[name].values.__getitem__, self.columns[name]))
+
+    def table_rows(self) -> List[list]:
+        """
+        The rows of ``ChargingStationsStatus.table_rows`` in the current order.
+
+        Timestamps are formatted once per distinct value.
+
+        Returns:
+            List[list]: Rows matching ``ChargingStationsStatus.headers``.
+        """
+        formatted = [_format_timestamp(timestamp) for timestamp in self.categories['timestamp'].values]
+        return [list(row) for row in zip(
+            self.values('charger_id'),
+            self.values('connector_id'),
+            self.values('error_code'),
+            map(formatted.__getitem__, self.columns['timestamp']),
+            self.values('info'),
+            self.values('status'),
+            self.values('ip_address'),
+        )]
@@ -1,11 +1,164 @@
 import os
 import logging
-from datetime import datetime
+import threading
+from typing import Callable, List, NamedTuple, Optional, Tuple
 from tabulate import tabulate
 
+from src.file_watcher import FileWatcher
+from src.lease_table import LeaseTable, ip_key, mac_key
+from src.timestamps import format_epoch
+
+
+class Lease:
+    """
+    One lease of the dnsmasq leases file, as text. The expiry time is formatted on first use.
+
+    DHCPv6 leases have an IAID and no MAC address.
+    """
+    __slots__ = ('expires', 'mac_address', 'ip_address', 'hostname', 'client_id', 'iaid')
+
+    def __init__(self, expires: int, mac_address: Optional[str], ip_address: str, hostname: str, client_id: str,
+                 iaid: Optional[str] = None):
+        self.expires = expires  # Seconds since the epoch
+        self.mac_address = mac_address
+        self.ip_address = ip_address
+        self.hostname = hostname
+        self.client_id = client_id  # The client DUID for DHCPv6 leases
+        self.iaid = iaid
+
+    @property
+    def lease_time(self) -> str:
+        return format_epoch(self.expires)
+
+    def to_json(self) -> dict:
+        entry = {
+            'lease_time': self.lease_time,
+            'mac_address': self.mac_address,
+            'ip_address': self.ip_address,
+            'hostname': self.hostname,
+            'client_id': self.client_id
+        }
+        if self.iaid is not None:
+            entry['iaid'] = self.iaid
+        return entry
+
+
+class LeaseDelta(NamedTuple):
+    """
+    The leases that changed between two versions of the file, by IP address.
+    """
+    added: List[Lease]
+    renewed: List[Lease]  # Same IP address, new expiry, MAC address or host name
+    expired: List[Lease]  # Gone from the file
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.renewed or self.expired)
+
+
+class LeaseSnapshot:
+    """
+    The leases parsed from one version of the file, stored as a LeaseTable.
+
+    Never modified once built, so readers holding a snapshot see a consistent view
+    while a newer one is swapped in. Lease objects are only built for the rows
+    that are looked up or displayed. A snapshot read after another takes over its
+    indexes and updates them for the changed rows while the leases keep their rows.
+    """
+    __slots__ = ('table', 'key', '_entries')
+
+    def __init__(self, table: LeaseTable, key: Optional[Tuple] = None):
+        """
+        Initializes the LeaseSnapshot instance.
+
+        Args:
+            table (LeaseTable): The leases in file order.
+            key (Tuple): Path, device, inode, mtime and size of the file they were read from.
+        """
+        self.table = table
+        self.key = key
+        self._entries: Optional[List[dict]] = None
+
+    @classmethod
+    def read(cls, filepath: str, previous: Optional['LeaseSnapshot'] = None) -> 'LeaseSnapshot':
+        """
+        Parse a leases file.
+
+        Args:
+            filepath (str): The path to the file.
+            previous (LeaseSnapshot): The snapshot of the previous version, whose indexes are reused.
+
+        Returns:
+            LeaseSnapshot: The leases, keyed by the file status at the time it was opened.
+        """
+        with open(filepath, 'rb') as file:
+            key = _stat_key(filepath, os.fstat(file.fileno()))
+            return cls(LeaseTable.read(file, previous.table if previous is not None else None), key)
+
+    def lease(self, row: int) -> Lease:
+        table = self.table
+        return Lease(table.expires[row], table.mac_address(row), table.ip_address(row), table.hostnames[row],
+                     table.client_ids[row], table.iaid(row))
+
+    def lease_for_ip(self, ip_address: str) -> Optional[Lease]:
+        row = self.table.by_ip.get(ip_key(ip_address))
+        return self.lease(row) if row is not None else None
+
+    def lease_for_mac(self, mac_address: str) -> Optional[Lease]:
+        row = self.table.by_mac.get(mac_key(mac_address))
+        return self.lease(row) if row is not None else None
+
+    @property
+    def leases(self) -> List[Lease]:
+        return [self.lease(row) for row in range(len(self.table))]
+
+    @property
+    def entries(self) -> List[dict]:
+        if self._entries is None:
+            self._entries = [lease.to_json() for lease in self.leases]
+        return self._entries
+
+    def diff(self, previous: 'LeaseSnapshot') -> LeaseDelta:
+        """
+        Compare with an earlier snapshot, by IP address.
+
+        Args:
+            previous (LeaseSnapshot): The earlier snapshot.
+
+        Returns:
+            LeaseDelta: The leases added, renewed and expired since.
+        """
+        delta = LeaseDelta([], [], [])
+        table, old = self.table, previous.table
+        rows = table.changed_rows(old)
+        if rows is not None:
+            # Same addresses in the same order: compare the columns row by row
+            first = set(table.by_ip.values())
+            delta.renewed.extend(self.lease(row) for row in rows if row in first)
+            return delta
+
+        for key, row in table.by_ip.items():
+            old_row = old.by_ip.get(key)
+            if old_row is None:
+                delta.added.append(self.lease(row))
+            elif table.record(row) != old.record(old_row):
+                delta.renewed.append(self.lease(row))
+        delta.expired.extend(previous.lease(row) for key, row in old.by_ip.items() if key not in table.by_ip)
+        return delta
+
+
+EMPTY_SNAPSHOT = LeaseSnapshot(LeaseTable.empty())
+
+
+def _stat_key(filepath: str, st: os.stat_result) -> Tuple:
+    return filepath, st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size
+
+
 class DnsmasqLeases:
     """
     Represents a handler for reading and managing dnsmasq leases.
+
+    The file is parsed again only when its inode, modification time or size
+    changed, so re-reading an unchanged file costs one stat().
     """
 
     def __init__(self, filename: str):
@@ -16,45 +169,85 @@ class DnsmasqLeases:
             filename (str): The path to the dnsmasq leases file.
         """
         self.filename = filename
-        self.entries = []
+        self.snapshot = EMPTY_SNAPSHOT
+        self.listeners: List[Callable[[LeaseDelta], None]] = []  # Called with the delta of each change
+        self.watcher: Optional[FileWatcher] = None
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self) -> List[dict]:
+        return self.snapshot.entries
+
+    @property
+    def duid(self) -> Optional[str]:
+        """
+        The DUID of the DHCPv6 server, None if the file has no DHCPv6 leases.
+        """
+        return self.snapshot.table.duid
+
+    def _paths(self) -> List[str]:
+        # The configured path, then the same file name in the working directory
+        return [self.filename, os.path.join(os.getcwd(), os.path.basename(self.filename))]
 
-    def read_leases(self) -> None:
+    def read_leases(self) -> bool:
         """
-        Reads the dnsmasq leases file and populates the entries.
+        Reads the dnsmasq leases file if it changed and replaces the entries.
+        The listeners, if any, are called with the changes.
+
+        Returns:
+            bool: True if the leases were read again.
         """
-        try:
-            self._read_file(self.filename)
-        except FileNotFoundError:
-            base_filename = os.path.basename(self.filename)
-            cwd = os.getcwd()
-            file_path = os.path.join(cwd, base_filename)
+        with self._lock:
+            previous = self.snapshot
+            self.snapshot = self._read_snapshot(previous)
+            if self.snapshot is previous:
+                return False
+            delta = self.snapshot.diff(previous) if self.listeners else None
+        if delta:
+            for listener in list(self.listeners):
+                listener(delta)
+        return True
+
+    def _read_snapshot(self, previous: LeaseSnapshot) -> LeaseSnapshot:
+        for filepath in self._paths():
             try:
-                self._read_file(file_path)
+                if _stat_key(filepath, os.stat(filepath)) == previous.key:
+                    return previous
+                return LeaseSnapshot.read(filepath, previous)
             except FileNotFoundError:
-                logging.error(f"Error: File {self.filename} not found.")
-                logging.error(f"Error: File {file_path} not found.")
+                continue
+        for filepath in self._paths():
+            logging.error(f"Error: File {filepath} not found.")
+        return EMPTY_SNAPSHOT
 
-    def _read_file(self, filepath: str) -> None:
+    def watch(self, listener: Optional[Callable[[LeaseDelta], None]] = None, **watcher_options) -> str:
         """
-        Reads a file and populates the entries.
+        Re-read the file as soon as it changes, instead of on the next ``read_leases`` call.
 
         Args:
-            filepath (str): The path to the file.
+            listener (Callable[[LeaseDelta], None]): Added to the listeners, called from the watcher thread.
+            **watcher_options: FileWatcher keyword arguments.
+
+        Returns:
+            str: The watcher backend, 'inotify' or 'poll'.
+        """
+        if listener is not None:
+            self.listeners.append(listener)
+        if self.watcher is None:
+            path = next((filepath for filepath in self._paths() if os.path.exists(filepath)), self.filename)
+            self.watcher = FileWatcher(path, self.read_leases, **watcher_options)
+            self.watcher.start()
+        return self.watcher.backend
+
+    def unwatch(self, listener: Optional[Callable[[LeaseDelta], None]] = None) -> None:
+        """
+        Remove a listener, and stop watching once none is left.
         """
-        with open(filepath, 'r') as file:
-            for line in file:
-                fields = line.split()
-                if len(fields) >= 5:
-                    lease_time, mac_address, ip_address, hostname, client_id = fields[:5]
-                    lease_time_formatted = self.convert_lease_time(lease_time)
-                    entry = {
-                        'lease_time': lease_time_formatted,
-                        'mac_address': mac_address,
-                        'ip_address': ip_address,
-                        'hostname': hostname,
-                        'client_id': client_id
-                    }
-                    self.entries.append(entry)
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+        if not self.listeners and self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
 
     def convert_lease_time(self, timestamp: str) -> str:
         """
@@ -66,7 +259,7 @@ class DnsmasqLeases:
         Returns:
             str: The formatted lease time string.
         """
-        return datetime.fromtimestamp(int(timestamp)).strftime("%y%m%d_%H%M")
+        return format_epoch(timestamp)
 
     def get_mac_from_ip(self, ip_address: str) -> str:
         """
@@ -78,10 +271,8 @@ class DnsmasqLeases:
         Returns:
             str: The MAC address or None if not found.
         """
-        for entry in self.entries:
-            if entry['ip_address'] == ip_address:
-                return entry['mac_address']
-        return None
+        lease = self.snapshot.lease_for_ip(ip_address)
+        return lease.mac_address if lease is not None else None
 
     def get_lease_time_from_ip(self, ip_address: str) -> str:
         """
@@ -93,18 +284,29 @@ class DnsmasqLeases:
         Returns:
             str: The lease time or None if not found.
         """
-        for entry in self.entries:
-            if entry['ip_address'] == ip_address:
-                return entry['lease_time']
-        return None
+        lease = self.snapshot.lease_for_ip(ip_address)
+        return lease.lease_time if lease is not None else None
+
+    def get_ip_from_mac(self, mac_address: str) -> str:
+        """
+        Gets the IP address leased to the given MAC address.
+
+        Args:
+            mac_address (str): The MAC address.
+
+        Returns:
+            str: The IP address or None if not found.
+        """
+        lease = self.snapshot.lease_for_mac(mac_address)
+        return lease.ip_address if lease is not None else None
 
     def display(self) -> None:
         """
         Displays the dnsmasq leases in a tabular format.
         """
         headers = ['Lease Time', 'MAC Address', 'IP Address', 'Hostname', 'Client ID']
-        rows = [[entry['lease_time'], entry['mac_address'], entry['ip_address'], entry['hostname'], entry['client_id']]
-                for entry in self.entries]
+        rows = [[lease.lease_time, lease.mac_address, lease.ip_address, lease.hostname, lease.client_id]
+                for lease in self.snapshot.leases]
         print(tabulate(rows, headers=headers))
 
 # Example usage:
@@ -0,0 +1,186 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+# inotify event masks, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_IGNORED = 0x00008000
+
+FILE_EVENTS = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+_libc = None
+
+
+def _inotify_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    return _libc
+
+
+def _stat_key(path: str) -> Optional[Tuple]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class FileWatcher:
+    """
+    Calls a function whenever a file is written, replaced or removed.
+
+    Uses inotify on Linux, watching the file's directory so that a file replaced
+    by a rename is followed. Elsewhere, or if inotify is unavailable, the file is
+    polled with stat(). Bursts of writes are debounced into a single call.
+    """
+
+    debounce: float = 0.1  # Seconds without further events before the callback runs
+    max_delay: float = 1.0  # Upper bound on the delay of the callback while the file keeps changing
+    poll_interval: float = 1.0  # Seconds between stat() calls of the polling backend
+    poll_timeout: float = 0.5  # Seconds a single wait for events may block
+
+    def __init__(self, path: str, callback: Callable[[], None], debounce: Optional[float] = None,
+                 poll_interval: Optional[float] = None, use_inotify: bool = True):
+        """
+        Initializes the FileWatcher instance.
+
+        Args:
+            path (str): The file to watch. It does not need to exist yet.
+            callback (Callable[[], None]): Called from the watcher thread after a change.
+            debounce (float): Overrides the class default debounce delay.
+            poll_interval (float): Overrides the class default polling interval.
+            use_inotify (bool): Try inotify before falling back to polling.
+        """
+        self.path = os.path.abspath(path)
+        self.callback = callback
+        if debounce is not None:
+            self.debounce = debounce
+        if poll_interval is not None:
+            self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.backend: Optional[str] = None  # 'inotify' or 'poll' once started
+        self.events = 0  # Changes seen
+        self.calls = 0  # Callbacks made
+        self._fd: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _open_inotify(self) -> Optional[int]:
+        if not self.use_inotify or not sys.platform.startswith('linux'):
+            return None
+        try:
+            libc = _inotify_libc()
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+            directory = os.path.dirname(self.path)
+            if libc.inotify_add_watch(fd, os.fsencode(directory), FILE_EVENTS) < 0:
+                errno = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(errno, f"{os.strerror(errno)}: {directory}")
+        except (OSError, AttributeError) as e:
+            logging.info(f"inotify unavailable for {self.path}, polling instead: {e}")
+            return None
+        return fd
+
+    def start(self) -> str:
+        """
+        Start watching.
+
+        Returns:
+            str: The backend in use, 'inotify' or 'poll'.
+        """
+        self._fd = self._open_inotify()
+        self.backend = 'inotify' if self._fd is not None else 'poll'
+        self._stop_event.clear()
+        target = self._listen if self._fd is not None else self._poll
+        self._thread = threading.Thread(target=target, name='file-watcher', daemon=True)
+        self._thread.start()
+        return self.backend
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _notify(self) -> None:
+        self.calls += 1
+        try:
+            self.callback()
+        except Exception as e:
+            logging.error(f"File watcher callback for {self.path} failed: {e}")
+
+    def _matching_events(self, data: bytes) -> Tuple[int, bool]:
+        name = os.fsencode(os.path.basename(self.path))
+        matches = 0
+        ignored = False
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            if data[offset:offset + length].rstrip(b'\0') == name:
+                matches += 1
+            ignored = ignored or bool(mask & IN_IGNORED)
+            offset += length
+        return matches, ignored
+
+    def _listen(self) -> None:
+        first_change = None  # Time of the first change not yet reported
+        last_change = None
+        try:
+            while not self._stop_event.is_set():
+                timeout = self.poll_timeout
+                if first_change is not None:
+                    deadline = min(last_change + self.debounce, first_change + self.max_delay)
+                    timeout = max(0.0, min(timeout, deadline - time.monotonic()))
+                readable, _, _ = select.select([self._fd], [], [], timeout)
+                now = time.monotonic()
+                if readable:
+                    try:
+                        matches, ignored = self._matching_events(os.read(self._fd, 65536))
+                    except BlockingIOError:
+                        matches, ignored = 0, False
+                    if ignored:
+                        # The directory is gone, nothing more will be reported
+                        logging.error(f"Stopped watching {self.path}: its directory was removed")
+                        return
+                    if matches:
+                        self.events += matches
+                        last_change = now
+                        if first_change is None:
+                            first_change = now
+                if first_change is not None and (now >= last_change + self.debounce
+                                                 or now >= first_change + self.max_delay):
+                    first_change = last_change = None
+                    self._notify()
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def _poll(self) -> None:
+        key = _stat_key(self.path)
+        while not self._stop_event.wait(self.poll_interval):
+            new_key = _stat_key(self.path)
+            if new_key != key:
+                key = new_key
+                self.events += 1
+                self._notify()
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+import shlex
+import sys
+import time
+from typing import Callable, Iterable, List, Optional, TextIO
+
+from src.command_registry import CommandNotFound
+from src.batch_executor import BatchExecutor
+from src.scheduler import JobScheduler
+from src.watch_pane import WatchPane
+
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_NOT_FOUND = 2
+
+FORMATS = ('table', 'json')
+
+
+class HeadlessScreen:
+    """
+    Stand-in for TerminalScreen used when running commands without the TUI.
+
+    Commands write to it exactly as they would to the terminal. Output is collected
+    per command so it can be written out with the command's result.
+    Interval processes run a single time, which gives watch commands snapshot semantics.
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.scheduler = JobScheduler(max_workers=1)  # Never attached, jobs commands see no jobs
+
+    def display(self, text: str) -> None:
+        if text is not None:
+            self.lines.append(text)
+
+    def display_string(self, message: str) -> None:
+        self.display(message)
+
+    def start_interval_process(self, interval_seconds: float, func: Callable[[], str], name: str = None,
+                               pane: WatchPane = None, on_cancel: Callable = None):
+        result = func()
+        if asyncio.iscoroutine(result):
+            result = asyncio.run(self._run_async(result))
+        self.display(result)
+
+    @staticmethod
+    async def _run_async(coroutine):
+        from src.async_redis_handler import close_async_redis_handlers
+
+        try:
+            return await coroutine
+        finally:
+            # Connections are bound to this short-lived loop
+            await close_async_redis_handlers()
+
+    def open_pane(self, name: str) -> WatchPane:
+        return WatchPane(name, on_change=lambda pane: self.display(pane.text))
+
+    def close_pane(self, pane: WatchPane) -> None:
+        pass
+
+    def kill_threads(self):
+        pass
+
+    def take_output(self) -> List[str]:
+        lines, self.lines = self.lines, []
+        return lines
+
+
+def read_commands(stream: TextIO) -> Iterable[str]:
+    """
+    Yield the commands in a stream, one per line, skipping blank lines and comments.
+    """
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+
+def run_command(dispatcher, cmd: str, screen: HeadlessScreen, fmt: str = 'table') -> dict:
+    """
+    Run a single command without the TUI.
+
+    Args:
+        dispatcher (CmdDispatcher): Dispatcher used to resolve the command.
+        cmd (str): The command line.
+        screen (HeadlessScreen): Screen passed to the command.
+        fmt (str): 'json' collects structured data from commands providing ``collect()``.
+
+    Returns:
+        dict: The command, its exit code, elapsed seconds, text output and structured data.
+    """
+    result = {'command': cmd, 'exit_code': EXIT_OK, 'elapsed': 0.0, 'output': None, 'data': None}
+    start = time.perf_counter()
+    try:
+        command = dispatcher.create_command(shlex.split(cmd), screen)
+        if command is None:
+            pass
+        elif fmt == 'json' and hasattr(command, 'collect'):
+            result['data'] = command.collect()
+        else:
+            output = command.execute()
+            if output:
+                screen.display(output)
+    except CommandNotFound as e:
+        result['exit_code'] = EXIT_NOT_FOUND
+        result['error'] = str(e)
+    except Exception as e:
+        logging.debug(f"Command {cmd!r} failed", exc_info=True)
+        result['exit_code'] = EXIT_FAILURE
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['elapsed'] = time.perf_counter() - start
+    lines = screen.take_output()
+    if lines:
+        result['output'] = '\n'.join(lines)
+    return result
+
+
+def write_result(result: dict, fmt: str, out: TextIO, err: TextIO) -> None:
+    if fmt == 'json':
+        out.write(json.dumps(result, default=str) + '\n')
+    else:
+        if result['output']:
+            out.write(result['output'].rstrip('\n') + '\n')
+        if result.get('error'):
+            err.write(f"{result['command']}: {result['error']}\n")
+    out.flush()
+
+
+def run_headless(dispatcher, commands: Iterable[str], fmt: str = 'table',
+                 out: Optional[TextIO] = None, err: Optional[TextIO] = None, max_workers: int = 1) -> int:
+    """
+    Run commands in this process and write their results in input order.
+
+    Args:
+        dispatcher (CmdDispatcher): Dispatcher used to resolve the commands.
+        commands (Iterable[str]): Command lines, e.g. read from stdin.
+        fmt (str): 'table' writes the command output as text, 'json' writes one JSON object per line.
+        out (TextIO): Stream for results, stdout by default.
+        err (TextIO): Stream for errors in table format, stderr by default.
+        max_workers (int): Worker pool size; independent commands run concurrently when above 1.
+
+    Returns:
+        int: 0 if every command succeeded, otherwise the highest exit code seen.
+    """
+    out = out or sys.stdout
+    err = err or sys.stderr
+    executor = BatchExecutor(lambda cmd: run_command(dispatcher, cmd, HeadlessScreen(), fmt), max_workers=max_workers)
+    exit_code = EXIT_OK
+    for batch_result in executor.iter_results(commands):
+        result = batch_result.output
+        write_result(result, fmt, out, err)
+        exit_code = max(exit_code, result['exit_code'])
+    return exit_code
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+@dataclass
+class ImportRecord:
+    """
+    One line of ``python -X importtime`` output.
+    """
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(text: str) -> List[ImportRecord]:
+    """
+    Parse the stderr produced by ``python -X importtime``.
+
+    Args:
+        text (str): Raw stderr text.
+
+    Returns:
+        List[ImportRecord]: One record per imported module, in import order.
+    """
+    records = []
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        records.append(ImportRecord(
+            name=stripped,
+            self_us=int(fields[0]),
+            cumulative_us=int(fields[1]),
+            depth=(len(name) - len(stripped) - 1) // 2,
+        ))
+    return records
+
+
+def profile_imports(statement: str, cwd: Optional[str] = None) -> List[ImportRecord]:
+    """
+    Run a statement in a fresh interpreter with ``-X importtime`` and collect the import records.
+
+    Args:
+        statement (str): Python source to execute, e.g. ``"import main"``.
+        cwd (str): Working directory of the child interpreter.
+
+    Returns:
+        List[ImportRecord]: The parsed import records.
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            cwd=cwd, env=env, stdin=subprocess.DEVNULL,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return parse_importtime(result.stderr)
+
+
+def format_report(records: List[ImportRecord], top: int = 25) -> str:
+    """
+    Format a startup import report, slowest top-level imports first.
+
+    Args:
+        records (List[ImportRecord]): Records from ``profile_imports``.
+        top (int): Number of rows to include.
+
+    Returns:
+        str: The formatted report.
+    """
+    total_us = sum(record.cumulative_us for record in records if record.depth == 0)
+    lines = [f"Startup imports: {len(records)} modules, {total_us / 1000:.1f} ms total",
+             f"{'cumulative ms':>14} {'self ms':>9}  module"]
+    for record in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        lines.append(f"{record.cumulative_us / 1000:>14.1f} {record.self_us / 1000:>9.1f}  "
+                     f"{'  ' * record.depth}{record.name}")
+    return '\n'.join(lines)
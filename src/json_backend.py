@@ -0,0 +1,76 @@
+"""
+Pluggable JSON decoding.
+
+Uses orjson when it is installed and the standard library otherwise. Both decode
+straight from bytes, so Redis payloads never need an intermediate ``str`` copy.
+"""
+import json
+from typing import Any, Callable, Dict, NamedTuple, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+class JsonBackend(NamedTuple):
+    name: str
+    loads: Callable[[Union[bytes, str]], Any]
+    # Encoder used for fingerprints, None where encoding is slower than building the models again
+    dumps: Optional[Callable[[Any], bytes]]
+
+
+BACKENDS: Dict[str, JsonBackend] = {'json': JsonBackend('json', json.loads, None)}
+if orjson is not None:
+    BACKENDS['orjson'] = JsonBackend('orjson', orjson.loads, orjson.dumps)
+
+# Both raise a subclass of json.JSONDecodeError on invalid input
+DecodeError = json.JSONDecodeError
+
+_backend: JsonBackend = BACKENDS.get('orjson', BACKENDS['json'])
+
+
+def get_backend() -> JsonBackend:
+    return _backend
+
+
+def set_backend(name: str) -> JsonBackend:
+    """
+    Select the decoder used by ``loads``.
+
+    Args:
+        name (str): 'orjson' or 'json'.
+
+    Returns:
+        JsonBackend: The previous backend, to restore it later.
+
+    Raises:
+        ValueError: If the backend is unknown or not installed.
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"JSON backend not available: {name}")
+    previous, _backend = _backend, BACKENDS[name]
+    return previous
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Decode JSON from bytes or str with the selected backend.
+    """
+    return _backend.loads(data)
+
+
+def fingerprint(obj: Any) -> Optional[int]:
+    """
+    Hash of a decoded JSON value, to tell whether part of a document changed between two payloads.
+
+    Only comparable within one process and with one backend. Equal values with a
+    different key order may hash differently.
+
+    Returns:
+        int: The hash, or None if the backend cannot encode cheaply. Callers then compare
+        the decoded values themselves.
+    """
+    dumps = _backend.dumps
+    return hash(dumps(obj)) if dumps is not None else None
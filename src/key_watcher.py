@@ -0,0 +1,180 @@
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, FrozenSet, Optional, Sequence
+
+import redis
+
+if TYPE_CHECKING:
+    from src.redis_handler import RedisHandler
+
+
+def keyspace_events_enabled(flags: str) -> bool:
+    """
+    Check whether a notify-keyspace-events setting publishes keyspace events for string writes.
+
+    Args:
+        flags (str): The value of the notify-keyspace-events server setting.
+
+    Returns:
+        bool: True if writes to string keys are published on their keyspace channels.
+    """
+    return 'K' in flags and ('A' in flags or '$' in flags)
+
+
+class KeyListener:
+    """
+    A callback registered with ``RedisHandler.watch`` for changes to some keys.
+    """
+    __slots__ = ('keys', 'callback', 'on_lost')
+
+    def __init__(self, keys: Sequence[str], callback: Callable[[], None],
+                 on_lost: Optional[Callable[[], None]] = None):
+        """
+        Initializes the KeyListener instance.
+
+        Args:
+            keys (Sequence[str]): The keys whose changes are reported.
+            callback (Callable[[], None]): Called after a burst of changes to the keys.
+            on_lost (Callable[[], None]): Called when the notifications of the keys stop.
+        """
+        self.keys: FrozenSet[str] = frozenset(keys)
+        self.callback = callback
+        self.on_lost = on_lost
+
+
+class KeyWatcher:
+    """
+    Calls a function whenever one of a set of Redis keys changes.
+
+    Subscribes to the keyspace notification channels of the keys and debounces
+    bursts of writes into a single call. The server configuration is never
+    changed: when keyspace notifications are disabled the watcher does not start
+    and the caller keeps polling.
+    """
+
+    debounce: float = 0.2  # Seconds without further changes before the callback runs
+    max_delay: float = 1.0  # Upper bound on the delay of the callback during a burst of changes
+    poll_timeout: float = 0.5  # Seconds a single wait for a message may block
+
+    def __init__(self, redis_handler: 'RedisHandler', keys: Sequence[str], callback: Callable[[], None],
+                 debounce: Optional[float] = None, on_stop: Optional[Callable[[], None]] = None,
+                 on_change: Optional[Callable[[str], None]] = None):
+        """
+        Initializes the KeyWatcher instance.
+
+        Args:
+            redis_handler (RedisHandler): The handler whose server publishes the notifications.
+            keys (Sequence[str]): The keys to watch.
+            callback (Callable[[], None]): Called from the watcher thread after a change.
+            debounce (float): Overrides the class default debounce delay.
+            on_stop (Callable[[], None]): Called from the watcher thread if it stops listening
+                without ``stop()`` being called, e.g. when the connection is lost.
+            on_change (Callable[[str], None]): Called from the watcher thread with the key of
+                each notification, without debouncing.
+        """
+        self.redis_handler = redis_handler
+        self.keys = list(keys)
+        self.callback = callback
+        self.on_stop = on_stop
+        self.on_change = on_change
+        if debounce is not None:
+            self.debounce = debounce
+        self.events = 0  # Notifications received
+        self.calls = 0  # Callbacks made
+        self._pubsub = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def notifications_enabled(self) -> bool:
+        """
+        Check the notify-keyspace-events setting of the server.
+
+        Returns:
+            bool: True if keyspace notifications cover the watched keys. False if they are
+            disabled, or if the setting cannot be read (e.g. CONFIG is not permitted).
+        """
+        try:
+            config = self.redis_handler.redis_client.config_get('notify-keyspace-events')
+        except redis.RedisError as e:
+            logging.info(f"Cannot read notify-keyspace-events, falling back to polling: {e}")
+            return False
+        return keyspace_events_enabled(config.get('notify-keyspace-events', ''))
+
+    def channels(self):
+        return list(self._keys_by_channel())
+
+    def _keys_by_channel(self):
+        db = self.redis_handler.redis_client.connection_pool.connection_kwargs.get('db', 0)
+        return {f"__keyspace@{db}__:{key}": key for key in self.keys}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """
+        Subscribe to the keyspace channels of the keys and start listening.
+
+        Returns:
+            bool: True if the watcher started, False if the caller has to poll instead.
+        """
+        if not self.notifications_enabled():
+            return False
+        try:
+            self._pubsub = self.redis_handler.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(*self.channels())
+        except redis.RedisError as e:
+            logging.error(f"Could not subscribe to keyspace notifications: {e}")
+            self._close()
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._listen, name='key-watcher', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _close(self) -> None:
+        pubsub, self._pubsub = self._pubsub, None
+        if pubsub is not None:
+            pubsub.close()
+            pubsub.connection_pool.disconnect()
+
+    def _listen(self) -> None:
+        first_change = None  # Time of the first change not yet reported
+        last_change = None
+        keys = {channel.encode(): key for channel, key in self._keys_by_channel().items()}
+        try:
+            while not self._stop_event.is_set():
+                timeout = self.poll_timeout
+                if first_change is not None:
+                    deadline = min(last_change + self.debounce, first_change + self.max_delay)
+                    timeout = max(0.0, min(timeout, deadline - time.monotonic()))
+                message = self._pubsub.get_message(timeout=timeout)
+                now = time.monotonic()
+                if message is not None and message['type'] == 'message':
+                    self.events += 1
+                    if self.on_change is not None:
+                        self.on_change(keys.get(message['channel'], message['channel']))
+                    last_change = now
+                    if first_change is None:
+                        first_change = now
+                if first_change is not None and (now >= last_change + self.debounce
+                                                 or now >= first_change + self.max_delay):
+                    first_change = last_change = None
+                    self.calls += 1
+                    self.callback()
+        except redis.RedisError as e:
+            logging.error(f"Keyspace notifications stopped: {e}")
+        finally:
+            self._close()
+            if self.on_stop is not None and not self._stop_event.is_set():
+                try:
+                    self.on_stop()
+                except Exception as e:
+                    logging.error(f"Key watcher stop callback failed: {e}")
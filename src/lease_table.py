@@ -0,0 +1,406 @@
+"""
+Compact column storage for dnsmasq leases.
+
+A lease file is read into one buffer and split in one pass. Expiry times are stored as
+int64, IPv4 addresses as packed uint32 and MAC addresses as 48-bit integers in
+``array.array`` columns; host names and client IDs are interned strings. Only the
+rows that are displayed or looked up are turned back into text.
+
+DHCPv6 leases follow the ``duid`` line of the file. Their second field is the
+IAID instead of a MAC address, and their IPv6 addresses are kept as 128-bit
+integers by row.
+"""
+import logging
+import socket
+import struct
+import sys
+from array import array
+from itertools import compress
+from operator import ne
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, Union
+
+NO_IPV4 = 0  # Placeholder in the ip column for addresses kept as text
+NO_MAC = -1  # Placeholder in the mac column for hardware addresses kept as text or absent
+IPV6_TAG = 1 << 128  # Set in the index keys of IPv6 addresses so they never equal an IPv4 key
+_LINE_MARK = b'\0'  # Ends each line among the split fields of a block
+
+_unpack_ipv4 = struct.Struct('!I').unpack
+_pack_ipv4 = struct.Struct('!I').pack
+
+
+def ipv4_to_int(text: Union[str, bytes]) -> Optional[int]:
+    """
+    Pack a dotted IPv4 address, or return None if it is not one in canonical form.
+    """
+    try:
+        if isinstance(text, bytes):
+            text = text.decode('ascii')
+        return _unpack_ipv4(socket.inet_pton(socket.AF_INET, text))[0]
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def int_to_ipv4(value: int) -> str:
+    return socket.inet_ntoa(_pack_ipv4(value))
+
+
+def ipv6_to_int(text: Union[str, bytes]) -> Optional[int]:
+    """
+    Pack an IPv6 address, or return None if it is not one.
+    """
+    try:
+        if isinstance(text, bytes):
+            text = text.decode('ascii')
+        return int.from_bytes(socket.inet_pton(socket.AF_INET6, text), 'big')
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def int_to_ipv6(value: int) -> str:
+    return socket.inet_ntop(socket.AF_INET6, value.to_bytes(16, 'big'))
+
+
+def mac_to_int(text: Union[str, bytes]) -> Optional[int]:
+    """
+    Pack a colon-separated 48-bit MAC address, or return None if it is not one.
+    """
+    if len(text) != 17:
+        return None
+    try:
+        if isinstance(text, bytes):
+            return int(text.replace(b':', b''), 16)
+        return int(text.replace(':', ''), 16)
+    except ValueError:
+        return None
+
+
+def int_to_mac(value: int) -> str:
+    digits = f"{value:012x}"
+    return ':'.join(digits[i:i + 2] for i in range(0, 12, 2))
+
+
+def ip_key(text: str) -> Hashable:
+    """
+    The index key of an IP address: its packed value for IPv4, its packed value
+    tagged with IPV6_TAG for IPv6, the text otherwise. Any spelling of an IPv6
+    address gives the same key.
+    """
+    value = ipv4_to_int(text)
+    if value is not None:
+        return value
+    value = ipv6_to_int(text)
+    return value | IPV6_TAG if value is not None else text
+
+
+def mac_key(text: str) -> Hashable:
+    """
+    The index key of a hardware address: its packed value for MAC-48, the text otherwise.
+    """
+    value = mac_to_int(text)
+    return value if value is not None else text
+
+
+def _first_rows(keys: Sequence[Hashable]) -> Dict[Hashable, int]:
+    # The first row wins when a key repeats: later rows are inserted first and overwritten
+    n = len(keys)
+    return dict(zip(reversed(keys), range(n - 1, -1, -1)))
+
+
+def _split_families(data: bytes) -> Tuple[bytes, Optional[str], bytes]:
+    # The DHCPv4 leases, the server DUID and the DHCPv6 leases written after it
+    if data.startswith(b'duid '):
+        start = 0
+    else:
+        start = data.find(b'\nduid ') + 1
+        if not start:
+            return data, None, b''
+    end = data.find(b'\n', start)
+    end = len(data) if end < 0 else end
+    fields = data[start:end].split()
+    duid = fields[1].decode('utf-8', 'replace') if len(fields) > 1 else ''
+    return data[:start], duid, data[end + 1:]
+
+
+def _columns(data: bytes, exact: bool = True) -> List[List[bytes]]:
+    """
+    The first five fields of the lease lines of a block, one list per field.
+
+    Lines with fewer than five fields are skipped. With ``exact``, the fields are
+    taken with strided slices if every line has exactly five; otherwise lines with
+    a malformed expiry time are also skipped.
+    """
+    if exact:
+        lines = data.count(b'\n') + (0 if data.endswith(b'\n') or not data else 1)
+        # End each line with a marker token: the markers are every sixth token only if every line has five fields
+        tokens = data.replace(b'\n', b' ' + _LINE_MARK + b' ').split()
+        if data and not data.endswith(b'\n'):
+            tokens.append(_LINE_MARK)
+        if len(tokens) == 6 * lines and tokens[5::6].count(_LINE_MARK) == lines == tokens.count(_LINE_MARK):
+            return [tokens[0::6], tokens[1::6], tokens[2::6], tokens[3::6], tokens[4::6]]
+    rows = []
+    for line in data.splitlines():
+        fields = line.split()
+        if len(fields) < 5:
+            continue
+        if not exact and not fields[0].isdigit():
+            logging.error(f"Skipping lease with malformed expiry time: {line.decode('utf-8', 'replace')}")
+            continue
+        rows.append(fields[:5])
+    if not rows:
+        return [[], [], [], [], []]
+    return list(map(list, zip(*rows)))
+
+
+class LeaseTable:
+    """
+    Leases in file order, one row per lease: the DHCPv4 leases, then the DHCPv6 leases.
+    """
+    __slots__ = ('expires', 'ip', 'mac', 'hostnames', 'client_ids', 'ip_text', 'mac_text', 'ip6', 'iaids',
+                 'dhcpv6_start', 'duid', 'by_ip', 'by_mac')
+
+    def __init__(self, expires: array, ip: array, mac: array, hostnames: List[str], client_ids: List[str],
+                 ip_text: Dict[int, str], mac_text: Dict[int, str], ip6: Optional[Dict[int, int]] = None,
+                 iaids: Sequence[str] = (), duid: Optional[str] = None, previous: Optional['LeaseTable'] = None):
+        """
+        Initializes the LeaseTable instance.
+
+        Args:
+            expires (array): Expiry of each lease in seconds since the epoch ('q').
+            ip (array): Packed IPv4 address of each lease, NO_IPV4 for other addresses ('I').
+            mac (array): Packed MAC address of each lease, NO_MAC for other addresses ('q').
+            hostnames (List[str]): Interned host name of each lease.
+            client_ids (List[str]): Interned client ID of each lease.
+            ip_text (Dict[int, str]): The addresses that are neither IPv4 nor IPv6, by row.
+            mac_text (Dict[int, str]): The hardware addresses that are not MAC-48, by row.
+            ip6 (Dict[int, int]): The packed IPv6 addresses, by row.
+            iaids (Sequence[str]): Interned IAID of each DHCPv6 lease, the last rows of the table.
+            duid (str): The server DUID, if the file has DHCPv6 leases.
+            previous (LeaseTable): The table of the previous version of the file, whose indexes
+                are updated for the changed rows if the leases kept their rows.
+        """
+        self.expires = expires
+        self.ip = ip
+        self.mac = mac
+        self.hostnames = hostnames
+        self.client_ids = client_ids
+        self.ip_text = ip_text
+        self.mac_text = mac_text
+        self.ip6 = ip6 if ip6 is not None else {}
+        self.iaids = list(iaids)
+        self.dhcpv6_start = len(expires) - len(self.iaids)
+        self.duid = duid
+        # Row of the first lease by address key. DHCPv6 leases have no MAC address.
+        if previous is None or not self._update_indexes(previous):
+            self._index()
+
+    def _index(self) -> None:
+        ip_keys: List[Hashable] = self.ip.tolist()
+        for row, value in self.ip_text.items():
+            ip_keys[row] = value
+        for row, value in self.ip6.items():
+            ip_keys[row] = value | IPV6_TAG
+        self.by_ip = _first_rows(ip_keys)
+        mac_keys: List[Hashable] = self.mac[:self.dhcpv6_start].tolist()
+        for row, value in self.mac_text.items():
+            mac_keys[row] = value
+        self.by_mac = _first_rows(mac_keys)
+
+    def _update_indexes(self, previous: 'LeaseTable') -> bool:
+        """
+        Take the indexes of the previous version of the file and move the keys of the
+        rows whose addresses changed. Indexes with no changed keys are shared.
+
+        Row numbers cannot be patched once leases are inserted or removed, and the
+        first of repeated addresses depends on rows that did not change, so the
+        indexes are rebuilt in either case.
+
+        Returns:
+            bool: False if the indexes must be rebuilt.
+        """
+        if len(self) != len(previous) or self.dhcpv6_start != previous.dhcpv6_start:
+            return False
+        rows = range(len(self))
+        ip_rows = set(compress(rows, map(ne, self.ip, previous.ip)))
+        ip_rows.update(self.ip_text, previous.ip_text, self.ip6, previous.ip6)
+        by_ip = _move_keys(previous.by_ip, ip_rows, previous.ip_key, self.ip_key, len(self))
+        if by_ip is None:
+            return False
+        mac_rows = set(compress(rows, map(ne, self.mac[:self.dhcpv6_start], previous.mac[:self.dhcpv6_start])))
+        mac_rows.update(self.mac_text, previous.mac_text)
+        by_mac = _move_keys(previous.by_mac, mac_rows, previous.mac_key, self.mac_key, self.dhcpv6_start)
+        if by_mac is None:
+            return False
+        self.by_ip, self.by_mac = by_ip, by_mac
+        return True
+
+    def __len__(self) -> int:
+        return len(self.expires)
+
+    @classmethod
+    def empty(cls) -> 'LeaseTable':
+        return cls(array('q'), array('I'), array('q'), [], [], {}, {})
+
+    @classmethod
+    def from_columns(cls, expires: Sequence[bytes], macs: Sequence[bytes], ips: Sequence[bytes],
+                     hostnames: Sequence[bytes], client_ids: Sequence[bytes], dhcpv6_start: Optional[int] = None,
+                     duid: Optional[str] = None, previous: Optional['LeaseTable'] = None) -> 'LeaseTable':
+        """
+        Convert the fields of the lease lines, one sequence per field, to columns.
+
+        Args:
+            dhcpv6_start (int): The first DHCPv6 lease, whose MAC address field holds the IAID.
+                None if there are only DHCPv4 leases.
+            duid (str): The server DUID.
+            previous (LeaseTable): The table of the previous version of the file.
+
+        Raises:
+            ValueError: If an expiry time is not an integer.
+        """
+        expires_column = array('q', map(int, expires))
+        ip_values = list(map(ipv4_to_int, ips))
+        ip_text = {}
+        ip6 = {}
+        for row in compress(range(len(ip_values)), map(_is_none, ip_values)):
+            ip_values[row] = NO_IPV4
+            value = ipv6_to_int(ips[row])
+            if value is not None:
+                ip6[row] = value
+            else:
+                ip_text[row] = ips[row].decode('utf-8', 'replace')
+        iaids = []
+        if dhcpv6_start is not None:
+            iaids = macs[dhcpv6_start:]
+            macs = macs[:dhcpv6_start]
+        mac_values = list(map(mac_to_int, macs))
+        mac_text = {row: macs[row].decode('utf-8', 'replace')
+                    for row in compress(range(len(mac_values)), map(_is_none, mac_values))}
+        for row in mac_text:
+            mac_values[row] = NO_MAC
+        mac_values.extend([NO_MAC] * len(iaids))
+
+        names: Dict[bytes, str] = {}
+
+        def intern(value: bytes) -> str:
+            name = names.get(value)
+            if name is None:
+                name = names[value] = sys.intern(value.decode('utf-8', 'replace'))
+            return name
+
+        return cls(expires_column, array('I', ip_values), array('q', mac_values),
+                   list(map(intern, hostnames)), list(map(intern, client_ids)), ip_text, mac_text, ip6,
+                   list(map(intern, iaids)), duid, previous)
+
+    @classmethod
+    def parse(cls, data: bytes, previous: Optional['LeaseTable'] = None) -> 'LeaseTable':
+        """
+        Parse the contents of a leases file.
+
+        Lines with fewer than five fields or a malformed expiry time are skipped.
+
+        Args:
+            previous (LeaseTable): The table of the previous version of the file.
+        """
+        v4, duid, v6 = _split_families(data)
+        try:
+            return cls._from_blocks(_columns(v4), _columns(v6), duid, previous)
+        except ValueError:
+            return cls._from_blocks(_columns(v4, exact=False), _columns(v6, exact=False), duid, previous)
+
+    @classmethod
+    def _from_blocks(cls, v4: List[List[bytes]], v6: List[List[bytes]], duid: Optional[str],
+                     previous: Optional['LeaseTable']) -> 'LeaseTable':
+        if duid is None:
+            return cls.from_columns(*v4, previous=previous)
+        return cls.from_columns(*(v4_field + v6_field for v4_field, v6_field in zip(v4, v6)),
+                                dhcpv6_start=len(v4[0]), duid=duid, previous=previous)
+
+    @classmethod
+    def read(cls, file, previous: Optional['LeaseTable'] = None) -> 'LeaseTable':
+        """
+        Read an open leases file into one buffer and parse it.
+
+        The file is not memory-mapped: dnsmasq truncates and rewrites it in place,
+        and reading a mapping past the new end of the file raises SIGBUS.
+
+        Args:
+            previous (LeaseTable): The table of the previous version of the file.
+        """
+        return cls.parse(file.read(), previous)
+
+    def ip_address(self, row: int) -> str:
+        text = self.ip_text.get(row)
+        if text is not None:
+            return text
+        value = self.ip6.get(row)
+        return int_to_ipv6(value) if value is not None else int_to_ipv4(self.ip[row])
+
+    def mac_address(self, row: int) -> Optional[str]:
+        if row >= self.dhcpv6_start:
+            return None
+        text = self.mac_text.get(row)
+        return text if text is not None else int_to_mac(self.mac[row])
+
+    def iaid(self, row: int) -> Optional[str]:
+        return self.iaids[row - self.dhcpv6_start] if row >= self.dhcpv6_start else None
+
+    def ip_key(self, row: int) -> Hashable:
+        """
+        The key of the IP address of a row in ``by_ip``.
+        """
+        text = self.ip_text.get(row)
+        if text is not None:
+            return text
+        return self.ip6[row] | IPV6_TAG if row in self.ip6 else self.ip[row]
+
+    def mac_key(self, row: int) -> Hashable:
+        """
+        The key of the hardware address of a DHCPv4 row in ``by_mac``.
+        """
+        return self.mac_text.get(row, self.mac[row])
+
+    def record(self, row: int) -> Tuple:
+        """
+        The fields of a row in comparable form.
+        """
+        return (self.expires[row], self.ip_key(row), self.mac_text.get(row, self.mac[row]), self.iaid(row),
+                self.hostnames[row], self.client_ids[row])
+
+    def changed_rows(self, other: 'LeaseTable') -> Optional[List[int]]:
+        """
+        The rows that differ from another table with the same addresses in the same order.
+
+        Returns:
+            List[int]: The differing rows, or None if the addresses or their order differ.
+        """
+        if (self.ip != other.ip or self.ip_text != other.ip_text or self.ip6 != other.ip6
+                or self.dhcpv6_start != other.dhcpv6_start):
+            return None
+        changed = set(compress(range(len(self)), map(ne, self.expires, other.expires)))
+        changed.update(compress(range(len(self)), map(ne, self.mac, other.mac)))
+        changed.update(compress(range(len(self)), map(ne, self.hostnames, other.hostnames)))
+        changed.update(compress(range(len(self)), map(ne, self.client_ids, other.client_ids)))
+        changed.update(compress(range(self.dhcpv6_start, len(self)), map(ne, self.iaids, other.iaids)))
+        changed.update(row for row in set(self.mac_text) | set(other.mac_text)
+                       if self.mac_text.get(row) != other.mac_text.get(row))
+        return sorted(changed)
+
+
+def _is_none(value) -> bool:
+    return value is None
+
+
+def _move_keys(index: Dict[Hashable, int], rows: Iterable[int], old_key: Callable[[int], Hashable],
+               new_key: Callable[[int], Hashable], size: int) -> Optional[Dict[Hashable, int]]:
+    # A copy of the index with the keys of the rows updated, or None if keys repeat in the
+    # new version: the first row of a key may then be one whose key did not change
+    changed = [row for row in rows if row < size and old_key(row) != new_key(row)]
+    if not changed:
+        return index
+    index = dict(index)
+    for row in changed:
+        key = old_key(row)
+        if index.get(key) == row:
+            del index[key]
+    for row in changed:
+        index[new_key(row)] = row
+    return index if len(index) == size else None
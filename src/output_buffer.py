@@ -0,0 +1,145 @@
+from typing import List, Optional
+
+from prompt_toolkit.data_structures import Point
+from prompt_toolkit.formatted_text import StyleAndTextTuples
+from prompt_toolkit.layout.containers import Window
+from prompt_toolkit.layout.controls import UIControl, UIContent
+from prompt_toolkit.mouse_events import MouseEvent, MouseEventType
+
+
+class OutputBuffer:
+    """
+    Bounded ring buffer of output lines.
+
+    Appending costs time proportional to the appended text. Once ``max_lines``
+    is reached the oldest lines are overwritten.
+    """
+
+    def __init__(self, max_lines: int = 10000):
+        """
+        Initializes the OutputBuffer instance.
+
+        Args:
+            max_lines (int): Scrollback limit in lines.
+        """
+        if max_lines < 1:
+            raise ValueError("max_lines must be at least 1")
+        self.max_lines = max_lines
+        self._lines: List[Optional[str]] = [None] * max_lines
+        self._start = 0
+        self._count = 0
+        self.dropped = 0  # Total number of lines evicted so far
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("OutputBuffer index out of range")
+        return self._lines[(self._start + index) % self.max_lines]
+
+    def append(self, text: str) -> None:
+        """
+        Append text, one entry per line.
+
+        Args:
+            text (str): The text to append.
+        """
+        for line in text.split('\n'):
+            if self._count < self.max_lines:
+                self._lines[(self._start + self._count) % self.max_lines] = line
+                self._count += 1
+            else:
+                self._lines[self._start] = line
+                self._start = (self._start + 1) % self.max_lines
+                self.dropped += 1
+
+    def clear(self) -> None:
+        self.dropped += self._count
+        self._lines = [None] * self.max_lines
+        self._start = 0
+        self._count = 0
+
+    @property
+    def text(self) -> str:
+        return '\n'.join(self[i] for i in range(self._count))
+
+
+class OutputControl(UIControl):
+    """
+    Read-only prompt_toolkit control rendering an OutputBuffer.
+
+    Only the lines visible in the window are materialised on render. The view
+    follows the newest line until the user scrolls up with the mouse wheel, and
+    follows again once scrolled back to the bottom.
+    """
+
+    scroll_lines: int = 3  # Lines moved per mouse wheel step
+
+    def __init__(self, buffer: OutputBuffer):
+        self.buffer = buffer
+        self.window: Optional[Window] = None
+        self._bottom: Optional[int] = None  # Absolute number of the bottom line, None follows the tail
+
+    @property
+    def following(self) -> bool:
+        return self._bottom is None
+
+    def _bottom_row(self) -> int:
+        last = max(len(self.buffer) - 1, 0)
+        if self._bottom is None:
+            return last
+        return min(max(self._bottom - self.buffer.dropped, 0), last)
+
+    def scroll(self, lines: int) -> None:
+        """
+        Move the bottom of the view by a number of lines, negative values scroll up.
+        """
+        row = self._bottom_row() + lines
+        if row >= len(self.buffer) - 1:
+            self._bottom = None
+        else:
+            self._bottom = self.buffer.dropped + max(row, 0)
+
+    def create_content(self, width: int, height: int) -> UIContent:
+        buffer = self.buffer
+        if self.window is not None:
+            # Let the window scroll so that the cursor line ends up at the bottom
+            self.window.vertical_scroll = 0
+
+        def get_line(i: int) -> StyleAndTextTuples:
+            try:
+                return [('', buffer[i])]
+            except IndexError:
+                return []
+
+        return UIContent(get_line=get_line, line_count=len(buffer),
+                         cursor_position=Point(x=0, y=self._bottom_row()), show_cursor=False)
+
+    def mouse_handler(self, mouse_event: MouseEvent):
+        if mouse_event.event_type == MouseEventType.SCROLL_UP:
+            self.scroll(-self.scroll_lines)
+            return None
+        if mouse_event.event_type == MouseEventType.SCROLL_DOWN:
+            self.scroll(self.scroll_lines)
+            return None
+        return NotImplemented
+
+
+def create_output_window(buffer: OutputBuffer, style: str = '') -> Window:
+    """
+    Create the window showing an OutputBuffer.
+
+    Args:
+        buffer (OutputBuffer): The buffer to render.
+        style (str): Window style.
+
+    Returns:
+        Window: The window, with its OutputControl as ``content``.
+    """
+    control = OutputControl(buffer)
+    window = Window(content=control, style=style, wrap_lines=True)
+    control.window = window
+    return window
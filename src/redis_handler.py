@@ -1,10 +1,272 @@
 import redis
 import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    from src.key_watcher import KeyListener
+
+
+class CacheEntry:
+    """
+    A cached value with the objects parsed from it.
+
+    The version changes only when the value does, so parsed objects stay valid
+    across refetches of an unchanged value. An entry replacing one for the same key
+    keeps the objects parsed from the old value, for incremental parsing.
+    """
+    __slots__ = ('key', 'value', 'version', 'expires', 'parsed', 'previous')
+
+    def __init__(self, key: str, value: Optional[bytes], version: int, expires: float):
+        self.key = key
+        self.value = value
+        self.version = version
+        self.expires = expires
+        self.parsed: Dict[str, Any] = {}
+        self.previous: Dict[str, Any] = {}  # Objects parsed from the value this entry replaced
+
+
+class ValueCache:
+    """
+    LRU cache of raw Redis values and of the objects parsed from them.
+
+    Entries expire after ``ttl`` seconds, or after ``tracked_ttl`` for keys whose
+    changes are pushed by keyspace notifications and invalidate them right away.
+    Expired entries are kept until evicted so an unchanged value keeps its version
+    and parsed objects when it is fetched again.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float = 1.0, tracked_ttl: float = 30.0):
+        """
+        Initializes the ValueCache instance.
+
+        Args:
+            max_entries (int): Number of keys kept before the least recently used is evicted.
+            ttl (float): Seconds a value is served without invalidation.
+            tracked_ttl (float): Seconds a value is served while its key is tracked, as a safety net.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.tracked_ttl = tracked_ttl
+        self.tracked: set = set()
+        self.hits = 0
+        self.misses = 0
+        self.parse_hits = 0
+        self.parse_misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._versions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Look up a fresh entry, counting a hit or a miss.
+
+        Returns:
+            CacheEntry: The entry, or None if the key is missing, expired or invalidated.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires <= time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def lookup(self, keys: Sequence[str]) -> Tuple[List[Optional[CacheEntry]], List[str], List[int]]:
+        """
+        Look up several keys at once.
+
+        Returns:
+            The entries in the order of the keys with None for misses, the missed
+            keys, and their generations to pass to ``fill`` with the fetched values.
+        """
+        entries = [self.get(key) for key in keys]
+        missed_keys = [key for key, entry in zip(keys, entries) if entry is None]
+        return entries, missed_keys, [self.generation(key) for key in missed_keys]
+
+    def fill(self, entries: List[Optional[CacheEntry]], missed_keys: List[str], generations: List[int],
+             values: Sequence[Optional[bytes]]) -> List[CacheEntry]:
+        """
+        Store the values fetched for the misses of ``lookup`` and put their entries in place.
+        """
+        fetched = iter(zip(missed_keys, generations, values))
+        for i, entry in enumerate(entries):
+            if entry is None:
+                key, generation, value = next(fetched)
+                entries[i] = self.put(key, value, generation)
+        return entries
+
+    def generation(self, key: str) -> int:
+        """
+        The invalidation count of a key, taken before a fetch and passed to ``put``.
+        """
+        return self._generations.get(key, 0)
+
+    def put(self, key: str, value: Optional[bytes], generation: Optional[int] = None) -> CacheEntry:
+        """
+        Store a fetched value.
+
+        Args:
+            key (str): The Redis key.
+            value (bytes): The raw value, None for a missing key.
+            generation (int): The key's generation before the fetch. If the key was
+                invalidated since, the value may be stale and is not cached.
+
+        Returns:
+            CacheEntry: The entry for the value, reusing the previous one if the value is unchanged.
+        """
+        with self._lock:
+            now = time.monotonic()
+            ttl = self.tracked_ttl if key in self.tracked else self.ttl
+            stale = generation is not None and generation != self._generations.get(key, 0)
+            previous = self._entries.get(key)
+            if previous is not None and previous.value == value:
+                entry = previous
+            else:
+                self._versions += 1
+                entry = CacheEntry(key, value, self._versions, now)
+                if previous is not None:
+                    entry.previous = previous.parsed
+            if stale:
+                return entry
+            entry.expires = now + ttl
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return entry
+
+    def parsed(self, entry: CacheEntry, name: str, parse: Callable[[Optional[bytes]], Any],
+               update: Optional[Callable[[Optional[bytes], Any], Any]] = None) -> Any:
+        """
+        Get an object parsed from an entry's value, parsing it only once per version.
+
+        The object is shared by every caller and must be treated as read-only.
+
+        Args:
+            entry (CacheEntry): The entry.
+            name (str): Name of the parsed form, e.g. the model class.
+            parse (Callable): Builds the object from the raw value.
+            update (Callable): Builds the object from the raw value and the object of
+                the same name parsed from the previous value, when there is one.
+
+        Returns:
+            The parsed object.
+        """
+        try:
+            value = entry.parsed[name]
+        except KeyError:
+            self.parse_misses += 1
+            previous = entry.previous.get(name)
+            if update is not None and previous is not None:
+                value = update(entry.value, previous)
+            else:
+                value = parse(entry.value)
+            entry.parsed[name] = value
+            return value
+        self.parse_hits += 1
+        return value
+
+    def invalidate(self, keys: Optional[Sequence[str]] = None) -> None:
+        """
+        Expire some keys, or all of them, so the next lookup fetches again.
+        """
+        with self._lock:
+            for key in (list(self._entries) if keys is None else keys):
+                self._generations[key] = self._generations.get(key, 0) + 1
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.expires = 0.0
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else None,
+            'parse_hits': self.parse_hits,
+            'parse_misses': self.parse_misses,
+            'invalidations': self.invalidations,
+            'evictions': self.evictions,
+            'tracked_keys': sorted(self.tracked),
+        }
+
+
+class CircuitBreaker:
+    """
+    Remembers a failing endpoint so it is not tried again until a cooldown has passed.
+
+    After the cooldown the breaker is half-open: one more attempt is allowed, and
+    it either closes the breaker or opens it for another cooldown.
+    """
+
+    def __init__(self, cooldown: float = 30.0, failure_threshold: int = 1):
+        """
+        Initializes the CircuitBreaker instance.
+
+        Args:
+            cooldown (float): Seconds an endpoint is skipped after failing.
+            failure_threshold (int): Consecutive failures that open the breaker.
+        """
+        self.cooldown = cooldown
+        self.failure_threshold = failure_threshold
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        opened_at = self.opened_at
+        if opened_at is None:
+            return 'closed'
+        return 'half-open' if time.monotonic() - opened_at >= self.cooldown else 'open'
+
+    def allow(self) -> bool:
+        return self.state != 'open'
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
 
 
 class RedisHandler:
+    max_connections: int = 8  # Pool size per server
+    socket_timeout: float = 2.0  # Seconds to wait for a reply
+    socket_connect_timeout: float = 1.0  # Seconds to wait for the TCP connect
+    health_check_interval: int = 30  # Ping idle connections older than this many seconds before reuse
+    cache_size: int = 128  # Keys kept by the client-side cache
+    cache_ttl: float = 1.0  # Seconds cached values are served when their keys are not tracked
+    breaker_cooldown: float = 30.0  # Seconds a failed endpoint is skipped by connects on the command path
+    reconnect_interval: float = 5.0  # Seconds between background reconnect attempts while disconnected
+
     def __init__(self, host='localhost', port=6379, db=0, password=None, external_host=None, external_port=None,
-                 external_password=None):
+                 external_password=None, max_connections=None, socket_timeout=None, socket_connect_timeout=None,
+                 health_check_interval=None, cache_size=None, cache_ttl=None, breaker_cooldown=None,
+                 reconnect_interval=None):
         self.local_config = {
             'host': host,
             'port': port,
@@ -17,31 +279,189 @@ class RedisHandler:
             'db': db,
             'password': external_password
         } if external_host and external_port else None
-        self.redis_client = self.connect()
+        self.pool_options = {
+            'max_connections': max_connections if max_connections is not None else self.max_connections,
+            'socket_timeout': socket_timeout if socket_timeout is not None else self.socket_timeout,
+            'socket_connect_timeout': (socket_connect_timeout if socket_connect_timeout is not None
+                                       else self.socket_connect_timeout),
+            'health_check_interval': (health_check_interval if health_check_interval is not None
+                                      else self.health_check_interval),
+        }
+        self.endpoints: List[Tuple[str, dict]] = [('local', self.local_config)]
+        if self.external_config:
+            self.endpoints.insert(0, ('external', self.external_config))
+        cooldown = breaker_cooldown if breaker_cooldown is not None else self.breaker_cooldown
+        self.breakers = {name: CircuitBreaker(cooldown) for name, _ in self.endpoints}
+        if reconnect_interval is not None:
+            self.reconnect_interval = reconnect_interval
+        self.endpoint: Optional[str] = None  # Name of the connected endpoint
+        self.pool: Optional[redis.ConnectionPool] = None
+        self._client: Optional[redis.StrictRedis] = None
+        self._connect_lock = threading.Lock()
+        self._reconnect_thread: Optional[threading.Thread] = None
+        self._reconnect_stop = threading.Event()
+        self.cache = ValueCache(max_entries=cache_size if cache_size is not None else self.cache_size,
+                                ttl=cache_ttl if cache_ttl is not None else self.cache_ttl)
+        self._watchers = []
+        self._track_attempted = set()
+        self._listeners = []
 
-    def connect(self):
+    @property
+    def redis_client(self) -> redis.StrictRedis:
         """
-        Establish a connection to the Redis server.
-        First try the external configuration, then fall back to local.
+        The client, connected on first use. Failed connects are retried on the next access.
         """
-        if self.external_config:
-            try:
-                client = redis.StrictRedis(**self.external_config)
-                client.ping()
-                logging.info("Connected to external Redis server successfully")
-                return client
-            except redis.ConnectionError as e:
-                logging.error(f"Could not connect to external Redis server: {e}")
-
-        # Fall back to local Redis connection
+        client = self._client
+        if client is None:
+            with self._connect_lock:
+                if self._client is None:
+                    self._client = self.connect()
+                client = self._client
+        return client
+
+    def _create_client(self, config: dict) -> redis.StrictRedis:
+        pool = redis.ConnectionPool(**config, **self.pool_options)
+        client = redis.StrictRedis(connection_pool=pool)
         try:
-            client = redis.StrictRedis(**self.local_config)
             client.ping()
-            logging.info("Connected to local Redis server successfully")
-            return client
-        except redis.ConnectionError as e:
-            logging.error(f"Could not connect to local Redis server: {e}")
-            raise e
+        except Exception:
+            pool.disconnect()
+            raise
+        return client
+
+    def _probe(self, name: str, config: dict) -> redis.StrictRedis:
+        try:
+            client = self._create_client(config)
+        except Exception as e:
+            self.breakers[name].record_failure()
+            logging.error(f"Could not connect to {name} Redis server: {e}")
+            if isinstance(e, redis.RedisError):
+                raise
+            # A peer that is not a Redis server can break the handshake in other ways
+            raise redis.ConnectionError(f"Bad reply from {name} Redis server: {e}") from e
+        self.breakers[name].record_success()
+        return client
+
+    def _probe_all(self, endpoints: List[Tuple[str, dict]]) -> Tuple[str, redis.StrictRedis]:
+        """
+        Probe endpoints in parallel and keep the first one that answers.
+        """
+        if len(endpoints) == 1:
+            name, config = endpoints[0]
+            return name, self._probe(name, config)
+
+        lock = threading.Lock()
+        done = threading.Event()
+        outcome = {'winner': None, 'failed': 0, 'error': None}
+
+        def probe(name: str, config: dict):
+            try:
+                client = self._probe(name, config)
+            except redis.RedisError as e:
+                with lock:
+                    outcome['failed'] += 1
+                    outcome['error'] = e
+                    if outcome['failed'] == len(endpoints):
+                        done.set()
+                return
+            with lock:
+                if outcome['winner'] is None:
+                    outcome['winner'] = name, client
+                    done.set()
+                    return
+            # Lost the race, a slower healthy endpoint is not needed
+            client.connection_pool.disconnect()
+
+        for name, config in endpoints:
+            threading.Thread(target=probe, args=(name, config), name=f'redis-probe-{name}', daemon=True).start()
+        done.wait()
+        if outcome['winner'] is None:
+            raise outcome['error']
+        return outcome['winner']
+
+    def connect(self):
+        """
+        Establish a pooled connection to the Redis server.
+        Probe the external and local configurations in parallel and use the first
+        that answers. Endpoints that failed within the breaker cooldown are skipped.
+        If no endpoint answers, a background loop keeps trying to reconnect.
+        """
+        endpoints = [(name, config) for name, config in self.endpoints if self.breakers[name].allow()]
+        if not endpoints:
+            self._start_reconnect()
+            raise redis.ConnectionError("No Redis server reachable, waiting for the breaker cooldown")
+        try:
+            name, client = self._probe_all(endpoints)
+        except redis.RedisError:
+            self._start_reconnect()
+            raise
+        self.endpoint = name
+        self.pool = client.connection_pool
+        logging.info(f"Connected to {name} Redis server successfully")
+        return client
+
+    def _start_reconnect(self) -> None:
+        thread = self._reconnect_thread
+        if thread is not None and thread.is_alive():
+            return
+        self._reconnect_thread = threading.Thread(target=self._reconnect_loop, args=(self._reconnect_stop,),
+                                                  name='redis-reconnect', daemon=True)
+        self._reconnect_thread.start()
+
+    def _reconnect_loop(self, stop_event: threading.Event) -> None:
+        # Probes ignore the breakers: commands are not waiting on them
+        while not stop_event.wait(self.reconnect_interval):
+            if self._client is not None:
+                return
+            try:
+                name, client = self._probe_all(self.endpoints)
+            except redis.RedisError:
+                continue
+            with self._connect_lock:
+                if self._client is None and not stop_event.is_set():
+                    self.endpoint = name
+                    self.pool = client.connection_pool
+                    self._client = client
+                    logging.info(f"Reconnected to {name} Redis server")
+                    return
+            client.connection_pool.disconnect()
+            return
+
+    def close(self):
+        """
+        Stop cache tracking and disconnect every pooled connection. The next access connects again.
+        """
+        self._reconnect_stop.set()
+        self._reconnect_stop = threading.Event()
+        for watcher in self._watchers:
+            watcher.stop()
+        self._watchers = []
+        self._listeners = []
+        self._track_attempted.clear()
+        self.cache.tracked.clear()
+        self.cache.clear()
+        with self._connect_lock:
+            if self.pool is not None:
+                self.pool.disconnect()
+            self.pool = None
+            self._client = None
+            self.endpoint = None
+
+    def pubsub(self, **kwargs) -> redis.client.PubSub:
+        """
+        Create a PubSub object on a connection of its own to the connected server.
+
+        A subscription holds its connection for as long as it lasts, so it is kept
+        out of the command pool, where it would leave fewer connections for commands.
+
+        Args:
+            **kwargs: PubSub keyword arguments, e.g. ``ignore_subscribe_messages``.
+
+        Returns:
+            redis.client.PubSub: The PubSub object. Closing it disconnects its connection.
+        """
+        pool = redis.ConnectionPool(**self.redis_client.connection_pool.connection_kwargs, max_connections=1)
+        return redis.client.PubSub(pool, **kwargs)
 
     def get_value(self, key):
         """
@@ -54,6 +474,141 @@ class RedisHandler:
             logging.error(f"Error retrieving key {key} from Redis: {e}")
             return None
 
+    def get_many(self, keys: Sequence[str], raw: bool = True) -> List[Optional[Union[bytes, str]]]:
+        """
+        Retrieve several values in one round trip with MGET.
+
+        Args:
+            keys (Sequence[str]): The keys to fetch.
+            raw (bool): Return the payloads as bytes, without decoding them.
+
+        Returns:
+            List: The values in the order of the keys, None for missing keys.
+            All values are None if Redis fails.
+        """
+        if not keys:
+            return []
+        try:
+            values = self.redis_client.mget(keys)
+        except redis.RedisError as e:
+            logging.error(f"Error retrieving keys {', '.join(keys)} from Redis: {e}")
+            return [None] * len(keys)
+        if raw:
+            return values
+        return [value.decode('utf-8') if value is not None else None for value in values]
+
+    def track(self, keys: Sequence[str]) -> bool:
+        """
+        Invalidate cached values of keys as soon as the server publishes a change to them.
+
+        Uses keyspace notifications if the server has them enabled. Otherwise the
+        cached values keep expiring after the cache TTL. Each key is only tried once.
+        The same subscription reports the changes to the listeners added with ``watch``.
+
+        Args:
+            keys (Sequence[str]): The keys to track.
+
+        Returns:
+            bool: True if all the keys are tracked.
+        """
+        from src.key_watcher import KeyWatcher
+
+        new_keys = [key for key in keys if key not in self._track_attempted]
+        if new_keys:
+            self._track_attempted.update(new_keys)
+            # Invalidate on each notification, a stale value must not be served for the debounce time.
+            # The listeners are called once per burst of changes.
+            watcher = KeyWatcher(self, new_keys, lambda: self._notify(new_keys),
+                                 on_stop=lambda: self._untrack(watcher),
+                                 on_change=lambda key: self.cache.invalidate([key]))
+            if watcher.start():
+                self._watchers.append(watcher)
+                self.cache.tracked.update(new_keys)
+                self.cache.invalidate(new_keys)
+        return self.tracked(keys)
+
+    def tracking_attempted(self, keys: Sequence[str]) -> bool:
+        """
+        Check whether ``track`` already tried all the keys, and has not lost them since.
+        """
+        return self._track_attempted.issuperset(keys)
+
+    def _untrack(self, watcher) -> None:
+        # The notifications of the watcher's keys stopped: expire their values at the
+        # short TTL again, and let the next track() subscribe to them again
+        if watcher in self._watchers:
+            self._watchers.remove(watcher)
+        self.cache.tracked.difference_update(watcher.keys)
+        self._track_attempted.difference_update(watcher.keys)
+        self.cache.invalidate(watcher.keys)
+        for listener in list(self._listeners):
+            if listener.on_lost is not None and not listener.keys.isdisjoint(watcher.keys):
+                self._call(listener.on_lost)
+
+    def watch(self, keys: Sequence[str], callback: Callable[[], None],
+              on_lost: Optional[Callable[[], None]] = None) -> 'KeyListener':
+        """
+        Call a function when tracked keys change, through the subscription of ``track``.
+
+        Every listener shares that one subscription, so watching costs no connection
+        or thread of its own. Changes are reported while the keys are tracked, i.e.
+        after a ``track`` call for them succeeded.
+
+        Args:
+            keys (Sequence[str]): The keys to watch.
+            callback (Callable[[], None]): Called from the watcher thread after a burst of changes.
+            on_lost (Callable[[], None]): Called from the watcher thread when the notifications
+                of the keys stop. The next ``track`` call subscribes again.
+
+        Returns:
+            KeyListener: The listener, to pass to ``unwatch``.
+        """
+        from src.key_watcher import KeyListener
+
+        listener = KeyListener(keys, callback, on_lost)
+        self._listeners.append(listener)
+        return listener
+
+    def unwatch(self, listener: 'KeyListener') -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def tracked(self, keys: Sequence[str]) -> bool:
+        """
+        Check whether changes to all the keys are pushed by keyspace notifications.
+        """
+        return self.cache.tracked.issuperset(keys)
+
+    def _notify(self, keys: Sequence[str]) -> None:
+        for listener in list(self._listeners):
+            if not listener.keys.isdisjoint(keys):
+                self._call(listener.callback)
+
+    @staticmethod
+    def _call(callback: Callable[[], None]) -> None:
+        try:
+            callback()
+        except Exception as e:
+            logging.error(f"Key listener failed: {e}")
+
+    def get_many_cached(self, keys: Sequence[str]) -> List[CacheEntry]:
+        """
+        Retrieve several values through the client-side cache, fetching all misses with one MGET.
+
+        Args:
+            keys (Sequence[str]): The keys to fetch.
+
+        Returns:
+            List[CacheEntry]: The entries in the order of the keys.
+
+        Raises:
+            redis.RedisError: If the misses cannot be fetched.
+        """
+        entries, missed_keys, generations = self.cache.lookup(keys)
+        if missed_keys:
+            self.cache.fill(entries, missed_keys, generations, self.redis_client.mget(missed_keys))
+        return entries
+
     def set_value(self, key, value):
         """
         Set a value in Redis by key.
@@ -87,9 +642,48 @@ class RedisHandler:
             logging.error(f"Error checking existence of key {key} in Redis: {e}")
             return False
 
+
+_handlers: Dict[Tuple, RedisHandler] = {}
+_handlers_lock = threading.Lock()
+
+
+def get_redis_handler(**config) -> RedisHandler:
+    """
+    Get the process-wide RedisHandler for a configuration.
+
+    Handlers and their connection pools are shared by every command and watch
+    tick, so only the first use of a configuration pays for the connect.
+
+    Args:
+        **config: RedisHandler keyword arguments.
+
+    Returns:
+        RedisHandler: The shared handler.
+    """
+    key = tuple(sorted(config.items()))
+    with _handlers_lock:
+        handler = _handlers.get(key)
+        if handler is None:
+            handler = _handlers[key] = RedisHandler(**config)
+    return handler
+
+
+def close_redis_handlers():
+    """
+    Close and forget every shared handler.
+    """
+    with _handlers_lock:
+        handlers = list(_handlers.values())
+        _handlers.clear()
+    for handler in handlers:
+        handler.close()
+
 # Example usage:
 # For external Redis server, provide external_host, external_port, and external_password
 # redis_handler = RedisHandler(external_host='external_host', external_port=6379, external_password='external_password')
 
 # For local Redis server
 # redis_handler = RedisHandler()
+
+# Shared by all commands, with its connection pool
+# redis_handler = get_redis_handler()
@@ -0,0 +1,285 @@
+import asyncio
+import itertools
+import logging
+import math
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+class JobNotFound(Exception):
+    """
+    Raised when a job reference does not match any scheduled job.
+    """
+
+
+class Job:
+    """
+    A function run periodically by the JobScheduler, with its runtime statistics.
+    """
+
+    history: int = 100  # Number of recent durations kept for the p95
+
+    def __init__(self, job_id: int, name: str, func: Callable[[], Any], interval: float,
+                 jitter: float = 0.0, sink: Optional[Callable[[Any], None]] = None, blocking: bool = True,
+                 on_cancel: Optional[Callable[['Job'], None]] = None):
+        self.id = job_id
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.sink = sink
+        self.blocking = blocking
+        self.on_cancel = on_cancel
+        self.ticks = 0
+        self.overruns = 0  # Ticks skipped because the previous one ran too long
+        self.total_duration = 0.0
+        self.last_duration: Optional[float] = None
+        self.durations: Deque[float] = deque(maxlen=self.history)
+        self.task: Optional[asyncio.Task] = None
+        self.scheduler: Optional['JobScheduler'] = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.paused = False
+        self.cancelled = False
+
+    def __repr__(self) -> str:
+        return f"Job(id={self.id}, name={self.name!r}, interval={self.interval})"
+
+    @property
+    def state(self) -> str:
+        if self.cancelled:
+            return 'killed'
+        return 'paused' if self.paused else 'running'
+
+    @property
+    def mean_duration(self) -> Optional[float]:
+        return self.total_duration / self.ticks if self.ticks else None
+
+    @property
+    def p95_duration(self) -> Optional[float]:
+        if not self.durations:
+            return None
+        durations = sorted(self.durations)
+        return durations[min(len(durations) - 1, math.ceil(0.95 * len(durations)) - 1)]
+
+    def trigger(self) -> None:
+        """
+        Run the next tick now instead of waiting for the interval. Safe to call from any thread.
+        """
+        if self.scheduler is not None:
+            self.scheduler.trigger(self)
+
+    def record(self, duration: float) -> None:
+        """
+        Add the duration of a finished tick to the statistics.
+
+        Args:
+            duration (float): Execution time of the tick in seconds.
+        """
+        self.ticks += 1
+        self.total_duration += duration
+        self.last_duration = duration
+        self.durations.append(duration)
+
+
+class JobScheduler:
+    """
+    Runs periodic jobs as tasks on a single asyncio event loop.
+
+    Ticks are scheduled at fixed times (start + n * interval) so they do not drift
+    by the time the work takes. When a tick overruns the following ones are
+    skipped rather than queued. Blocking functions run on a bounded thread pool.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        """
+        Initializes the JobScheduler instance.
+
+        Args:
+            max_workers (int): Size of the thread pool used for blocking jobs.
+        """
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.jobs: Dict[int, Job] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[Job] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def attach(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        Bind the scheduler to an event loop and start the jobs added before.
+
+        Must be called from the loop's thread, e.g. as the prompt_toolkit ``pre_run`` hook.
+        """
+        with self._lock:
+            self.loop = loop or asyncio.get_running_loop()
+            pending, self._pending = self._pending, []
+        for job in pending:
+            self._start(job)
+
+    def detach(self) -> None:
+        self.cancel_all()
+        with self._lock:
+            self.loop = None
+
+    def add_job(self, func: Callable[[], Any], interval: float, name: Optional[str] = None,
+                jitter: float = 0.0, sink: Optional[Callable[[Any], None]] = None,
+                blocking: Optional[bool] = None, on_cancel: Optional[Callable[[Job], None]] = None) -> Job:
+        """
+        Schedule a function to run every ``interval`` seconds. Safe to call from any thread.
+
+        Args:
+            func (Callable): The function to run. Coroutine functions are awaited on the loop.
+            interval (float): Seconds between tick start times.
+            name (str): Name of the job, defaults to the function name.
+            jitter (float): Maximum random delay in seconds added to each tick.
+            sink (Callable): Called on the loop with the function's return value.
+            blocking (bool): Run the function on the thread pool. Defaults to True for
+                plain functions and False for coroutine functions.
+            on_cancel (Callable): Called with the job once it has been cancelled.
+
+        Returns:
+            Job: The scheduled job.
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if blocking is None:
+            blocking = not asyncio.iscoroutinefunction(func)
+        job = Job(next(self._ids), name or getattr(func, '__name__', 'job'), func, interval,
+                  jitter=jitter, sink=sink, blocking=blocking, on_cancel=on_cancel)
+        job.scheduler = self
+        with self._lock:
+            self.jobs[job.id] = job
+            loop = self.loop
+            if loop is None:
+                self._pending.append(job)
+                return job
+        loop.call_soon_threadsafe(self._start, job)
+        return job
+
+    def _start(self, job: Job) -> None:
+        if not job.cancelled:
+            job.task = self.loop.create_task(self._run(job))
+
+    def find(self, ref: str) -> Job:
+        """
+        Look up a scheduled job by ID or name.
+
+        Args:
+            ref (str): The job ID, or its name if no ID matches.
+
+        Returns:
+            Job: The job.
+
+        Raises:
+            JobNotFound: If no scheduled job matches.
+        """
+        with self._lock:
+            jobs = list(self.jobs.values())
+        if ref.isdigit():
+            for job in jobs:
+                if job.id == int(ref):
+                    return job
+        for job in jobs:
+            if job.name == ref:
+                return job
+        raise JobNotFound(f"No such job: {ref}")
+
+    def pause(self, job: Job) -> None:
+        """
+        Skip the ticks of a job until it is resumed. A tick already running finishes.
+        """
+        job.paused = True
+
+    def resume(self, job: Job) -> None:
+        job.paused = False
+
+    def trigger(self, job: Job) -> None:
+        """
+        Run the next tick of a job now. Triggers arriving while a tick runs are
+        coalesced into one more tick, and the interval restarts from the triggered tick.
+        """
+        with self._lock:
+            loop = self.loop
+        if loop is not None and not loop.is_closed() and not job.cancelled:
+            loop.call_soon_threadsafe(self._wake, job)
+
+    @staticmethod
+    def _wake(job: Job) -> None:
+        if job.wakeup is not None:
+            job.wakeup.set()
+
+    def cancel(self, job: Job) -> None:
+        """
+        Stop a job. Safe to call from any thread; a tick already running finishes.
+        """
+        with self._lock:
+            if job.cancelled:
+                return
+            job.cancelled = True
+            self.jobs.pop(job.id, None)
+            if job in self._pending:
+                self._pending.remove(job)
+            loop = self.loop
+        if job.task is not None and loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(job.task.cancel)
+        if job.on_cancel is not None:
+            job.on_cancel(job)
+
+    def cancel_all(self) -> None:
+        for job in list(self.jobs.values()):
+            self.cancel(job)
+
+    def shutdown(self) -> None:
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _call(self, job: Job) -> Any:
+        if job.blocking:
+            return await self.loop.run_in_executor(self.executor, job.func)
+        result = job.func()
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
+    async def _run(self, job: Job) -> None:
+        loop = self.loop
+        wakeup = job.wakeup = asyncio.Event()
+        start = loop.time()
+        tick = 0
+        while not job.cancelled:
+            delay = start + tick * job.interval - loop.time()
+            if job.jitter:
+                delay += random.uniform(0, job.jitter)
+            if delay > 0 and not wakeup.is_set():
+                try:
+                    await asyncio.wait_for(wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            triggered = wakeup.is_set()
+            wakeup.clear()
+
+            started = loop.time()
+            if not job.paused:
+                try:
+                    result = await self._call(job)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.error(f"Job {job.id} ({job.name}) failed: {e}")
+                    result = f"Job {job.id} ({job.name}) failed: {e}"
+                job.record(loop.time() - started)
+                if job.sink is not None and not job.cancelled:
+                    job.sink(result)
+
+            if triggered:
+                # The grid restarts from the triggered tick
+                start, tick = started, 1
+                continue
+            # Next tick on the fixed grid, skipping the ones already missed
+            next_tick = max(tick + 1, math.ceil((loop.time() - start) / job.interval))
+            job.overruns += next_tick - tick - 1
+            tick = next_tick
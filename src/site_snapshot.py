@@ -0,0 +1,191 @@
+import asyncio
+import logging
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from src import json_backend
+from src.redis_handler import CacheEntry, RedisHandler, ValueCache
+from src.site_status import SiteStatus
+from src.charging_stations_status import ChargingStationsStatus
+from src.dnsmasq_leases import DnsmasqLeases
+
+if TYPE_CHECKING:
+    from src.async_redis_handler import AsyncRedisHandler
+
+KEY_SITE_STATUS = 'cgw/SiteStatus'
+KEY_CHARGING_STATIONS = 'cgw/ChargingStationsStatus'
+
+SITE_STATUS_FILE = 'site_status.json'
+CHARGING_STATIONS_FILE = 'charging_stations_status.json'
+
+SNAPSHOT_SOURCES = {
+    KEY_SITE_STATUS: (SITE_STATUS_FILE, SiteStatus),
+    KEY_CHARGING_STATIONS: (CHARGING_STATIONS_FILE, ChargingStationsStatus),
+}
+
+
+@dataclass
+class SiteSnapshot:
+    """
+    Everything the site-status commands render, fetched at one point in time.
+    """
+    site_status: SiteStatus
+    charging_stations_status: ChargingStationsStatus
+    dnsmasq_leases: DnsmasqLeases
+    site_status_json: Optional[dict] = None
+    # The model of the value the charging stations status replaced in the cache, if any
+    previous_charging_stations_status: Optional[ChargingStationsStatus] = None
+
+    def display(self) -> str:
+        return self.site_status.display(self.dnsmasq_leases, self.charging_stations_status,
+                                        self.previous_charging_stations_status)
+
+    def to_json(self) -> dict:
+        """
+        Convert the snapshot to JSON format.
+
+        Returns:
+            dict: The raw site status, the charging stations status and the leases.
+        """
+        return {
+            'site_status': self.site_status_json,
+            'charging_stations_status': self.charging_stations_status.to_json(),
+            'leases': self.dnsmasq_leases.entries,
+        }
+
+
+def _load_json_file(filename: str) -> Optional[dict]:
+    try:
+        with open(filename, 'rb') as f:
+            return json_backend.loads(f.read())
+    except FileNotFoundError:
+        logging.warning(f"Warning: {filename} not found.")
+    except json_backend.DecodeError:
+        logging.error(f"Error: Unable to decode {filename}.")
+    return None
+
+
+def _parse_json(value: Optional[bytes]) -> Optional[dict]:
+    return json_backend.loads(value) if value is not None else None
+
+
+def _build_models(cache: ValueCache, sources: Dict[str, Tuple[str, type]],
+                  entries: List[Optional[CacheEntry]]) -> Dict[str, Tuple[Any, Any, Any]]:
+    result = {}
+    for key, entry in zip(sources, entries):
+        filename, model = sources[key]
+        if entry is not None:
+            try:
+                # Raw bytes go straight to the JSON parser without an intermediate str copy
+                data = cache.parsed(entry, 'json', _parse_json)
+                # Models with an ``update`` classmethod are built incrementally from the previous value's model
+                update = getattr(model, 'update', None)
+                result[key] = data, cache.parsed(
+                    entry, model.__name__, lambda _: model.from_json(data),
+                    update=(lambda _, previous: update(data, previous)) if update is not None else None), \
+                    entry.previous.get(model.__name__)
+                continue
+            except Exception as e:
+                logging.debug(f"Falling back to {filename} for {key}: {e}")
+        data = _load_json_file(filename)
+        result[key] = data, model.from_json(data), None
+    return result
+
+
+def load_models(redis_handler: RedisHandler,
+                sources: Dict[str, Tuple[str, type]]) -> Dict[str, Tuple[Any, Any, Any]]:
+    """
+    Fetch JSON values through the client-side cache and build their models, falling back to local
+    files if Redis is not reachable.
+
+    Values and models come from the cache while the values are unchanged, so the
+    models are shared by every caller and must be treated as read-only.
+
+    Args:
+        redis_handler (RedisHandler): The Redis handler to read from.
+        sources (Dict[str, Tuple[str, type]]): Maps each Redis key to the JSON file read when Redis
+            fails and to the class whose ``from_json`` builds the model.
+
+    Returns:
+        Dict[str, Tuple[Any, Any, Any]]: The decoded JSON value, the model, and the model of
+        the value it replaced in the cache (or None) by key.
+    """
+    keys = list(sources)
+    try:
+        redis_handler.track(keys)
+        entries = redis_handler.get_many_cached(keys)
+    except Exception as e:
+        logging.debug(f"Falling back to files for {', '.join(keys)}: {e}")
+        entries = [None] * len(keys)
+    return _build_models(redis_handler.cache, sources, entries)
+
+
+async def load_models_async(redis_handler: 'AsyncRedisHandler', sources: Dict[str, Tuple[str, type]],
+                            executor: Optional[Executor] = None) -> Dict[str, Tuple[Any, Any, Any]]:
+    """
+    Async form of ``load_models``. The values are fetched on the event loop, and
+    the JSON parsing, model building and file fallbacks run on an executor.
+
+    Args:
+        executor (Executor): Runs the blocking work, the loop's default executor if None.
+    """
+    keys = list(sources)
+    try:
+        await redis_handler.track(keys)
+        entries = await redis_handler.get_many_cached(keys)
+    except Exception as e:
+        logging.debug(f"Falling back to files for {', '.join(keys)}: {e}")
+        entries = [None] * len(keys)
+    return await asyncio.get_running_loop().run_in_executor(executor, _build_models, redis_handler.cache, sources,
+                                                            entries)
+
+
+def _snapshot(models: Dict[str, Tuple[Any, Any, Any]], dnsmasq_leases: DnsmasqLeases) -> SiteSnapshot:
+    site_status_json, site_status, _ = models[KEY_SITE_STATUS]
+    _, charging_stations_status, previous_charging_stations_status = models[KEY_CHARGING_STATIONS]
+
+    try:
+        dnsmasq_leases.read_leases()
+    except Exception as e:
+        logging.error(f"Error: {e}")
+
+    return SiteSnapshot(
+        site_status=site_status,
+        charging_stations_status=charging_stations_status,
+        dnsmasq_leases=dnsmasq_leases,
+        site_status_json=site_status_json,
+        previous_charging_stations_status=previous_charging_stations_status,
+    )
+
+
+def load_site_snapshot(redis_handler: RedisHandler, dnsmasq_leases: DnsmasqLeases) -> SiteSnapshot:
+    """
+    Fetch the site status, the charging stations status and the dnsmasq leases.
+
+    Args:
+        redis_handler (RedisHandler): The Redis handler to read from.
+        dnsmasq_leases (DnsmasqLeases): The lease reader to refresh.
+
+    Returns:
+        SiteSnapshot: The parsed snapshot.
+    """
+    return _snapshot(load_models(redis_handler, SNAPSHOT_SOURCES), dnsmasq_leases)
+
+
+async def load_site_snapshot_async(redis_handler: 'AsyncRedisHandler', dnsmasq_leases: DnsmasqLeases,
+                                   executor: Optional[Executor] = None) -> SiteSnapshot:
+    """
+    Async form of ``load_site_snapshot``, fetching on the event loop. Parsing and
+    reading the leases file run on an executor so they never block the loop.
+
+    Args:
+        redis_handler (AsyncRedisHandler): The Redis handler to read from.
+        dnsmasq_leases (DnsmasqLeases): The lease reader to refresh.
+        executor (Executor): Runs the blocking work, the loop's default executor if None.
+
+    Returns:
+        SiteSnapshot: The parsed snapshot.
+    """
+    models = await load_models_async(redis_handler, SNAPSHOT_SOURCES, executor)
+    return await asyncio.get_running_loop().run_in_executor(executor, _snapshot, models, dnsmasq_leases)
@@ -1,15 +1,29 @@
-from datetime import datetime
+import sys
 from io import StringIO
 from tabulate import tabulate
+from src.timestamps import format_iso
+from src.watch_pane import TableSection
 
 
 class EV:
-    def __init__(self, id, status, **kwargs):
+    __slots__ = ('id', 'status', 'charger_id', 'start_charging_time', 'extras')
+
+    def __init__(self, id, status, charger_id=None, start_charging_time=None, **kwargs):
         self.id = id
-        self.status = status
-        # Handle any additional keys
-        for key, value in kwargs.items():
-            setattr(self, key, value)
+        self.status = sys.intern(status) if type(status) is str else status
+        self.charger_id = charger_id
+        self.start_charging_time = start_charging_time
+        # Any additional keys, readable as attributes
+        self.extras = kwargs
+
+    def __getattr__(self, name):
+        # Only called for names that are not slots
+        if name != 'extras':
+            try:
+                return self.extras[name]
+            except KeyError:
+                pass
+        raise AttributeError(f"'EV' object has no attribute '{name}'")
 
 
 class SiteStatus:
@@ -28,14 +42,10 @@ class SiteStatus:
         offline_chargers = data['offline_chargers']
         return cls(charging_stations, datetime_str, evs, offline_chargers)
 
-    def display(self, dnsmasq_leases, charging_stations_status):
-        output = StringIO()
-        print("Site Status:", file=output)
-        print(f"Action: response", file=output)
-        print(f"DateTime: {self.datetime_str}", file=output)
-        print("\nChargers:", file=output)
+    charger_headers = ["ID", "Status", "IP", "MAC", "Leased until"]
+    ev_headers = ["ID", "Chg-ID", "Status", "Chg-Current", "Chg-Offer", "Chg-Fw.", "Sess.E", "Start Chg."]
 
-        headers = ["ID", "Status", "IP", "MAC", "Leased until"]
+    def charger_rows(self, dnsmasq_leases, charging_stations_status):
         chargers_with_ip = []
 
         for station in self.charging_stations:
@@ -50,22 +60,55 @@ class SiteStatus:
             lease_time = dnsmasq_leases.get_lease_time_from_ip(ip) if ip else 'N/A'
             chargers_with_ip.append((offline_charger['id'], 'OFFLINE', ip or 'N/A', mac, lease_time))
 
-        print(tabulate(chargers_with_ip, headers=headers, tablefmt="psql"), file=output)
-
-        print("\nConnections:", file=output)
-        print(charging_stations_status.display(), file=output)
+        return chargers_with_ip
 
-        print("\nElectric Vehicles:", file=output)
-        headers = ["ID", "Chg-ID", "Status", "Chg-Current", "Chg-Offer", "Chg-Fw.", "Sess.E", "Start Chg."]
+    def ev_rows(self):
         data = []
 
         for ev in self.evs:
             try:
-                start_chg_time = datetime.strptime(ev.start_charging_time, "%Y-%m-%dT%H:%M:%S.%f%z").strftime(
-                    "%y%m%d_%H%M")
+                start_chg_time = format_iso(ev.start_charging_time)
             except (TypeError, ValueError):
                 start_chg_time = 'UNKNOWN'
             data.append([ev.id, ev.charger_id, ev.status, None, None, None, None, start_chg_time])
 
-        print(tabulate(data, headers=headers, tablefmt="psql", stralign="left"), file=output)
+        return data
+
+    def sections(self, dnsmasq_leases, charging_stations_status):
+        """
+        Structured form of ``display`` for renderers that diff rows between updates.
+
+        Returns:
+            List[TableSection]: The chargers, connections and electric vehicles tables.
+        """
+        return [
+            TableSection("Chargers", self.charger_headers,
+                         self.charger_rows(dnsmasq_leases, charging_stations_status)),
+            TableSection("Connections", charging_stations_status.headers, charging_stations_status.table_rows(),
+                         key_columns=2),
+            TableSection("Electric Vehicles", self.ev_headers, self.ev_rows()),
+        ]
+
+    def status_line(self) -> str:
+        """
+        The time of the snapshot, shown above the sections rather than in their titles.
+        """
+        return f"DateTime: {self.datetime_str}"
+
+    def display(self, dnsmasq_leases, charging_stations_status, previous_charging_stations_status=None):
+        output = StringIO()
+        print("Site Status:", file=output)
+        print(f"Action: response", file=output)
+        print(f"DateTime: {self.datetime_str}", file=output)
+        print("\nChargers:", file=output)
+
+        chargers_with_ip = self.charger_rows(dnsmasq_leases, charging_stations_status)
+        print(tabulate(chargers_with_ip, headers=self.charger_headers, tablefmt="psql"), file=output)
+
+        print("\nConnections:", file=output)
+        print(charging_stations_status.display(previous_charging_stations_status), file=output)
+
+        print("\nElectric Vehicles:", file=output)
+        data = self.ev_rows()
+        print(tabulate(data, headers=self.ev_headers, tablefmt="psql", stralign="left"), file=output)
         return output.getvalue()
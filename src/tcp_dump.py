@@ -2,7 +2,6 @@ import subprocess
 import multiprocessing
 import os
 import signal
-from scapy.all import *
 
 class TcpDumpProcess(multiprocessing.Process):
     def __init__(self, interface, pcap_file, filter):
@@ -23,6 +22,9 @@ class TcpDumpProcess(multiprocessing.Process):
 
 # Function to read packets from the FIFO
 def read_packets_from_fifo(fifo_path):
+    # scapy takes seconds to import, only load it once packets are actually read
+    from scapy.all import PcapReader
+
     with PcapReader(fifo_path) as pcap_reader:
         for packet in pcap_reader:
             # Process packet as needed
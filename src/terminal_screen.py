@@ -2,23 +2,38 @@ from prompt_toolkit.application import Application
 from prompt_toolkit.document import Document
 from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.layout.containers import HSplit, Window
+from prompt_toolkit.layout.controls import FormattedTextControl
 from prompt_toolkit.layout.layout import Layout
 from prompt_toolkit.styles import Style
 from prompt_toolkit.widgets import TextArea
 from prompt_toolkit.completion import NestedCompleter
-from typing import Callable, Dict, List
-import os
+from typing import Callable, Deque, List
+from collections import deque
+from src.command_registry import CommandRegistry
+from src.output_buffer import OutputBuffer, create_output_window
+from src.watch_pane import WatchPane
+from src.scheduler import Job, JobScheduler
+import itertools
 import threading
 import time
 
 
 class TerminalScreen:
-    def __init__(self, cmds_dir: str):
+    def __init__(self, cmds_dir: str, registry: CommandRegistry = None, scrollback_lines: int = 10000,
+                 max_refresh_rate: float = 20.0, job_workers: int = 4):
         self.help_text = "Press Control-C to exit."
         self.command_handler: Callable[[str], str] = None  # Command handler function
         self.cmds_dir = cmds_dir
+        self.registry = registry if registry is not None else CommandRegistry(cmds_dir)
         self.completer: NestedCompleter = self.init_nested_cmds()
-        self.running_threads: List[threading.Thread] = []  # List to store running threads
+        self.scheduler = JobScheduler(max_workers=job_workers)
+
+        # Output from any thread is queued and drained on the event loop at most once per frame
+        self.frame_interval = 1.0 / max_refresh_rate
+        self._display_queue: Deque[str] = deque()
+        self._display_lock = threading.Lock()
+        self._drain_scheduled = False
+        self._last_drain = 0.0
 
         # Initialize key bindings
         kb = KeyBindings()
@@ -37,11 +52,18 @@ class TerminalScreen:
                 ("output-field", "bg:#ffffff #000000"),
                 ("input-field", "bg:#ffffff #000000"),
                 ("line", "#004400"),
+                ("watch-pane", "bg:#ffffff #000000"),
+                ("watch-title", "bold"),
+                ("watch-header", "bold"),
+                ("watch-status", "italic"),
+                ("watch-changed", "bg:#ffff00 #000000 bold"),
             ]
         )
 
         # Initialize layout
-        self.output_field = TextArea(style="class:output-field", text=self.help_text)
+        self.output_buffer = OutputBuffer(max_lines=scrollback_lines)
+        self.output_buffer.append(self.help_text)
+        self.output_field = create_output_window(self.output_buffer, style="class:output-field")
         self.input_field = TextArea(
             height=1,
             prompt=">>> ",
@@ -51,8 +73,12 @@ class TerminalScreen:
             completer=self.completer
         )
 
+        self.panes: List[WatchPane] = []
+        self.pane_container = HSplit([])
+
         container = HSplit(
             [
+                self.pane_container,
                 self.output_field,
                 Window(height=1, char="-", style="class:line"),
                 self.input_field,
@@ -78,33 +104,60 @@ class TerminalScreen:
             style=style,
             mouse_support=True,
             full_screen=True,
+            min_redraw_interval=self.frame_interval,
         )
 
-    def start_interval_process(self, interval_seconds: float, func: Callable[[], str]):
+    def start_interval_process(self, interval_seconds: float, func: Callable[[], str], name: str = None,
+                               pane: WatchPane = None, on_cancel: Callable[[Job], None] = None) -> Job:
         """
-        Start a subprocess executing a function at specified intervals.
+        Schedule a function to be executed at specified intervals on the job scheduler.
 
         Args:
             interval_seconds (float): Interval in seconds between function executions.
             func (Callable[[], str]): Function to be executed at intervals, returning a string.
+            name (str): Name of the job, defaults to the function name.
+            pane (WatchPane): Pane updated by the job, closed when the job is killed.
+            on_cancel (Callable[[Job], None]): Called when the job is killed.
+
+        Returns:
+            Job: The scheduled job.
         """
+        def cancelled(job: Job) -> None:
+            if on_cancel is not None:
+                on_cancel(job)
+            if pane is not None:
+                self.close_pane(pane)
 
-        def execute_func(stop_event: threading.Event):
-            while not stop_event.is_set():
-                output_str = func()  # Execute the provided function
-                self.display(output_str)  # Display the output in the terminal
-                stop_event.wait(interval_seconds)  # Wait for the specified interval
+        return self.scheduler.add_job(func, interval_seconds, name=name, sink=self.display, on_cancel=cancelled)
 
-        # Create an event to signal the thread to stop
-        stop_event = threading.Event()
+    def open_pane(self, name: str) -> WatchPane:
+        """
+        Add a watch pane above the output field.
 
-        # Start the interval execution in a separate thread
-        interval_thread = threading.Thread(target=execute_func, args=(stop_event,))
-        interval_thread.daemon = True  # Set as a daemon thread to exit with the main thread
-        interval_thread.start()
+        Args:
+            name (str): Name of the pane.
 
-        # Store the thread and stop_event in the list
-        self.running_threads.append((interval_thread, stop_event))
+        Returns:
+            WatchPane: The pane, redrawn whenever an update changes it.
+        """
+        pane = WatchPane(name, on_change=lambda _: self.application.invalidate())
+        window = Window(FormattedTextControl(lambda: pane.fragments), style="class:watch-pane",
+                        wrap_lines=True, dont_extend_height=True)
+        self.panes.append(pane)
+        self.pane_container.children = self.pane_container.children + [window]
+        self.application.invalidate()
+        return pane
+
+    def close_pane(self, pane: WatchPane) -> None:
+        """
+        Remove a watch pane from the screen.
+        """
+        if pane in self.panes:
+            index = self.panes.index(pane)
+            self.panes = self.panes[:index] + self.panes[index + 1:]
+            children = self.pane_container.children
+            self.pane_container.children = children[:index] + children[index + 1:]
+            self.application.invalidate()
 
     def display_string(self, message: str) -> None:
         """
@@ -115,33 +168,27 @@ class TerminalScreen:
         """
         self.display(message)
 
-    def start_counter_process(self):
+    def start_counter_process(self) -> Job:
         """
-        Start a subprocess printing a counter into the output screen.
+        Start a job printing a counter into the output screen.
         """
-
-        def counter():
-            count = 1
-            while True:
-                self.display(f"Counter: {count}")
-                count += 1
-                time.sleep(1)  # Wait for 1 second
-
-        # Start the counter subprocess in a separate thread
-        counter_thread = threading.Thread(target=counter)
-        counter_thread.daemon = True  # Set as a daemon thread to exit with the main thread
-        counter_thread.start()
+        count = itertools.count(1)
+        return self.scheduler.add_job(lambda: f"Counter: {next(count)}", 1, name='counter',
+                                      sink=self.display, blocking=False)
 
     def kill_threads(self):
         """
-        Stop all running threads.
+        Stop all running jobs and close their panes.
         """
-        for thread, stop_event in self.running_threads:
-            stop_event.set()  # Set the event to signal the thread to stop
-            thread.join()  # Wait for the thread to complete (optional)
+        self.scheduler.cancel_all()
+        for pane in list(self.panes):
+            self.close_pane(pane)
 
     def run(self):
-        self.application.run()
+        try:
+            self.application.run(pre_run=self.scheduler.attach)
+        finally:
+            self.scheduler.shutdown()
 
     def handle_command(self, command: str) -> None:
         output_text: str = None
@@ -153,37 +200,39 @@ class TerminalScreen:
         self.command_handler = handler
 
     def display(self, text: str) -> None:
-        if text is not None:
-            current_text = self.output_field.text
-            self.output_field.buffer.document = Document(
-                text=current_text + '\n' + text, cursor_position=len(current_text + '\n' + text)
-            )
-
-    def init_nested_cmds(self) -> NestedCompleter:
-        mydict = self.dir_2_dict(self.cmds_dir, d={})
-        try:
-            completer = NestedCompleter.from_nested_dict(mydict[os.path.basename(self.cmds_dir)])
-        except KeyError as e:
-            print(f"KeyError occurred: {e}")
-            completer = None
-        return completer
-
-    def dir_2_dict(self, path: str, d: Dict) -> Dict:
         """
-        Convert directory structure to nested dictionary.
+        Queue text for the output field. Safe to call from any thread.
 
-        Args:
-            path (str): The path to the directory.
-            d (Dict): The dictionary to store directory structure.
+        Text queued within one frame is appended together and costs a single redraw.
 
-        Returns:
-            Dict: The nested dictionary representing directory structure.
+        Args:
+            text (str): The text to display, None is ignored.
         """
-        name = os.path.basename(path)
-        if os.path.isdir(path):
-            if name not in d:
-                d[name] = {}
-            for x in os.listdir(path):
-                if not x.startswith('__'):  # Exclude directories starting with double underscores
-                    self.dir_2_dict(os.path.join(path, x), d[name])
-        return d
+        if text is None:
+            return
+        with self._display_lock:
+            self._display_queue.append(text)
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+
+        loop = self.application.loop if self.application.is_running else None
+        if loop is None:
+            # Not running yet: nothing to redraw, append right away
+            self._drain_display_queue()
+            return
+        delay = max(0.0, self._last_drain + self.frame_interval - time.monotonic())
+        loop.call_soon_threadsafe(loop.call_later, delay, self._drain_display_queue)
+
+    def _drain_display_queue(self) -> None:
+        with self._display_lock:
+            self._drain_scheduled = False
+            texts = list(self._display_queue)
+            self._display_queue.clear()
+            for text in texts:
+                self.output_buffer.append(text)
+            self._last_drain = time.monotonic()
+        self.application.invalidate()
+
+    def init_nested_cmds(self) -> NestedCompleter:
+        return NestedCompleter.from_nested_dict(self.registry.to_nested_dict())
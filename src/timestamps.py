@@ -0,0 +1,58 @@
+"""
+Timestamp formatting shared by the status tables.
+
+Most timestamps are unchanged from one render to the next, so formatted values
+are memoized in bounded LRU caches keyed by the raw value.
+"""
+from datetime import datetime
+from functools import lru_cache
+from typing import Union
+
+DISPLAY_FORMAT = "%y%m%d_%H%M"
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"  # Sent by the chargers, e.g. '2024-05-28T12:00:00.000+0000'
+CACHE_SIZE = 16384  # Covers the distinct timestamps of a large site
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def format_iso(timestamp: str) -> str:
+    """
+    Format an ISO 8601 timestamp, e.g. an OCPP error time, for display.
+
+    Args:
+        timestamp (str): The timestamp, e.g. '2024-05-28T12:00:00.000+0000'.
+
+    Returns:
+        str: The time as YYMMDD_HHMM.
+
+    Raises:
+        ValueError: If the timestamp is not ISO 8601.
+        TypeError: If the timestamp is not a string.
+    """
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except ValueError:
+        # Before Python 3.11 fromisoformat rejects milliseconds and '+0000' offsets
+        parsed = datetime.strptime(timestamp, ISO_FORMAT)
+    return parsed.strftime(DISPLAY_FORMAT)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def format_epoch(timestamp: Union[int, str]) -> str:
+    """
+    Format a Unix timestamp, e.g. a dnsmasq lease expiry, for display in local time.
+
+    Args:
+        timestamp (Union[int, str]): Seconds since the epoch.
+
+    Returns:
+        str: The time as YYMMDD_HHMM.
+
+    Raises:
+        ValueError: If the timestamp is not an integer.
+    """
+    return datetime.fromtimestamp(int(timestamp)).strftime(DISPLAY_FORMAT)
+
+
+def cache_clear() -> None:
+    format_iso.cache_clear()
+    format_epoch.cache_clear()
@@ -0,0 +1,185 @@
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+Fragments = List[Tuple[str, str]]
+
+
+class TableSection(NamedTuple):
+    """
+    A titled table of rows, the structured form of one block of a status display.
+
+    Rows are matched between updates by their first ``key_columns`` cells.
+    """
+    title: str
+    headers: Sequence[str]
+    rows: Sequence[Sequence]
+    key_columns: int = 1
+
+
+class _SectionState:
+    __slots__ = ('title', 'headers', 'widths', 'keys', 'rows', 'rendered', 'highlighted', 'frame')
+
+    def __init__(self, title: str, headers: Tuple[str, ...], widths: List[int]):
+        self.title = title
+        self.headers = headers
+        self.widths = widths
+        self.keys: List[tuple] = []
+        self.rows: Dict[tuple, Tuple[str, ...]] = {}
+        self.rendered: Dict[tuple, Fragments] = {}
+        self.highlighted: set = set()
+        self.frame: Fragments = []
+
+
+def _cell(value) -> str:
+    return '' if value is None else str(value)
+
+
+def _row_keys(rows: List[Tuple[str, ...]], key_columns: int) -> List[tuple]:
+    # Repeated keys are told apart by their occurrence
+    seen: Dict[tuple, int] = {}
+    keys = []
+    for row in rows:
+        key = row[:key_columns]
+        n = seen.get(key, 0)
+        seen[key] = n + 1
+        keys.append((key, n))
+    return keys
+
+
+class WatchPane:
+    """
+    A block of tables that is replaced in place on every update.
+
+    Only rows that changed since the previous update are re-rendered, and their
+    changed cells are highlighted until the next update. Updates with no changes
+    do not re-render anything and do not notify ``on_change``. Values that change
+    on every update, like the time of the snapshot, go in the status line above
+    the tables so that they do not invalidate a section.
+    """
+
+    changed_style: str = 'class:watch-changed'
+    header_style: str = 'class:watch-header'
+    title_style: str = 'class:watch-title'
+    status_style: str = 'class:watch-status'
+
+    def __init__(self, name: str, on_change: Optional[Callable[['WatchPane'], None]] = None):
+        """
+        Initializes the WatchPane instance.
+
+        Args:
+            name (str): Name of the pane, e.g. the watch command.
+            on_change (Callable): Called with the pane after an update changed its content.
+        """
+        self.name = name
+        self.on_change = on_change
+        self._sections: List[_SectionState] = []
+        self._fragments: Fragments = []
+        self._body: Fragments = []
+        self.status = ''
+        self.rendered_rows = 0  # Rows re-rendered by the last update
+
+    @property
+    def fragments(self) -> Fragments:
+        return self._fragments
+
+    @property
+    def text(self) -> str:
+        return ''.join(text for _, text in self._fragments)
+
+    @property
+    def line_count(self) -> int:
+        return sum(text.count('\n') for _, text in self._fragments)
+
+    def _render_frame(self, state: _SectionState) -> Fragments:
+        separator = '+-' + '-+-'.join('-' * width for width in state.widths) + '-+\n'
+        header = '| ' + ' | '.join(h.ljust(width) for h, width in zip(state.headers, state.widths)) + ' |\n'
+        return [(self.title_style, state.title + ':\n'), ('', separator), (self.header_style, header), ('', separator)]
+
+    def _render_row(self, row: Tuple[str, ...], widths: List[int], previous: Optional[Tuple[str, ...]],
+                    highlight: bool) -> Tuple[Fragments, bool]:
+        fragments = [('', '| ')]
+        changed = False
+        for i, (cell, width) in enumerate(zip(row, widths)):
+            if i:
+                fragments.append(('', ' | '))
+            cell_changed = highlight and (previous is None or i >= len(previous) or previous[i] != cell)
+            changed = changed or cell_changed
+            fragments.append((self.changed_style if cell_changed else '', cell.ljust(width)))
+        fragments.append(('', ' |\n'))
+        return fragments, changed
+
+    def _update_section(self, state: Optional[_SectionState],
+                        section: TableSection) -> Tuple[_SectionState, int, bool]:
+        headers = tuple(section.headers)
+        rows = [tuple(_cell(value) for value in row) for row in section.rows]
+        widths = [len(header) for header in headers]
+        for row in rows:
+            for i, cell in enumerate(row[:len(widths)]):
+                if len(cell) > widths[i]:
+                    widths[i] = len(cell)
+        keys = _row_keys(rows, section.key_columns)
+
+        highlight = state is not None
+        # Rows can only be reused while the column layout is unchanged
+        reuse = state is not None and state.widths == widths and state.headers == headers
+        new_state = _SectionState(section.title, headers, widths)
+        if reuse and state.title == section.title:
+            new_state.frame = state.frame
+        else:
+            new_state.frame = self._render_frame(new_state)
+
+        rendered = 0
+        for key, row in zip(keys, rows):
+            previous = state.rows.get(key) if state is not None else None
+            if reuse and previous == row and key not in state.highlighted:
+                new_state.rendered[key] = state.rendered[key]
+            else:
+                new_state.rendered[key], changed = self._render_row(row, widths, previous, highlight)
+                if changed:
+                    new_state.highlighted.add(key)
+                rendered += 1
+            new_state.rows[key] = row
+        new_state.keys = keys
+        # Rows may have been removed or reordered, or the title changed, without any row being re-rendered
+        reordered = state is None or state.keys != keys or state.title != section.title
+        return new_state, rendered, reordered
+
+    def update(self, sections: Sequence[TableSection], status: str = '') -> bool:
+        """
+        Replace the pane content with new sections.
+
+        Args:
+            sections (Sequence[TableSection]): The tables to show.
+            status (str): A line shown above the tables, not diffed.
+
+        Returns:
+            bool: True if the content changed.
+        """
+        new_sections = []
+        rendered = 0
+        changed = len(sections) != len(self._sections)
+        for i, section in enumerate(sections):
+            state = self._sections[i] if i < len(self._sections) else None
+            new_state, count, reordered = self._update_section(state, section)
+            new_sections.append(new_state)
+            rendered += count
+            changed = changed or reordered
+        self.rendered_rows = rendered
+        if not rendered and not changed and status == self.status:
+            return False
+
+        if rendered or changed:
+            body: Fragments = []
+            for i, state in enumerate(new_sections):
+                if i:
+                    body.append(('', '\n'))
+                body.extend(state.frame)
+                for key in state.keys:
+                    body.extend(state.rendered[key])
+                body.append(('', '+-' + '-+-'.join('-' * width for width in state.widths) + '-+\n'))
+            self._body = body
+        self._sections = new_sections
+        self.status = status
+        self._fragments = ([(self.status_style, status + '\n')] if status else []) + self._body
+        if self.on_change is not None:
+            self.on_change(self)
+        return True
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import fakeredis
+import redis
+import redis.asyncio
+
+from src.async_redis_handler import AsyncRedisHandler, close_async_redis_handlers, get_async_redis_handler
+from src.redis_handler import RedisHandler, close_redis_handlers
+from src.scheduler import JobScheduler
+from src.site_snapshot import KEY_CHARGING_STATIONS, KEY_SITE_STATUS, load_site_snapshot_async
+from test.test_redis_handler import StandInServer
+
+AsyncConnectionPool = redis.asyncio.BlockingConnectionPool
+
+SITE_STATUS = {"status": "active", "error": None, "datetime": "2023-01-01T00:00:00Z", "charging_stations": [],
+               "evs": [], "offline_chargers": []}
+
+
+class TestAsyncRedisHandler(unittest.TestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        def pool(**kwargs):
+            # fakeredis does not answer the async health check PING as redis-py expects
+            kwargs['health_check_interval'] = 0
+            return AsyncConnectionPool(connection_class=fakeredis.FakeAsyncRedisConnection, server=self.server,
+                                       **kwargs)
+
+        patcher = patch('src.async_redis_handler.redis.asyncio.BlockingConnectionPool', side_effect=pool)
+        self.pool_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(close_redis_handlers)
+
+    def run_async(self, coroutine):
+        async def main():
+            try:
+                return await coroutine
+            finally:
+                await close_async_redis_handlers()
+
+        return asyncio.run(main())
+
+    def test_get_and_set(self):
+        async def main():
+            handler = get_async_redis_handler()
+            self.assertIs(get_async_redis_handler(), handler)
+            await handler.set_value('a', '1')
+            return await handler.get_value('a'), await handler.get_many(['a', 'b']), await handler.get_value('b')
+
+        self.assertEqual(self.run_async(main()), ('1', [b'1', None], None))
+        self.pool_class.assert_called_once()
+
+    def test_shares_cache_with_sync_handler(self):
+        sync_handler = RedisHandler()
+        handler = AsyncRedisHandler(sync_handler)
+
+        async def main():
+            await handler.set_value('a', '1')
+            first = await handler.get_many_cached(['a'])
+            second = await handler.get_many_cached(['a'])
+            await handler.close()
+            return first, second
+
+        first, second = asyncio.run(main())
+        self.assertIs(first[0], second[0])
+        self.assertIs(sync_handler.cache.get('a'), first[0])
+
+    def test_concurrent_fetches_on_one_loop(self):
+        async def main():
+            handler = get_async_redis_handler()
+            await handler.set_value('a', 'x')
+            return await asyncio.gather(*(handler.get_value('a') for _ in range(50)))
+
+        self.assertEqual(self.run_async(main()), ['x'] * 50)
+
+    def test_site_snapshot(self):
+        async def main():
+            handler = get_async_redis_handler()
+            await handler.set_value(KEY_SITE_STATUS, json.dumps(SITE_STATUS))
+            await handler.set_value(KEY_CHARGING_STATIONS, '{"chargers": []}')
+            with patch.object(handler, 'track', return_value=False):
+                return await load_site_snapshot_async(handler, MagicMock())
+
+        snapshot = self.run_async(main())
+        self.assertEqual(snapshot.site_status_json, SITE_STATUS)
+        self.assertEqual(snapshot.charging_stations_status.chargers, [])
+
+    def test_snapshot_is_parsed_off_the_loop(self):
+        threads = {}
+        dnsmasq_leases = MagicMock()
+        dnsmasq_leases.read_leases.side_effect = lambda: threads.setdefault('leases', threading.current_thread())
+
+        async def main():
+            handler = get_async_redis_handler()
+            await handler.set_value(KEY_SITE_STATUS, json.dumps(SITE_STATUS))
+            await handler.set_value(KEY_CHARGING_STATIONS, '{"chargers": []}')
+            threads['loop'] = threading.current_thread()
+            with patch.object(handler, 'track', return_value=False), \
+                    patch('src.site_snapshot.json_backend.loads', side_effect=lambda value: (
+                        threads.setdefault('parse', threading.current_thread()), json.loads(value))[1]):
+                return await load_site_snapshot_async(handler, dnsmasq_leases)
+
+        self.assertEqual(self.run_async(main()).site_status_json, SITE_STATUS)
+        self.assertIsNot(threads['parse'], threads['loop'])
+        self.assertIsNot(threads['leases'], threads['loop'])
+
+    def test_scheduler_awaits_coroutine_jobs(self):
+        scheduler = JobScheduler(max_workers=1)
+        self.addCleanup(scheduler.shutdown)
+        results = []
+
+        async def fetch():
+            return await get_async_redis_handler().get_value('a')
+
+        async def main():
+            scheduler.attach()
+            await get_async_redis_handler().set_value('a', 'tick')
+            job = scheduler.add_job(fetch, 0.02, sink=results.append)
+            await asyncio.sleep(0.05)
+            scheduler.cancel(job)
+            return job
+
+        job = self.run_async(main())
+        self.assertFalse(job.blocking)
+        self.assertIn('tick', results)
+
+
+class TestAsyncFailover(unittest.TestCase):
+    def test_fastest_endpoint_wins_and_breaker_is_shared(self):
+        local = StandInServer()
+        external = StandInServer('silent')
+        self.addCleanup(local.close)
+        self.addCleanup(external.close)
+        sync_handler = RedisHandler(host='127.0.0.1', port=local.port, external_host='127.0.0.1',
+                                    external_port=external.port, socket_timeout=0.3, socket_connect_timeout=0.3)
+        handler = AsyncRedisHandler(sync_handler)
+
+        async def main():
+            await handler.redis_client()
+            await asyncio.sleep(0.4)
+            await handler.close()
+
+        with self.assertLogs(level='INFO'):
+            asyncio.run(main())
+        self.assertEqual(handler.endpoint, None)
+        self.assertEqual(sync_handler.breakers['local'].state, 'closed')
+        self.assertEqual(sync_handler.breakers['external'].state, 'closed')
+
+
+if __name__ == '__main__':
+    unittest.main()
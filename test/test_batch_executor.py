@@ -0,0 +1,72 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from main import create_dispatcher
+from src.batch_executor import BatchExecutor, format_batch_results
+
+
+class TestBatchExecutor(unittest.TestCase):
+    def test_results_in_order_and_show_commands_overlap(self):
+        running = []
+        overlap = []
+        lock = threading.Lock()
+
+        def func(cmd):
+            with lock:
+                running.append(cmd)
+                overlap.append(len(running))
+            time.sleep(0.05 if cmd.endswith('slow') else 0.01)
+            with lock:
+                running.remove(cmd)
+            return cmd.upper()
+
+        executor = BatchExecutor(func, max_workers=4)
+        results = executor.run(['show slow', 'show a', 'show b'])
+
+        self.assertEqual([r.output for r in results], ['SHOW SLOW', 'SHOW A', 'SHOW B'])
+        self.assertGreater(max(overlap), 1)
+        self.assertTrue(all(r.ok and r.elapsed > 0 for r in results))
+
+    def test_other_commands_are_barriers(self):
+        events = []
+
+        def func(cmd):
+            events.append(('start', cmd))
+            time.sleep(0.02)
+            events.append(('end', cmd))
+
+        BatchExecutor(func, max_workers=4).run(['show a', 'watch x', 'show b'])
+
+        self.assertLess(events.index(('end', 'show a')), events.index(('start', 'watch x')))
+        self.assertLess(events.index(('end', 'watch x')), events.index(('start', 'show b')))
+
+    def test_errors_are_reported_per_command(self):
+        def func(cmd):
+            if cmd == 'show bad':
+                raise ValueError("boom")
+            return "fine"
+
+        results = BatchExecutor(func).run(['show bad', 'show good'])
+
+        self.assertEqual(results[0].error, "ValueError: boom")
+        self.assertEqual(results[1].output, "fine")
+        text = format_batch_results(results)
+        self.assertIn("[FAILED", text)
+        self.assertIn("2 commands, 1 failed", text)
+
+    def test_dispatcher_runs_batch(self):
+        dispatcher = create_dispatcher()
+        terminal = MagicMock()
+        results = dispatcher.run_batch(terminal, ['watch', 'watch counter', 'batch', 'nope'])
+
+        self.assertEqual([r.command for r in results], ['watch', 'watch counter', 'nope'])
+        self.assertIsNone(results[0].output)
+        self.assertEqual(results[1].output, "['watch', 'counter']")
+        self.assertEqual(results[2].output, "Command not found: nope")
+        terminal.start_interval_process.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
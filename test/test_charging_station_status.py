@@ -1,6 +1,80 @@
+import copy
+import pickle
+import tracemalloc
 import unittest
+from unittest.mock import patch
+from dataclasses import dataclass
 from datetime import datetime
-from src.charging_stations_status import ChargingStationsStatus, Charger, Connector, OcppError
+from typing import List
+from src import json_backend
+from src.charging_stations_status import (ChargingStationsStatus, Charger, Connector, OcppError, StatusChange,
+                                          StatusChangeLog)
+
+
+@dataclass
+class PlainOcppError:
+    error_code: str
+    info: str
+    timestamp: str
+    vendor_error_code: str
+    vendor_id: str
+
+
+@dataclass
+class PlainConnector:
+    id: int
+    ocpp_error: PlainOcppError
+    ocpp_error_code: str
+    priority: bool
+    status: str
+
+
+@dataclass
+class PlainCharger:
+    connectors: List[PlainConnector]
+    firmware_version: str
+    id: str
+    ip_address: str
+    ocpp_error: PlainOcppError
+    ocpp_error_code: str
+    status: str
+
+
+def plain_from_json(json_dict):
+    """
+    The models as they were before, one dict-backed instance per error.
+    """
+    def error(data):
+        return PlainOcppError(data.get('error_code', ''), data.get('info', ''), data.get('timestamp', ''),
+                              data.get('vendor_error_code', ''), data.get('vendor_id', ''))
+
+    return [PlainCharger([PlainConnector(c['id'], error(c['ocpp_error']), c['ocpp_error_code'], c['priority'],
+                                         c['status']) for c in charger['connectors']],
+                         charger['firmware_version'], charger['id'], charger['ip_address'],
+                         error(charger['ocpp_error']), charger['ocpp_error_code'], charger['status'])
+            for charger in json_dict['chargers']]
+
+
+def connectors_json(chargers, connectors):
+    no_error = {'error_code': 'NoError', 'info': None, 'timestamp': None, 'vendor_error_code': None,
+                'vendor_id': None}
+    return {'chargers': [{
+        'connectors': [{'id': c, 'ocpp_error': dict(no_error), 'ocpp_error_code': 'NoError', 'priority': False,
+                        'status': 'Available'} for c in range(1, connectors + 1)],
+        'firmware_version': '1.0', 'id': str(i), 'ip_address': f'10.0.{i // 256}.{i % 256}',
+        'ocpp_error': dict(no_error), 'ocpp_error_code': 'NoError', 'status': 'Available',
+    } for i in range(chargers)]}
+
+
+def allocated(build, json_dict):
+    tracemalloc.start()
+    try:
+        models = build(json_dict)
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del models
+    return size
 
 
 class TestChargingStationsStatus(unittest.TestCase):
@@ -19,6 +93,12 @@ class TestChargingStationsStatus(unittest.TestCase):
         self.assertEqual(charging_stations_status.get_ip_from_charger_id("2"), "192.168.1.2")
         self.assertEqual(charging_stations_status.get_ip_from_charger_id("3"), "IP not found")
 
+    def test_repeated_charger_id_resolves_to_first(self):
+        status = ChargingStationsStatus.from_json({'chargers': [{'id': '1', 'ip_address': '10.0.0.1'},
+                                                                {'id': '1', 'ip_address': '10.0.0.2'}]})
+        self.assertEqual(status.get_ip_from_charger_id('1'), '10.0.0.1')
+        self.assertIs(status.charger_index['1'], status.chargers[0])
+
     def test_display(self):
         chargers = [
             Charger(
@@ -81,5 +161,126 @@ class TestChargingStationsStatus(unittest.TestCase):
         self.assertIn("Status", output)
         self.assertIn("IP Address", output)
 
+
+class TestCompactModels(unittest.TestCase):
+    def test_equal_errors_are_shared(self):
+        status = ChargingStationsStatus.from_json(connectors_json(2, 2))
+        errors = {id(connector.ocpp_error) for charger in status.chargers for connector in charger.connectors}
+        self.assertEqual(len(errors), 1)
+        self.assertIs(status.chargers[0].ocpp_error, status.chargers[1].connectors[0].ocpp_error)
+        missing = ChargingStationsStatus.from_json({'chargers': [{}, {}]}).chargers
+        self.assertIs(missing[0].ocpp_error, missing[1].ocpp_error)
+        self.assertEqual(missing[0].ocpp_error, OcppError('', '', '', '', ''))
+
+    def test_models_are_slotted(self):
+        status = ChargingStationsStatus.from_json(connectors_json(1, 1))
+        charger = status.chargers[0]
+        for model in (charger, charger.connectors[0], charger.ocpp_error):
+            self.assertFalse(hasattr(model, '__dict__'))
+        with self.assertRaises(AttributeError):
+            charger.ocpp_error.info = 'changed'
+        self.assertEqual(copy.deepcopy(charger), charger)
+        self.assertEqual(pickle.loads(pickle.dumps(charger)), charger)
+
+    def test_memory_per_10k_connectors(self):
+        json_dict = connectors_json(5000, 2)
+        # Warm up the intern table so only the models are measured
+        ChargingStationsStatus.from_json(json_dict)
+
+        plain = allocated(plain_from_json, json_dict)
+        compact = allocated(ChargingStationsStatus.from_json, json_dict)
+        self.assertLess(compact, plain * 0.5,
+                        f"10k connectors: {plain / 1024:.0f} KiB plain, {compact / 1024:.0f} KiB compact")
+
+
+def station(charger_id, *statuses):
+    return {'id': charger_id, 'connectors': [{'id': i, 'status': status} for i, status in enumerate(statuses, 1)]}
+
+
+class TestIncrementalUpdate(unittest.TestCase):
+    def setUp(self):
+        self.previous_backend = json_backend.get_backend()
+        if 'orjson' in json_backend.BACKENDS:
+            json_backend.set_backend('orjson')
+        self.first = ChargingStationsStatus.from_json({'chargers': [
+            station('1', 'Available', 'Charging'), station('2', 'Available'), station('3', 'Faulted')]})
+
+    def tearDown(self):
+        json_backend.set_backend(self.previous_backend.name)
+
+    def test_unchanged_chargers_are_reused(self):
+        for backend in json_backend.BACKENDS:
+            with self.subTest(backend=backend):
+                json_backend.set_backend(backend)
+                first = ChargingStationsStatus.from_json({'chargers': [
+                    station('1', 'Available', 'Charging'), station('2', 'Available'), station('3', 'Faulted')]})
+                second = ChargingStationsStatus.update({'chargers': [
+                    station('1', 'Available', 'Charging'), station('2', 'Charging'), station('3', 'Faulted')]}, first)
+
+                self.assertIs(second.chargers[0], first.chargers[0])
+                self.assertIsNot(second.chargers[1], first.chargers[1])
+                self.assertIs(second.chargers[2], first.chargers[2])
+                self.assertEqual(second.chargers[1].connectors[0].status, 'Charging')
+                self.assertEqual(second.changes_since(first).status_changed,
+                                 [StatusChange('2', 1, 'Available', 'Charging')])
+
+    def test_repeated_charger_id_is_parsed(self):
+        second = ChargingStationsStatus.update({'chargers': [station('1', 'Available', 'Charging'),
+                                                             station('1', 'Available', 'Charging')]}, self.first)
+        self.assertIs(second.chargers[0], self.first.chargers[0])
+        self.assertIsNot(second.chargers[1], self.first.chargers[0])
+        self.assertEqual(second.chargers[1], self.first.chargers[0])
+
+    def test_stdlib_backend_compares_sub_documents(self):
+        json_backend.set_backend('json')
+        first = ChargingStationsStatus.from_json({'chargers': [station('1', 'Available', 'Charging')]})
+        self.assertEqual(first.digests, {'1': station('1', 'Available', 'Charging')})
+        second = ChargingStationsStatus.update({'chargers': [station('1', 'Available', 'Charging')]}, first)
+        self.assertIs(second.chargers[0], first.chargers[0])
+
+    def test_changes_since(self):
+        second = ChargingStationsStatus.update({'chargers': [
+            station('1', 'Available'), station('2', 'Charging'), station('4', 'Available')]}, self.first)
+
+        changes = second.changes_since(self.first)
+        self.assertEqual(changes.added, [('4', 1)])
+        self.assertEqual(changes.removed, [('1', 2), ('3', 1)])
+        self.assertEqual(changes.status_changed, [StatusChange('2', 1, 'Available', 'Charging')])
+        self.assertEqual([row[1:] for row in changes.log_rows()], [['2', 'Charging']])
+
+        self.assertFalse(second.changes_since(second))
+        self.assertEqual(len(self.first.changes_since(None).added), 4)
+        self.assertEqual(self.first.changes_since(None).log_rows(), [])
+
+    def test_display_logs_changes_since_the_last_status(self):
+        second = ChargingStationsStatus.update({'chargers': [
+            station('1', 'Charging', 'Charging'), station('2', 'Available'), station('3', 'Faulted')]}, self.first)
+        log = StatusChangeLog('status_changes.csv')
+        with patch('src.charging_stations_status.STATUS_CHANGE_LOG', log), \
+                patch.object(ChargingStationsStatus, 'write_status_changes') as write:
+            # Nothing to compare the first status with but the replaced model, if any
+            self.first.display()
+            self.assertEqual(write.call_args.args[1], [])
+
+            second.display(self.first)
+            self.assertEqual([row[1:] for row in write.call_args.args[1]], [['1', 'Charging']])
+
+            # Already logged, e.g. by a watch
+            write.reset_mock()
+            second.display(self.first)
+            write.assert_not_called()
+
+    def test_log_prefers_the_last_recorded_status(self):
+        second = ChargingStationsStatus.update({'chargers': [
+            station('1', 'Charging', 'Charging'), station('2', 'Available'), station('3', 'Faulted')]}, self.first)
+        log = StatusChangeLog('status_changes.csv')
+        log.last = second
+        with patch.object(ChargingStationsStatus, 'write_status_changes') as write:
+            changes = log.record(self.first, previous=second)
+            self.assertEqual([row[1:] for row in write.call_args.args[1]], [['1', 'Available']])
+            self.assertEqual(log.record(self.first, previous=second).log_rows(), [])
+        self.assertEqual(changes.status_changed, [StatusChange('1', 1, 'Charging', 'Available')])
+        self.assertIs(log.last, self.first)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.command_registry import CommandRegistry
+from command_dispatcher import CmdDispatcher
+
+COMMANDS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'commands')
+
+COMMAND_SOURCE = """
+class Command:
+    def __init__(self, cmds, terminal):
+        self.cmds = cmds
+
+    def execute(self):
+        return ' '.join(self.cmds)
+"""
+
+
+class TestCommandRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.package = 'regtestcmds'
+        root = os.path.join(self.tmp.name, self.package)
+        for path in ('', 'show', 'show/site-status', 'show/leases', 'jobs', 'jobs/kill', '__pycache__'):
+            os.makedirs(os.path.join(root, path), exist_ok=True)
+            with open(os.path.join(root, path, '__init__.py'), 'w'):
+                pass
+        for path in ('show/site-status', 'show/leases', 'jobs/kill'):
+            with open(os.path.join(root, path, 'command.py'), 'w') as f:
+                f.write(COMMAND_SOURCE)
+        sys.path.insert(0, self.tmp.name)
+        self.registry = CommandRegistry(root)
+
+    def tearDown(self):
+        sys.path.remove(self.tmp.name)
+        for name in [name for name in sys.modules if name.startswith(self.package)]:
+            del sys.modules[name]
+        self.tmp.cleanup()
+
+    def test_nested_dict_skips_private_dirs(self):
+        self.assertEqual(self.registry.to_nested_dict(),
+                         {'jobs': {'kill': None}, 'show': {'leases': None, 'site-status': None}})
+
+    def test_resolve_returns_deepest_node_and_args(self):
+        node, depth = self.registry.resolve(['jobs', 'kill', '3'])
+        self.assertEqual(node.path, ('jobs', 'kill'))
+        self.assertEqual(depth, 2)
+        self.assertTrue(node.is_executable)
+
+        node, depth = self.registry.resolve(['show'])
+        self.assertEqual(depth, 1)
+        self.assertFalse(node.is_executable)
+
+        node, depth = self.registry.resolve(['nope'])
+        self.assertIs(node, self.registry.root)
+        self.assertEqual(depth, 0)
+
+    def test_commands_are_imported_lazily(self):
+        node, _ = self.registry.resolve(['show', 'leases'])
+        self.assertFalse(node.is_loaded)
+        self.assertNotIn(f'{self.package}.show.leases.command', sys.modules)
+        self.assertEqual(node.load()(['show', 'leases'], None).execute(), 'show leases')
+        self.assertTrue(node.is_loaded)
+
+    def test_dispatch_walks_trie(self):
+        dispatcher = CmdDispatcher(self.registry.cmds_dir, self.registry)
+        terminal = MagicMock()
+        self.assertEqual(dispatcher.dispatch('jobs kill 3', terminal), 'jobs kill 3')
+        self.assertIsNone(dispatcher.dispatch('show', terminal))
+        self.assertEqual(dispatcher.dispatch('show foo', terminal), 'Command not found: show foo')
+        self.assertEqual(dispatcher.dispatch('foo', terminal), 'Command not found: foo')
+
+        dispatcher.dispatch('show ?', terminal)
+        terminal.display_string.assert_called_with('leases\nsite-status')
+
+    def test_dispatch_resolves_once(self):
+        dispatcher = CmdDispatcher(self.registry.cmds_dir, self.registry)
+        with patch.object(self.registry, 'resolve', wraps=self.registry.resolve) as resolve:
+            self.assertEqual(dispatcher.dispatch('jobs kill 3', MagicMock()), 'jobs kill 3')
+        resolve.assert_called_once_with(['jobs', 'kill', '3'])
+
+    def test_repo_commands(self):
+        registry = CommandRegistry(COMMANDS_DIR)
+        nested = registry.to_nested_dict()
+        self.assertIn('site-status', nested['show'])
+        self.assertIn('site-status', nested['watch'])
+        self.assertEqual(registry.root.children['show'].children['site-status'].module_name,
+                         'commands.show.site-status.command')
+
+
+if __name__ == '__main__':
+    unittest.main()
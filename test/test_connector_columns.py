@@ -0,0 +1,73 @@
+import unittest
+
+from src.charging_stations_status import ChargingStationsStatus
+
+
+def charger(charger_id, firmware, *connectors):
+    return {
+        'id': charger_id,
+        'firmware_version': firmware,
+        'ip_address': f'10.0.0.{charger_id}',
+        'connectors': [{'id': connector_id, 'status': status,
+                        'ocpp_error': {'error_code': error_code, 'timestamp': timestamp}}
+                       for connector_id, status, error_code, timestamp in connectors],
+    }
+
+
+STATUS = ChargingStationsStatus.from_json({'chargers': [
+    charger('3', '2.0', (1, 'Faulted', 'GroundFailure', '2024-05-28T12:00:00.000+0000'), (2, 'Available', 'NoError', '')),
+    charger('1', '1.0', (2, 'Charging', 'NoError', ''), (1, 'Faulted', 'OverVoltage', '')),
+    charger('2', '2.0', (1, 'Available', 'NoError', '')),
+]})
+
+
+class TestConnectorColumns(unittest.TestCase):
+    def setUp(self):
+        self.columns = STATUS.columns()
+
+    def test_columns_are_categorical(self):
+        self.assertEqual(len(self.columns), 5)
+        self.assertEqual(self.columns.categories['status'].values, ['Faulted', 'Available', 'Charging'])
+        self.assertEqual(self.columns.columns['status'].tolist(), [0, 1, 2, 0, 1])
+        self.assertEqual(self.columns.values('connector_id'), [1, 2, 2, 1, 1])
+
+    def test_where(self):
+        faulted = self.columns.where(status='Faulted')
+        self.assertEqual(faulted.values('charger_id'), ['3', '1'])
+        self.assertEqual(self.columns.where(firmware_version='2.0', status=['Available', 'Charging'])
+                         .values('charger_id'), ['3', '2'])
+        self.assertEqual(len(self.columns.where(status='Unknown')), 0)
+        self.assertEqual(self.columns.where(connector_id=2).values('charger_id'), ['3', '1'])
+        with self.assertRaises(ValueError):
+            self.columns.where(connector=1)
+
+    def test_count_by(self):
+        self.assertEqual(self.columns.count_by('error_code'), {'NoError': 3, 'GroundFailure': 1, 'OverVoltage': 1})
+        self.assertEqual(self.columns.where(status='Faulted').count_by('status'), {'Faulted': 2})
+
+    def test_sort(self):
+        ordered = self.columns.sort('charger_id', 'connector_id')
+        self.assertEqual(list(zip(ordered.values('charger_id'), ordered.values('connector_id'))),
+                         [('1', 1), ('1', 2), ('2', 1), ('3', 1), ('3', 2)])
+        # Stable: equal charger IDs keep their connector order
+        self.assertEqual(self.columns.sort('charger_id', reverse=True).values('connector_id'), [1, 2, 1, 2, 1])
+
+    def test_table_rows_match_status(self):
+        rows = STATUS.table_rows()
+        self.assertEqual([row[:2] for row in rows], [['1', 2], ['1', 1], ['2', 1], ['3', 1], ['3', 2]])
+        self.assertEqual(rows[3], ['3', 1, 'GroundFailure', '240528_1200', '', 'Faulted', '10.0.0.3'])
+        self.assertEqual(rows[0][3], 'UNKNOWN')
+
+    def test_ids_of_any_type(self):
+        status = ChargingStationsStatus.from_json({'chargers': [
+            charger('1', '1.0', ('A', 'Available', 'NoError', ''), (None, 'Faulted', 'NoError', ''),
+                    (2, 'Charging', 'NoError', '')),
+            {'id': None, 'connectors': [{'id': 1, 'status': 'Available'}]},
+        ]})
+        self.assertEqual([row[:2] for row in status.table_rows()], [['1', 'A'], ['1', None], ['1', 2], [None, 1]])
+        self.assertEqual(status.columns().sort('connector_id').values('connector_id'), [1, 2, 'A', None])
+        self.assertEqual(status.columns().where(connector_id=None).values('status'), ['Faulted'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from src.dnsmasq_leases import DnsmasqLeases
+from src.timestamps import format_epoch
+
+LEASES = """1711017257 3a:67:30:61:1d:26 172.22.0.20 * *
+1711014315 3e:62:72:79:77:4b 172.22.0.139 charger-2 01:3e:62:72:79:77:4b
+1711000000 aa:bb:cc:dd:ee:ff 172.22.0.20 * *
+"""
+
+
+class TestDnsmasqLeases(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            f.write(LEASES)
+        self.leases = DnsmasqLeases(self.filename)
+        self.leases.read_leases()
+
+    def tearDown(self):
+        os.unlink(self.filename)
+
+    def test_lookups_by_ip(self):
+        self.assertEqual(self.leases.get_mac_from_ip('172.22.0.139'), '3e:62:72:79:77:4b')
+        self.assertEqual(self.leases.get_lease_time_from_ip('172.22.0.139'), format_epoch('1711014315'))
+        self.assertIsNone(self.leases.get_mac_from_ip('172.22.0.1'))
+        self.assertIsNone(self.leases.get_lease_time_from_ip('172.22.0.1'))
+
+    def test_first_lease_wins(self):
+        self.assertEqual(len(self.leases.entries), 3)
+        self.assertEqual(self.leases.get_mac_from_ip('172.22.0.20'), '3a:67:30:61:1d:26')
+
+    def test_lookup_by_mac(self):
+        self.assertEqual(self.leases.get_ip_from_mac('aa:bb:cc:dd:ee:ff'), '172.22.0.20')
+        self.assertIsNone(self.leases.get_ip_from_mac('00:00:00:00:00:00'))
+
+    def test_dhcpv6_leases(self):
+        self.rewrite(LEASES + "duid 00:01:00:01:2d:7f:4c:10:02:42:ac:16:00:02\n"
+                              "1711017300 1234 fd00::20 charger-6 00:04:12:34:56:78\n")
+        self.leases.read_leases()
+        self.assertEqual(self.leases.duid, '00:01:00:01:2d:7f:4c:10:02:42:ac:16:00:02')
+        self.assertEqual(self.leases.get_lease_time_from_ip('FD00:0::20'), format_epoch(1711017300))
+        self.assertIsNone(self.leases.get_mac_from_ip('fd00::20'))
+        self.assertEqual(self.leases.get_mac_from_ip('172.22.0.139'), '3e:62:72:79:77:4b')
+        self.assertEqual(self.leases.entries[-1]['iaid'], '1234')
+        self.assertNotIn('iaid', self.leases.entries[0])
+
+    def test_reread_replaces_indexes(self):
+        with open(self.filename, 'w') as f:
+            f.write("1711017257 3a:67:30:61:1d:26 172.22.0.21 * *\n")
+        self.leases.read_leases()
+        self.assertIsNone(self.leases.get_mac_from_ip('172.22.0.139'))
+        self.assertEqual(self.leases.get_mac_from_ip('172.22.0.21'), '3a:67:30:61:1d:26')
+
+    def test_unchanged_file_is_not_parsed_again(self):
+        snapshot = self.leases.snapshot
+        with patch('src.dnsmasq_leases.open', side_effect=AssertionError("parsed again")):
+            self.assertFalse(self.leases.read_leases())
+        self.assertIs(self.leases.snapshot, snapshot)
+
+    def test_changed_mtime_is_parsed_again(self):
+        snapshot = self.leases.snapshot
+        st = os.stat(self.filename)
+        os.utime(self.filename, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        self.assertTrue(self.leases.read_leases())
+        self.assertIsNot(self.leases.snapshot, snapshot)
+        self.assertEqual(self.leases.entries, snapshot.entries)
+
+    def test_missing_file_clears_leases(self):
+        os.rename(self.filename, self.filename + '.old')
+        try:
+            with self.assertLogs(level='ERROR'):
+                self.assertTrue(self.leases.read_leases())
+        finally:
+            os.rename(self.filename + '.old', self.filename)
+        self.assertEqual(self.leases.entries, [])
+        self.assertIsNone(self.leases.get_mac_from_ip('172.22.0.139'))
+
+    def test_lease_times_are_formatted_lazily(self):
+        lease = self.leases.snapshot.lease_for_ip('172.22.0.139')
+        self.assertEqual(lease.expires, 1711014315)
+        self.assertEqual(self.leases.entries[1], {
+            'lease_time': format_epoch('1711014315'), 'mac_address': '3e:62:72:79:77:4b',
+            'ip_address': '172.22.0.139', 'hostname': 'charger-2', 'client_id': '01:3e:62:72:79:77:4b'})
+
+    def rewrite(self, text: str):
+        with open(self.filename, 'w') as f:
+            f.write(text)
+
+    def test_delta(self):
+        deltas = []
+        self.leases.listeners.append(deltas.append)
+        self.rewrite("1711099999 3a:67:30:61:1d:26 172.22.0.20 * *\n"
+                     "1711014315 3e:62:72:79:77:4b 172.22.0.139 charger-2 01:3e:62:72:79:77:4b\n"
+                     "1711000000 11:22:33:44:55:66 172.22.0.30 * *\n")
+        self.assertTrue(self.leases.read_leases())
+
+        delta, = deltas
+        self.assertEqual([lease.ip_address for lease in delta.added], ['172.22.0.30'])
+        self.assertEqual([lease.expires for lease in delta.renewed], [1711099999])
+        self.assertEqual(delta.expired, [])
+        self.assertEqual(self.leases.get_ip_from_mac('aa:bb:cc:dd:ee:ff'), None)
+        self.assertEqual(self.leases.get_ip_from_mac('11:22:33:44:55:66'), '172.22.0.30')
+        self.assertEqual(self.leases.get_mac_from_ip('172.22.0.20'), '3a:67:30:61:1d:26')
+
+    def test_renewal_keeps_the_indexes(self):
+        previous = self.leases.snapshot
+        self.rewrite(LEASES.replace('1711014315', '1711099999'))
+        self.leases.read_leases()
+        self.assertIs(self.leases.snapshot.table.by_ip, previous.table.by_ip)
+        self.assertIs(self.leases.snapshot.table.by_mac, previous.table.by_mac)
+        self.assertEqual(self.leases.snapshot.lease_for_ip('172.22.0.139').expires, 1711099999)
+
+    def test_delta_indexes_match_full_read(self):
+        self.rewrite("1 aa:00 10.0.0.1 * *\n2 aa:01 10.0.0.2 * *\n3 aa:02 10.0.0.3 * *\n")
+        self.leases.read_leases()
+        for text in ("1 aa:00 10.0.0.1 * *\n3 aa:02 10.0.0.3 * *\n4 aa:03 10.0.0.4 * *\n",
+                     "3 aa:02 10.0.0.3 * *\n1 aa:00 10.0.0.1 * *\n4 aa:03 10.0.0.4 * *\n",  # Swapped rows
+                     "1 aa:00 10.0.0.1 * *\n1 aa:00 10.0.0.1 * *\n4 aa:03 10.0.0.4 * *\n",  # Repeated address
+                     "1 aa:00 10.0.0.1 * *\n2 aa:02 10.0.0.3 * *\n4 aa:03 10.0.0.4 * *\n",
+                     "1 aa:00 10.0.0.1 * *\n5 aa:00 10.0.0.1 * *\n",
+                     "5 aa:00 10.0.0.1 * *\n"):
+            self.rewrite(text)
+            self.leases.read_leases()
+            full = DnsmasqLeases(self.filename)
+            full.read_leases()
+            self.assertEqual(self.leases.snapshot.table.by_ip, full.snapshot.table.by_ip)
+            self.assertEqual(self.leases.snapshot.table.by_mac, full.snapshot.table.by_mac)
+            for ip in ('10.0.0.1', '10.0.0.2', '10.0.0.3', '10.0.0.4'):
+                self.assertEqual(self.leases.get_lease_time_from_ip(ip), full.get_lease_time_from_ip(ip))
+            for mac in ('aa:00', 'aa:01', 'aa:02', 'aa:03'):
+                self.assertEqual(self.leases.get_ip_from_mac(mac), full.get_ip_from_mac(mac))
+
+    def test_expired_when_removed(self):
+        previous = self.leases.snapshot
+        self.rewrite("1711014315 3e:62:72:79:77:4b 172.22.0.139 charger-2 01:3e:62:72:79:77:4b\n")
+        self.leases.read_leases()
+        delta = self.leases.snapshot.diff(previous)
+        self.assertEqual(sorted(lease.ip_address for lease in delta.expired), ['172.22.0.20'])
+        self.assertFalse(delta.added or delta.renewed)
+
+    def test_watch_applies_changes(self):
+        changed = threading.Event()
+        listener = lambda delta: changed.set()
+        self.leases.watch(listener, debounce=0.01, poll_interval=0.01)
+        try:
+            self.rewrite(LEASES + "1711000000 11:22:33:44:55:66 172.22.0.30 * *\n")
+            self.assertTrue(changed.wait(2))
+            self.assertEqual(self.leases.get_mac_from_ip('172.22.0.30'), '11:22:33:44:55:66')
+        finally:
+            self.leases.unwatch(listener)
+        self.assertIsNone(self.leases.watcher)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from src.file_watcher import FileWatcher
+
+
+class TestFileWatcher(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'dnsmasq.leases')
+        with open(self.path, 'w') as f:
+            f.write("first\n")
+        self.changed = threading.Event()
+        self.watcher = None
+
+    def tearDown(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.directory.cleanup()
+
+    def start(self, **options):
+        self.watcher = FileWatcher(self.path, self.changed.set, debounce=0.01, **options)
+        return self.watcher.start()
+
+    def write(self, text: str, rename: bool = False):
+        target = self.path + '.tmp' if rename else self.path
+        with open(target, 'w') as f:
+            f.write(text)
+        if rename:
+            os.replace(target, self.path)
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "inotify is Linux only")
+    def test_inotify_sees_writes_in_place(self):
+        self.assertEqual(self.start(), 'inotify')
+        self.write("second\n")
+        self.assertTrue(self.changed.wait(2))
+        self.assertEqual(self.watcher.calls, 1)
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "inotify is Linux only")
+    def test_inotify_follows_replaced_file(self):
+        self.start()
+        self.write("second\n", rename=True)
+        self.assertTrue(self.changed.wait(2))
+        self.changed.clear()
+        self.write("third\n")
+        self.assertTrue(self.changed.wait(2))
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "inotify is Linux only")
+    def test_inotify_ignores_other_files(self):
+        self.start()
+        with open(os.path.join(self.directory.name, 'other'), 'w') as f:
+            f.write("x")
+        self.assertFalse(self.changed.wait(0.2))
+
+    def test_poll_fallback(self):
+        self.assertEqual(self.start(use_inotify=False, poll_interval=0.01), 'poll')
+        time.sleep(0.05)
+        self.assertFalse(self.changed.is_set())
+        self.write("a longer second version\n")
+        self.assertTrue(self.changed.wait(2))
+
+    def test_missing_directory_polls(self):
+        self.path = os.path.join(self.directory.name, 'missing', 'dnsmasq.leases')
+        with self.assertLogs(level='INFO'):
+            self.assertEqual(self.start(poll_interval=0.01), 'poll')
+
+    def test_stop(self):
+        self.start()
+        self.watcher.stop()
+        self.assertFalse(self.watcher.running)
+        self.write("second\n")
+        self.assertFalse(self.changed.wait(0.1))
+
+
+if __name__ == '__main__':
+    unittest.main()
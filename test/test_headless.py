@@ -0,0 +1,73 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import main
+from main import create_dispatcher
+from src.command_registry import CommandRegistry
+from src.headless import run_headless, read_commands, EXIT_OK, EXIT_FAILURE, EXIT_NOT_FOUND
+
+
+class TestHeadless(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = create_dispatcher()
+        self.out = io.StringIO()
+        self.err = io.StringIO()
+
+    def test_table_format_writes_command_output(self):
+        exit_code = run_headless(self.dispatcher, ['watch counter'], out=self.out, err=self.err)
+        self.assertEqual(exit_code, EXIT_OK)
+        self.assertIn("Time:", self.out.getvalue())
+        self.assertIn("['watch', 'counter']", self.out.getvalue())
+        self.assertEqual(self.err.getvalue(), '')
+
+    def test_unknown_command_sets_exit_code(self):
+        exit_code = run_headless(self.dispatcher, ['watch counter', 'nope'], fmt='json', out=self.out, err=self.err)
+        self.assertEqual(exit_code, EXIT_NOT_FOUND)
+        results = [json.loads(line) for line in self.out.getvalue().splitlines()]
+        self.assertEqual([r['exit_code'] for r in results], [EXIT_OK, EXIT_NOT_FOUND])
+        self.assertEqual(results[1]['error'], 'Command not found: nope')
+
+    def test_json_format_uses_collect(self):
+        command = MagicMock()
+        command.collect.return_value = {'chargers': []}
+        dispatcher = MagicMock()
+        dispatcher.create_command.return_value = command
+
+        exit_code = run_headless(dispatcher, ['show site-status'], fmt='json', out=self.out, err=self.err)
+
+        self.assertEqual(exit_code, EXIT_OK)
+        dispatcher.create_command.assert_called_once_with(['show', 'site-status'], unittest.mock.ANY)
+        command.execute.assert_not_called()
+        self.assertEqual(json.loads(self.out.getvalue())['data'], {'chargers': []})
+
+    def test_failing_command(self):
+        command = MagicMock(spec=['execute'])
+        command.execute.side_effect = ConnectionError("refused")
+        dispatcher = MagicMock()
+        dispatcher.create_command.return_value = command
+
+        exit_code = run_headless(dispatcher, ['show site-status'], out=self.out, err=self.err)
+
+        self.assertEqual(exit_code, EXIT_FAILURE)
+        self.assertIn("ConnectionError: refused", self.err.getvalue())
+
+    def test_commands_are_found_from_any_directory(self):
+        # exec is run from cron in another working directory
+        self.assertTrue(os.path.isabs(main.COMMANDS_DIR))
+        with tempfile.TemporaryDirectory() as directory:
+            self.addCleanup(os.chdir, os.getcwd())
+            os.chdir(directory)
+            registry = CommandRegistry(main.COMMANDS_DIR)
+        self.assertIsNotNone(registry.resolve(['show', 'site-status'])[0].load())
+
+    def test_read_commands_skips_blanks_and_comments(self):
+        stream = io.StringIO("show site-status\n\n# sweep\n  watch counter  \n")
+        self.assertEqual(list(read_commands(stream)), ['show site-status', 'watch counter'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import json
+import unittest
+
+from src import json_backend
+from src.charging_stations_status import ChargingStationsStatus, OcppError
+
+PAYLOAD = json.dumps({'chargers': [{
+    'connectors': [{'id': 1, 'ocpp_error': {'error_code': 'NoError', 'info': 'ok'}, 'status': 'Charging'}],
+    'firmware_version': '1.0',
+    'id': 'CHG1',
+    'ip_address': '10.0.0.1',
+    'ocpp_error': None,
+    'status': 'Available',
+}]}).encode()
+
+
+class TestJsonBackend(unittest.TestCase):
+    def setUp(self):
+        self.previous = json_backend.get_backend()
+
+    def tearDown(self):
+        json_backend.set_backend(self.previous.name)
+
+    def test_backends_decode_bytes_and_str_alike(self):
+        for name in json_backend.BACKENDS:
+            json_backend.set_backend(name)
+            self.assertEqual(json_backend.loads(PAYLOAD), json.loads(PAYLOAD))
+            self.assertEqual(json_backend.loads(PAYLOAD.decode()), json.loads(PAYLOAD))
+
+    def test_invalid_json_raises_decode_error(self):
+        for name in json_backend.BACKENDS:
+            json_backend.set_backend(name)
+            with self.assertRaises(json_backend.DecodeError):
+                json_backend.loads(b'{"chargers": [')
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            json_backend.set_backend('simdjson')
+        self.assertIs(json_backend.get_backend(), self.previous)
+
+    def test_models_from_bytes(self):
+        for name in json_backend.BACKENDS:
+            json_backend.set_backend(name)
+            status = ChargingStationsStatus.from_json(json_backend.loads(PAYLOAD))
+            charger = status.chargers[0]
+            self.assertEqual(charger.id, 'CHG1')
+            self.assertEqual(charger.ocpp_error, OcppError('', '', '', '', ''))
+            connector = charger.connectors[0]
+            self.assertEqual(connector.ocpp_error, OcppError('NoError', 'ok', '', '', ''))
+            self.assertEqual((connector.id, connector.ocpp_error_code, connector.priority, connector.status),
+                             (1, '', False, 'Charging'))
+
+
+if __name__ == '__main__':
+    unittest.main()
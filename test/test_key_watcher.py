@@ -0,0 +1,80 @@
+import functools
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import fakeredis
+import redis
+
+from src.key_watcher import KeyWatcher, keyspace_events_enabled
+from src.redis_handler import RedisHandler
+
+ConnectionPool = redis.ConnectionPool
+
+
+class TestKeyWatcher(unittest.TestCase):
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        pool = functools.partial(ConnectionPool, connection_class=fakeredis.FakeRedisConnection, server=server)
+        patcher = patch('src.redis_handler.redis.ConnectionPool', side_effect=pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.handler = RedisHandler()
+        self.addCleanup(self.handler.close)
+        self.called = threading.Event()
+        self.watcher = KeyWatcher(self.handler, ['cgw/SiteStatus', 'cgw/ChargingStationsStatus'],
+                                  self.called.set, debounce=0.05)
+        self.addCleanup(self.watcher.stop)
+
+    def test_flags(self):
+        self.assertTrue(keyspace_events_enabled('KEA'))
+        self.assertTrue(keyspace_events_enabled('K$'))
+        self.assertFalse(keyspace_events_enabled(''))
+        self.assertFalse(keyspace_events_enabled('Ex'))
+
+    def test_falls_back_when_config_is_unavailable(self):
+        # fakeredis does not implement CONFIG, like servers where it is renamed or not permitted
+        with self.assertLogs(level='INFO'):
+            self.assertFalse(self.watcher.start())
+        self.assertFalse(self.watcher.running)
+
+    def test_falls_back_when_notifications_are_disabled(self):
+        with patch.object(redis.StrictRedis, 'config_get', return_value={'notify-keyspace-events': ''}):
+            self.assertFalse(self.watcher.start())
+
+    def test_burst_of_changes_is_debounced(self):
+        with patch.object(KeyWatcher, 'notifications_enabled', return_value=True):
+            self.assertTrue(self.watcher.start())
+        for i in range(5):
+            self.handler.set_value('cgw/SiteStatus', str(i))
+        self.handler.set_value('cgw/ChargingStationsStatus', 'x')
+        self.handler.set_value('unrelated', 'x')
+
+        self.assertTrue(self.called.wait(2))
+        time.sleep(0.1)
+        self.assertEqual(self.watcher.events, 6)
+        self.assertEqual(self.watcher.calls, 1)
+
+    def test_no_calls_while_idle(self):
+        with patch.object(KeyWatcher, 'notifications_enabled', return_value=True):
+            self.watcher.start()
+        self.assertFalse(self.called.wait(0.2))
+        self.watcher.stop()
+        self.assertFalse(self.watcher.running)
+
+    def test_subscriptions_leave_the_command_pool_alone(self):
+        watchers = [KeyWatcher(self.handler, ['cgw/SiteStatus'], lambda: None)
+                    for _ in range(self.handler.max_connections + 1)]
+        with patch.object(KeyWatcher, 'notifications_enabled', return_value=True):
+            for watcher in watchers:
+                watcher.poll_timeout = 0.02
+                self.addCleanup(watcher.stop)
+                self.assertTrue(watcher.start())
+        self.handler.set_value('cgw/SiteStatus', 'x')
+        self.assertEqual(self.handler.get_many(['cgw/SiteStatus']), [b'x'])
+        self.assertEqual(len(self.handler.pool._in_use_connections), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
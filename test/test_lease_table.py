@@ -0,0 +1,183 @@
+import os
+import tempfile
+import unittest
+
+from src.lease_table import (IPV6_TAG, LeaseTable, int_to_ipv4, int_to_ipv6, int_to_mac, ip_key, ipv4_to_int,
+                             ipv6_to_int, mac_key, mac_to_int)
+
+LEASES = b"""1711017257 3a:67:30:61:1d:26 172.22.0.20 * *
+1711014315 3E:62:72:79:77:4B 172.22.0.139 charger-2 01:3e:62:72:79:77:4b
+1711000000 aa:bb:cc:dd:ee:ff 172.22.0.20 * *
+"""
+
+DHCPV6 = b"""duid 00:01:00:01:2d:7f:4c:10:02:42:ac:16:00:02
+1711017300 1234 fd00::20 charger-6 00:04:12:34:56:78
+1711017400 T5678 FD00:0:0::139 * 00:04:ab:cd:ef:01
+"""
+
+
+class TestAddresses(unittest.TestCase):
+    def test_ipv4_round_trip(self):
+        self.assertEqual(ipv4_to_int('172.22.0.139'), 0xac16008b)
+        self.assertEqual(ipv4_to_int(b'172.22.0.139'), 0xac16008b)
+        self.assertEqual(int_to_ipv4(0xac16008b), '172.22.0.139')
+        for text in ('fd00::1', '172.22.0.1139', '172.022.0.1', 'host'):
+            self.assertIsNone(ipv4_to_int(text), text)
+
+    def test_ipv6_round_trip(self):
+        self.assertEqual(ipv6_to_int('::1'), 1)
+        self.assertEqual(ipv6_to_int(b'FD00:0::20'), ipv6_to_int('fd00::20'))
+        self.assertEqual(int_to_ipv6(ipv6_to_int('FD00:0:0::20')), 'fd00::20')
+        self.assertIsNone(ipv6_to_int('172.22.0.20'))
+        self.assertIsNone(ipv6_to_int('fd00::zz'))
+
+    def test_mac_round_trip(self):
+        self.assertEqual(mac_to_int('3e:62:72:79:77:4b'), 0x3e627279774b)
+        self.assertEqual(mac_to_int(b'3E:62:72:79:77:4B'), 0x3e627279774b)
+        self.assertEqual(int_to_mac(0x3e627279774b), '3e:62:72:79:77:4b')
+        self.assertIsNone(mac_to_int('aa:00'))
+        self.assertIsNone(mac_to_int('zz:62:72:79:77:4b'))
+
+    def test_keys(self):
+        self.assertEqual(ip_key('172.22.0.139'), 0xac16008b)
+        self.assertEqual(ip_key('fd00::1'), ip_key('FD00:0::1'))
+        self.assertEqual(ip_key('::1'), 1 | IPV6_TAG)
+        self.assertNotEqual(ip_key('::1'), ip_key('0.0.0.1'))
+        self.assertEqual(ip_key('fe80::1%eth0'), 'fe80::1%eth0')
+        self.assertEqual(mac_key('3E:62:72:79:77:4B'), mac_key('3e:62:72:79:77:4b'))
+        self.assertEqual(mac_key('aa:00'), 'aa:00')
+
+
+class TestLeaseTable(unittest.TestCase):
+    def test_parse(self):
+        table = LeaseTable.parse(LEASES)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.expires.tolist(), [1711017257, 1711014315, 1711000000])
+        self.assertEqual(table.ip_address(1), '172.22.0.139')
+        self.assertEqual(table.mac_address(1), '3e:62:72:79:77:4b')
+        self.assertEqual(table.hostnames, ['*', 'charger-2', '*'])
+        self.assertEqual(table.client_ids[1], '01:3e:62:72:79:77:4b')
+        self.assertIs(table.hostnames[0], table.hostnames[2])
+
+    def test_first_row_wins(self):
+        table = LeaseTable.parse(LEASES)
+        self.assertEqual(table.by_ip[ip_key('172.22.0.20')], 0)
+        self.assertEqual(table.by_mac[mac_key('aa:bb:cc:dd:ee:ff')], 2)
+
+    def test_slow_path(self):
+        table = LeaseTable.parse(b"1711017257 3a:67:30:61:1d:26 172.22.0.20 * * extra\n"
+                                 b"short line\n"
+                                 b"\n"
+                                 b"1711014315 3e:62:72:79:77:4b 172.22.0.139 charger-2 *")
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.ip_address(1), '172.22.0.139')
+
+    def test_mixed_field_counts_do_not_shift_columns(self):
+        # As many fields as five per line, but not five on each line
+        table = LeaseTable.parse(b"1711017257 3a:67:30:61:1d:26 172.22.0.20 * * extra\n"
+                                 b"1711014315 3e:62:72:79:77:4b 172.22.0.139 charger-2\n"
+                                 b"1711000000 aa:bb:cc:dd:ee:ff 172.22.0.30 charger-3 *\n")
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.expires.tolist(), [1711017257, 1711000000])
+        self.assertEqual(table.ip_address(1), '172.22.0.30')
+        self.assertEqual(table.hostnames, ['*', 'charger-3'])
+        self.assertEqual(table.client_ids, ['*', '*'])
+
+    def test_malformed_expiry_is_skipped(self):
+        with self.assertLogs(level='ERROR'):
+            table = LeaseTable.parse(b"never 3a:67:30:61:1d:26 172.22.0.20 * *\n"
+                                     b"1711014315 3e:62:72:79:77:4b 172.22.0.139 charger-2 *\n")
+        self.assertEqual(len(table), 1)
+        self.assertEqual(table.ip_address(0), '172.22.0.139')
+
+    def test_addresses_kept_as_text(self):
+        table = LeaseTable.parse(b"1711017257 aa:00 host-20 * *\n")
+        self.assertEqual(table.ip_address(0), 'host-20')
+        self.assertEqual(table.mac_address(0), 'aa:00')
+        self.assertEqual(table.by_ip, {'host-20': 0})
+        self.assertEqual(table.by_mac, {'aa:00': 0})
+
+    def test_dhcpv6(self):
+        table = LeaseTable.parse(LEASES + DHCPV6)
+        self.assertEqual(len(table), 5)
+        self.assertEqual(table.duid, '00:01:00:01:2d:7f:4c:10:02:42:ac:16:00:02')
+        self.assertEqual(table.dhcpv6_start, 3)
+        self.assertEqual(table.ip_address(3), 'fd00::20')
+        self.assertEqual(table.ip_address(4), 'fd00::139')
+        self.assertEqual(table.by_ip[ip_key('fd00:0::139')], 4)
+        self.assertEqual([table.iaid(row) for row in range(5)], [None, None, None, '1234', 'T5678'])
+        self.assertIsNone(table.mac_address(3))
+        self.assertEqual(table.client_ids[3], '00:04:12:34:56:78')
+        self.assertEqual(len(table.by_mac), 3)
+        self.assertEqual(table.ip_address(1), '172.22.0.139')
+
+    def test_dhcpv6_only(self):
+        table = LeaseTable.parse(DHCPV6)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.dhcpv6_start, 0)
+        self.assertEqual(table.by_mac, {})
+        self.assertIsNone(LeaseTable.parse(LEASES).duid)
+        self.assertEqual(len(LeaseTable.parse(DHCPV6.splitlines()[0])), 0)
+
+    def test_dhcpv6_slow_path(self):
+        with self.assertLogs(level='ERROR'):
+            table = LeaseTable.parse(LEASES + DHCPV6 + b"never 9 fd00::99 * *\nshort\n")
+        self.assertEqual(len(table), 5)
+        self.assertEqual(table.iaid(4), 'T5678')
+
+    def test_read(self):
+        fd, filename = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(LEASES)
+            with open(filename, 'rb') as f:
+                self.assertEqual(len(LeaseTable.read(f)), 3)
+            with open(filename, 'ab') as f:
+                f.write(DHCPV6)
+            with open(filename, 'rb') as f:
+                table = LeaseTable.read(f)
+            self.assertEqual((len(table), table.dhcpv6_start), (5, 3))
+            self.assertEqual(table.ip_address(4), 'fd00::139')
+            open(filename, 'wb').close()
+            with open(filename, 'rb') as f:
+                self.assertEqual(len(LeaseTable.read(f)), 0)
+
+            # dnsmasq truncates the file in place before writing it again
+            with open(filename, 'wb') as f:
+                f.write(LEASES)
+            with open(filename, 'rb') as f:
+                os.truncate(filename, 0)
+                self.assertEqual(len(LeaseTable.read(f)), 0)
+        finally:
+            os.unlink(filename)
+
+    def test_changed_rows(self):
+        table = LeaseTable.parse(LEASES)
+        renewed = LeaseTable.parse(LEASES.replace(b'1711014315', b'1711099999'))
+        self.assertEqual(renewed.changed_rows(table), [1])
+        self.assertEqual(table.changed_rows(table), [])
+        self.assertIsNone(LeaseTable.parse(LEASES[:LEASES.rindex(b'1711000000')]).changed_rows(table))
+
+        table = LeaseTable.parse(LEASES + DHCPV6)
+        self.assertEqual(LeaseTable.parse(LEASES + DHCPV6.replace(b'T5678', b'T5679')).changed_rows(table), [4])
+        self.assertIsNone(LeaseTable.parse(LEASES + DHCPV6.replace(b'fd00::20', b'fd00::21')).changed_rows(table))
+
+
+    def test_indexes_follow_previous_table(self):
+        table = LeaseTable.parse(LEASES + DHCPV6)
+        renewed = LeaseTable.parse(LEASES.replace(b'1711014315', b'1711099999') + DHCPV6, table)
+        self.assertIs(renewed.by_ip, table.by_ip)
+        self.assertIs(renewed.by_mac, table.by_mac)
+
+        for data in (LEASES.replace(b'3e:62:72:79:77:4b 172.22.0.139', b'3e:62:72:79:77:4c 172.22.0.140') + DHCPV6,
+                     LEASES + DHCPV6.replace(b'fd00::20', b'172.22.0.139'),  # Repeats an address
+                     LEASES[:LEASES.rindex(b'1711000000')] + DHCPV6):
+            updated = LeaseTable.parse(data, table)
+            full = LeaseTable.parse(data)
+            self.assertEqual(updated.by_ip, full.by_ip)
+            self.assertEqual(updated.by_mac, full.by_mac)
+        self.assertIs(LeaseTable.parse(LEASES + DHCPV6.replace(b'T5678', b'T5679'), table).by_mac, table.by_mac)
+
+
+if __name__ == '__main__':
+    unittest.main()
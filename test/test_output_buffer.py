@@ -0,0 +1,68 @@
+import unittest
+
+from src.output_buffer import OutputBuffer, OutputControl, create_output_window
+
+
+class TestOutputBuffer(unittest.TestCase):
+    def test_append_splits_lines(self):
+        buffer = OutputBuffer(max_lines=10)
+        buffer.append("a\nb")
+        buffer.append("c")
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.text, "a\nb\nc")
+        self.assertEqual(buffer[-1], "c")
+
+    def test_oldest_lines_are_evicted(self):
+        buffer = OutputBuffer(max_lines=3)
+        for i in range(5):
+            buffer.append(str(i))
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.text, "2\n3\n4")
+        self.assertEqual(buffer.dropped, 2)
+        with self.assertRaises(IndexError):
+            buffer[3]
+
+    def test_clear(self):
+        buffer = OutputBuffer(max_lines=3)
+        buffer.append("a\nb")
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+        buffer.append("c")
+        self.assertEqual(buffer.text, "c")
+
+
+class TestOutputControl(unittest.TestCase):
+    def setUp(self):
+        self.buffer = OutputBuffer(max_lines=100)
+        self.buffer.append('\n'.join(str(i) for i in range(50)))
+        self.window = create_output_window(self.buffer)
+        self.control: OutputControl = self.window.content
+
+    def test_follows_tail(self):
+        content = self.control.create_content(80, 10)
+        self.assertEqual(content.line_count, 50)
+        self.assertEqual(content.cursor_position.y, 49)
+        self.assertEqual(content.get_line(49), [('', '49')])
+
+        self.buffer.append("50")
+        self.assertEqual(self.control.create_content(80, 10).cursor_position.y, 50)
+
+    def test_scrolled_view_stays_put_until_back_at_bottom(self):
+        self.control.scroll(-10)
+        self.assertFalse(self.control.following)
+        self.buffer.append("50")
+        self.assertEqual(self.control.create_content(80, 10).cursor_position.y, 39)
+
+        self.control.scroll(100)
+        self.assertTrue(self.control.following)
+        self.assertEqual(self.control.create_content(80, 10).cursor_position.y, 50)
+
+    def test_scrolled_view_tracks_evicted_lines(self):
+        self.control.scroll(-10)  # bottom line is '39'
+        self.buffer.append('\n'.join('x' * 60))  # evicts 10 lines
+        content = self.control.create_content(80, 10)
+        self.assertEqual(content.get_line(content.cursor_position.y), [('', '39')])
+
+
+if __name__ == '__main__':
+    unittest.main()
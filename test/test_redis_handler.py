@@ -0,0 +1,350 @@
+import functools
+import socket
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import fakeredis
+import redis
+
+from src.redis_handler import CircuitBreaker, RedisHandler, ValueCache, close_redis_handlers, get_redis_handler
+
+ConnectionPool = redis.ConnectionPool
+
+
+def wait_until(condition, timeout: float = 2.0) -> bool:
+    # The losing endpoint probe finishes on its own thread, possibly after the winner was returned
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class StandInServer:
+    """
+    Local TCP stand-in for a Redis server that answers PING, or misbehaves.
+
+    Modes: 'ok' answers right away, 'delay' answers after ``delay`` seconds,
+    'silent' accepts connections and never answers, 'drop' closes them at once.
+    """
+
+    REPLIES = {
+        b'HELLO': b'%1\r\n$5\r\nproto\r\n:3\r\n',
+        b'PING': b'+PONG\r\n',
+    }
+
+    def __init__(self, mode: str = 'ok', delay: float = 0.0):
+        self.mode = mode
+        self.delay = delay
+        self.connections = 0
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(16)
+        self.port = self.sock.getsockname()[1]
+        self._open = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            self._open.append(conn)
+            if self.mode == 'drop':
+                conn.close()
+            elif self.mode != 'silent':
+                threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        buffer = b''
+        while True:
+            try:
+                data = conn.recv(4096)
+            except OSError:
+                return
+            if not data:
+                return
+            buffer += data
+            while True:
+                command, buffer = self._parse(buffer)
+                if command is None:
+                    break
+                if self.delay:
+                    time.sleep(self.delay)
+                reply = self.REPLIES.get(command[0].upper(), b'+OK\r\n')
+                try:
+                    conn.sendall(reply)
+                except OSError:
+                    return
+
+    @staticmethod
+    def _parse(buffer):
+        # One RESP array of bulk strings, or None if it is not complete yet
+        lines = buffer.split(b'\r\n')
+        if len(lines) < 2 or not lines[0].startswith(b'*'):
+            return None, buffer
+        count = int(lines[0][1:])
+        if len(lines) < 2 + 2 * count:
+            return None, buffer
+        args = [lines[2 + 2 * i] for i in range(count)]
+        consumed = len(b'\r\n'.join(lines[:1 + 2 * count])) + 2
+        return args, buffer[consumed:]
+
+    def close(self):
+        self.sock.close()
+        for conn in self._open:
+            conn.close()
+
+
+class TestRedisHandler(unittest.TestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        pool = functools.partial(ConnectionPool, connection_class=fakeredis.FakeRedisConnection, server=self.server)
+        patcher = patch('src.redis_handler.redis.ConnectionPool', side_effect=pool)
+        self.pool_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(close_redis_handlers)
+
+    def test_connects_lazily(self):
+        handler = RedisHandler()
+        self.pool_class.assert_not_called()
+        handler.set_value('key', 'value')
+        self.assertEqual(handler.get_value('key'), 'value')
+        self.pool_class.assert_called_once()
+
+    def test_get_many(self):
+        handler = RedisHandler()
+        handler.set_value('a', '{"x": 1}')
+        handler.set_value('b', 'é')
+        self.assertEqual(handler.get_many(['a', 'missing', 'b']), [b'{"x": 1}', None, 'é'.encode()])
+        self.assertEqual(handler.get_many(['b'], raw=False), ['é'])
+        self.assertEqual(handler.get_many([]), [])
+
+    def test_get_many_error(self):
+        handler = RedisHandler()
+        self.server.connected = False
+        with self.assertLogs(level='ERROR'):
+            self.assertEqual(handler.get_many(['a', 'b']), [None, None])
+
+    def test_get_many_cached(self):
+        handler = RedisHandler()
+        handler.set_value('a', '1')
+        with patch.object(redis.StrictRedis, 'mget', wraps=handler.redis_client.mget) as mget:
+            first = handler.get_many_cached(['a', 'b'])
+            second = handler.get_many_cached(['a', 'b'])
+        mget.assert_called_once_with(['a', 'b'])
+        self.assertEqual([entry.value for entry in first], [b'1', None])
+        self.assertIs(second[0], first[0])
+        self.assertEqual(handler.cache.hits, 2)
+        self.assertEqual(handler.cache.misses, 2)
+
+    def test_tracked_keys_are_invalidated_on_change(self):
+        handler = RedisHandler()
+        handler.set_value('a', '1')
+        with patch('src.key_watcher.KeyWatcher.notifications_enabled', return_value=True):
+            self.assertTrue(handler.track(['a']))
+        entry = handler.get_many_cached(['a'])[0]
+        self.assertGreater(entry.expires - handler.cache.ttl, 1)
+
+        handler.set_value('a', '2')
+        deadline = time.monotonic() + 2
+        while handler.cache.invalidations < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(handler.get_many_cached(['a'])[0].value, b'2')
+
+    def test_tracking_stops_when_notifications_are_lost(self):
+        handler = RedisHandler()
+        self.addCleanup(handler.close)
+        handler.set_value('a', '1')
+        with patch('src.key_watcher.KeyWatcher.notifications_enabled', return_value=True):
+            self.assertTrue(handler.track(['a']))
+        watcher = handler._watchers[0]
+        handler.get_many_cached(['a'])
+
+        with self.assertLogs(level='ERROR') as logs, \
+                patch.object(watcher._pubsub, 'get_message', side_effect=redis.ConnectionError('lost')):
+            watcher._thread.join(2)
+            self.assertIn('Keyspace notifications stopped', logs.output[0])
+        self.assertEqual(handler._watchers, [])
+        self.assertNotIn('a', handler.cache.tracked)
+        self.assertFalse(handler.tracking_attempted(['a']))
+        self.assertEqual(handler.cache.get('a'), None)
+
+        with patch('src.key_watcher.KeyWatcher.notifications_enabled', return_value=True):
+            self.assertTrue(handler.track(['a']))
+        self.assertEqual(len(handler._watchers), 1)
+
+    def test_untracked_keys_are_tried_once(self):
+        handler = RedisHandler()
+        with patch('src.key_watcher.KeyWatcher.notifications_enabled', return_value=False) as enabled:
+            self.assertFalse(handler.track(['a']))
+            self.assertFalse(handler.track(['a']))
+        enabled.assert_called_once()
+
+    def test_pool_options(self):
+        handler = RedisHandler(max_connections=3, socket_timeout=0.5, health_check_interval=10)
+        handler.exists('key')
+        kwargs = self.pool_class.call_args.kwargs
+        self.assertEqual(kwargs['max_connections'], 3)
+        self.assertEqual(kwargs['socket_timeout'], 0.5)
+        self.assertEqual(kwargs['socket_connect_timeout'], RedisHandler.socket_connect_timeout)
+        self.assertEqual(kwargs['health_check_interval'], 10)
+
+    def test_falls_back_to_local(self):
+        external_server = fakeredis.FakeServer()
+        external_server.connected = False
+        hosts = []
+
+        def create_pool(**kwargs):
+            hosts.append(kwargs['host'])
+            server = external_server if kwargs['host'] == 'external' else self.server
+            return ConnectionPool(connection_class=fakeredis.FakeRedisConnection, server=server, **kwargs)
+
+        self.pool_class.side_effect = create_pool
+        handler = RedisHandler(external_host='external', external_port=6379)
+        with self.assertLogs(level='ERROR') as logs:
+            self.assertIsNotNone(handler.redis_client)
+            wait_until(lambda: logs.records)
+        self.assertCountEqual(hosts, ['external', 'localhost'])
+        self.assertEqual(handler.pool.connection_kwargs['host'], 'localhost')
+        self.assertEqual(handler.endpoint, 'local')
+
+    def test_shared_handlers(self):
+        first = get_redis_handler()
+        self.assertIs(get_redis_handler(), first)
+        self.assertIsNot(get_redis_handler(port=6380), first)
+
+        first.set_value('key', 'value')
+        pool = first.pool
+        for _ in range(10):
+            get_redis_handler().get_value('key')
+        self.assertIs(first.pool, pool)
+        self.assertEqual(self.pool_class.call_count, 1)
+
+    def test_close_reconnects_on_next_use(self):
+        handler = get_redis_handler()
+        handler.set_value('key', 'value')
+        close_redis_handlers()
+        self.assertIsNone(handler.pool)
+        self.assertIsNot(get_redis_handler(), handler)
+
+
+class TestFailover(unittest.TestCase):
+    def server(self, mode='ok', delay=0.0) -> StandInServer:
+        server = StandInServer(mode, delay)
+        self.addCleanup(server.close)
+        return server
+
+    def handler(self, local: StandInServer, external: StandInServer = None, **kwargs) -> RedisHandler:
+        handler = RedisHandler(host='127.0.0.1', port=local.port, external_host=external and '127.0.0.1',
+                               external_port=external and external.port, socket_timeout=0.3,
+                               socket_connect_timeout=0.3, **kwargs)
+        self.addCleanup(handler.close)
+        return handler
+
+    def test_silent_external_does_not_stall_the_local_fallback(self):
+        handler = self.handler(self.server(), external=self.server('silent'))
+        start = time.monotonic()
+        with self.assertLogs(level='INFO'):
+            handler.redis_client
+        self.assertLess(time.monotonic() - start, 0.25)
+        self.assertEqual(handler.endpoint, 'local')
+
+    def test_fastest_healthy_endpoint_wins(self):
+        handler = self.handler(self.server(delay=0.15), external=self.server())
+        handler.redis_client
+        self.assertEqual(handler.endpoint, 'external')
+
+        handler = self.handler(self.server(), external=self.server(delay=0.15))
+        handler.redis_client
+        self.assertEqual(handler.endpoint, 'local')
+
+    def test_breaker_skips_a_dropped_endpoint(self):
+        external = self.server('drop')
+        handler = self.handler(self.server(), external=external)
+        with self.assertLogs(level='ERROR') as logs:
+            handler.redis_client
+            wait_until(lambda: logs.records and handler.breakers['external'].state == 'open')
+        self.assertEqual(handler.breakers['external'].state, 'open')
+        connections = external.connections
+
+        handler.close()
+        handler.redis_client
+        self.assertEqual(external.connections, connections)
+
+    def test_fails_fast_and_reconnects_in_the_background(self):
+        local = self.server('silent')
+        handler = self.handler(local, reconnect_interval=0.05)
+        with self.assertLogs(level='ERROR'):
+            with self.assertRaises(redis.TimeoutError):
+                handler.redis_client
+
+        # Within the cooldown no command waits on the dead server
+        start = time.monotonic()
+        with self.assertRaises(redis.ConnectionError):
+            handler.redis_client
+        self.assertLess(time.monotonic() - start, 0.05)
+
+        local.mode = 'ok'
+        local.close()
+        healthy = self.server()
+        handler.local_config['port'] = healthy.port
+        deadline = time.monotonic() + 3
+        while handler._client is None and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertTrue(handler.redis_client.ping())
+        self.assertEqual(handler.breakers['local'].state, 'closed')
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_cooldown(self):
+        breaker = CircuitBreaker(cooldown=0.05, failure_threshold=2)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+        self.assertFalse(breaker.allow())
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, 'half-open')
+        breaker.record_success()
+        self.assertEqual(breaker.state, 'closed')
+
+
+class TestValueCache(unittest.TestCase):
+    def test_ttl_and_versions(self):
+        cache = ValueCache(ttl=0.05)
+        entry = cache.put('a', b'1')
+        self.assertIs(cache.get('a'), entry)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('a'))
+
+        # Same value keeps its version and parsed objects
+        self.assertIs(cache.parsed(entry, 'int', int), cache.parsed(cache.put('a', b'1'), 'int', int))
+        changed = cache.put('a', b'2')
+        self.assertNotEqual(changed.version, entry.version)
+        self.assertEqual(cache.parsed(changed, 'int', int), 2)
+        self.assertEqual((cache.parse_hits, cache.parse_misses), (1, 2))
+
+    def test_lru_eviction(self):
+        cache = ValueCache(max_entries=2)
+        cache.put('a', b'1')
+        cache.put('b', b'2')
+        cache.get('a')
+        cache.put('c', b'3')
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_value_fetched_before_an_invalidation_is_not_cached(self):
+        cache = ValueCache()
+        generation = cache.generation('a')
+        cache.invalidate(['a'])
+        cache.put('a', b'stale', generation)
+        self.assertIsNone(cache.get('a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from main import create_dispatcher
+from src.scheduler import JobNotFound, JobScheduler
+
+
+class TestJobScheduler(unittest.TestCase):
+    def run_loop(self, scheduler: JobScheduler, seconds: float) -> None:
+        async def main():
+            scheduler.attach()
+            await asyncio.sleep(seconds)
+            scheduler.cancel_all()
+
+        asyncio.run(main())
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def setUp(self):
+        self.scheduler = JobScheduler(max_workers=2)
+
+    def test_ticks_do_not_drift(self):
+        starts = []
+
+        def func():
+            starts.append(time.monotonic())
+            time.sleep(0.02)
+
+        self.scheduler.add_job(func, 0.05)
+        self.run_loop(self.scheduler, 0.33)
+
+        # With sleep-after-work the 7th tick would start around 0.42s
+        self.assertGreaterEqual(len(starts), 6)
+        self.assertLess(starts[5] - starts[0], 0.25 + 0.04)
+
+    def test_overrun_skips_ticks(self):
+        job = self.scheduler.add_job(lambda: time.sleep(0.12), 0.05)
+        self.run_loop(self.scheduler, 0.3)
+
+        self.assertGreaterEqual(job.ticks, 2)
+        self.assertLessEqual(job.ticks, 3)
+        self.assertGreaterEqual(job.overruns, 2)
+
+    def test_sink_receives_results_and_errors(self):
+        results = []
+        count = iter(range(100))
+
+        def func():
+            n = next(count)
+            if n == 1:
+                raise ValueError("boom")
+            return n
+
+        self.scheduler.add_job(func, 0.02, name='numbers', sink=results.append)
+        with self.assertLogs(level='ERROR'):
+            self.run_loop(self.scheduler, 0.09)
+
+        self.assertEqual(results[0], 0)
+        self.assertEqual(results[1], "Job 1 (numbers) failed: boom")
+        self.assertEqual(results[2], 2)
+
+    def test_cancel_from_another_thread(self):
+        results = []
+        job = self.scheduler.add_job(lambda: 'tick', 0.02, sink=results.append)
+
+        async def main():
+            self.scheduler.attach()
+            await asyncio.sleep(0.05)
+            await asyncio.get_running_loop().run_in_executor(None, self.scheduler.cancel, job)
+            await asyncio.sleep(0.01)
+            count = len(results)
+            await asyncio.sleep(0.06)
+            return count
+
+        count = asyncio.run(main())
+        self.assertTrue(job.cancelled)
+        self.assertNotIn(job.id, self.scheduler.jobs)
+        self.assertEqual(len(results), count)
+
+    def test_many_jobs_share_a_few_threads(self):
+        threads = set()
+        lock = threading.Lock()
+
+        def func():
+            with lock:
+                threads.add(threading.current_thread().name)
+
+        for _ in range(50):
+            self.scheduler.add_job(func, 0.02)
+        before = threading.active_count()
+        self.run_loop(self.scheduler, 0.1)
+
+        self.assertLessEqual(len(threads), 2)
+        self.assertLessEqual(threading.active_count(), before + 2)
+
+    def test_coroutine_jobs_run_on_the_loop(self):
+        results = []
+
+        async def func():
+            await asyncio.sleep(0)
+            return threading.current_thread()
+
+        job = self.scheduler.add_job(func, 0.02, sink=results.append)
+        self.run_loop(self.scheduler, 0.05)
+
+        self.assertFalse(job.blocking)
+        self.assertTrue(results)
+        self.assertTrue(all(thread is threading.main_thread() for thread in results))
+
+    def test_job_statistics(self):
+        job = self.scheduler.add_job(lambda: time.sleep(0.01), 0.03)
+        self.run_loop(self.scheduler, 0.1)
+
+        self.assertGreaterEqual(job.ticks, 2)
+        self.assertGreaterEqual(job.last_duration, 0.01)
+        self.assertGreaterEqual(job.mean_duration, 0.01)
+        self.assertGreaterEqual(job.p95_duration, job.mean_duration - 1e-9)
+        self.assertEqual(len(job.durations), job.ticks)
+
+    def test_paused_jobs_skip_ticks(self):
+        job = self.scheduler.add_job(lambda: None, 0.02)
+        self.scheduler.pause(job)
+
+        async def main():
+            self.scheduler.attach()
+            await asyncio.sleep(0.07)
+            paused_ticks = job.ticks
+            self.scheduler.resume(job)
+            await asyncio.sleep(0.05)
+            return paused_ticks
+
+        self.assertEqual(asyncio.run(main()), 0)
+        self.assertGreater(job.ticks, 0)
+        self.assertEqual(job.state, 'running')
+
+    def test_trigger_runs_a_tick_now(self):
+        starts = []
+        job = self.scheduler.add_job(lambda: starts.append(time.monotonic()), 10)
+
+        async def main():
+            self.scheduler.attach()
+            await asyncio.sleep(0.02)
+            triggered = time.monotonic()
+            await asyncio.get_running_loop().run_in_executor(None, job.trigger)
+            await asyncio.sleep(0.05)
+            return triggered
+
+        triggered = asyncio.run(main())
+        self.assertEqual(len(starts), 2)
+        self.assertLess(starts[1] - triggered, 0.04)
+        self.assertEqual(job.overruns, 0)
+
+    def test_find_and_kill(self):
+        killed = []
+        first = self.scheduler.add_job(lambda: None, 1, name='watch counter')
+        second = self.scheduler.add_job(lambda: None, 1, name='watch site-status', on_cancel=killed.append)
+
+        self.assertIs(self.scheduler.find(str(second.id)), second)
+        self.assertIs(self.scheduler.find('watch counter'), first)
+        self.scheduler.cancel(second)
+        self.scheduler.cancel(second)
+        self.assertEqual(killed, [second])
+        self.assertEqual(second.state, 'killed')
+        with self.assertRaises(JobNotFound):
+            self.scheduler.find(str(second.id))
+
+    def test_interval_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            self.scheduler.add_job(lambda: None, 0)
+
+
+class TestJobsCommands(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = create_dispatcher()
+        self.terminal = MagicMock()
+        self.terminal.scheduler = JobScheduler(max_workers=1)
+        self.job = self.terminal.scheduler.add_job(lambda: None, 2, name='watch counter')
+
+    def tearDown(self):
+        self.terminal.scheduler.shutdown()
+
+    def test_list(self):
+        output = self.dispatcher.dispatch('jobs list', self.terminal)
+        self.assertIn('watch counter', output)
+        self.assertIn('running', output)
+        self.assertIn('p95 (ms)', output)
+
+    def test_pause_resume_kill(self):
+        self.assertEqual(self.dispatcher.dispatch(f'jobs pause {self.job.id}', self.terminal),
+                         f"Paused job {self.job.id} (watch counter)")
+        self.assertTrue(self.job.paused)
+        self.dispatcher.dispatch(f'jobs resume {self.job.id}', self.terminal)
+        self.assertFalse(self.job.paused)
+        self.dispatcher.dispatch(f'jobs kill {self.job.id}', self.terminal)
+        self.assertTrue(self.job.cancelled)
+        self.assertEqual(self.dispatcher.dispatch('jobs list', self.terminal), "No jobs")
+
+    def test_errors(self):
+        self.assertEqual(self.dispatcher.dispatch('jobs kill', self.terminal), "Usage: jobs kill <id>")
+        self.assertEqual(self.dispatcher.dispatch('jobs kill 99', self.terminal), "No such job: 99")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import csv
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from main import create_dispatcher
+from src.charging_stations_status import StatusChangeLog
+from src.redis_handler import ValueCache
+from src.site_snapshot import KEY_CHARGING_STATIONS, KEY_SITE_STATUS
+
+SITE_STATUS = {"status": "active", "error": None, "datetime": "2023-01-01T00:00:00Z", "charging_stations": [],
+               "evs": [], "offline_chargers": []}
+
+
+def chargers(status):
+    return json.dumps({'chargers': [{'id': 'C1', 'connectors': [{'id': 1, 'status': status}]}]}).encode()
+
+
+class TestShowSiteStatus(unittest.TestCase):
+    def setUp(self):
+        self.cache = ValueCache()
+        self.redis_handler = MagicMock()
+        self.redis_handler.cache = self.cache
+        self.redis_handler.get_many_cached.side_effect = lambda keys: [
+            self.cache.get(key) or self.cache.put(key, self.values[key]) for key in keys]
+        self.values = {KEY_SITE_STATUS: json.dumps(SITE_STATUS).encode(), KEY_CHARGING_STATIONS: chargers('Available')}
+
+        node, _ = create_dispatcher().registry.resolve(['show', 'site-status'])
+        command_class = node.load()
+        with patch.object(sys.modules[command_class.__module__], 'get_redis_handler', return_value=self.redis_handler):
+            self.command = command_class(['show', 'site-status'], MagicMock())
+        self.command.dnsmasq_leases = MagicMock()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.csv_path = os.path.join(directory.name, 'status_changes.csv')
+        patcher = patch('src.charging_stations_status.STATUS_CHANGE_LOG', StatusChangeLog(self.csv_path))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def rows(self):
+        if not os.path.exists(self.csv_path):
+            return []
+        with open(self.csv_path, newline='') as csv_file:
+            return [row[1:] for row in csv.reader(csv_file)]
+
+    def test_show_appends_status_changes(self):
+        self.command.execute()
+        self.assertEqual(self.rows(), [])
+
+        self.values[KEY_CHARGING_STATIONS] = chargers('Charging')
+        self.cache.invalidate([KEY_CHARGING_STATIONS])
+        self.command.execute()
+        self.assertEqual(self.rows(), [['C1', 'Charging']])
+
+        # Shown again unchanged: nothing more to log
+        self.command.execute()
+        self.assertEqual(len(self.rows()), 1)
+
+    def test_first_logged_show_compares_with_the_replaced_value(self):
+        self.command.execute()
+        self.values[KEY_CHARGING_STATIONS] = chargers('Faulted')
+        self.cache.invalidate([KEY_CHARGING_STATIONS])
+
+        # Nothing logged yet, as in a fresh `exec`: the model the cache replaced is the baseline
+        with patch('src.charging_stations_status.STATUS_CHANGE_LOG', StatusChangeLog(self.csv_path)):
+            self.command.execute()
+        self.assertEqual(self.rows(), [['C1', 'Faulted']])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import MagicMock, patch
+
+import redis
+
+from src import json_backend
+from src.redis_handler import ValueCache
+from src.site_snapshot import KEY_CHARGING_STATIONS, KEY_SITE_STATUS, _load_json_file, load_site_snapshot
+
+SITE_STATUS = {"status": "active", "error": None, "datetime": "2023-01-01T00:00:00Z", "charging_stations": [],
+               "evs": [], "offline_chargers": []}
+
+
+class TestSiteSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.cache = ValueCache()
+        self.redis_handler = MagicMock()
+        self.redis_handler.cache = self.cache
+        self.redis_handler.get_many_cached.side_effect = lambda keys: [
+            self.cache.get(key) or self.cache.put(key, self.values[key]) for key in keys]
+        self.values = {KEY_SITE_STATUS: json.dumps(SITE_STATUS).encode(), KEY_CHARGING_STATIONS: b'{"chargers": []}'}
+
+    def test_snapshot_fetches_all_keys_in_one_call(self):
+        dnsmasq_leases = MagicMock()
+
+        snapshot = load_site_snapshot(self.redis_handler, dnsmasq_leases)
+
+        self.redis_handler.get_many_cached.assert_called_once_with([KEY_SITE_STATUS, KEY_CHARGING_STATIONS])
+        self.redis_handler.track.assert_called_once_with([KEY_SITE_STATUS, KEY_CHARGING_STATIONS])
+        self.assertEqual(snapshot.site_status_json, SITE_STATUS)
+        dnsmasq_leases.read_leases.assert_called_once()
+
+    def test_models_are_shared_until_the_value_changes(self):
+        first = load_site_snapshot(self.redis_handler, MagicMock())
+        second = load_site_snapshot(self.redis_handler, MagicMock())
+        self.assertIs(first.site_status, second.site_status)
+        self.assertIs(first.charging_stations_status, second.charging_stations_status)
+
+        # Refetched but unchanged: still shared
+        self.cache.invalidate()
+        third = load_site_snapshot(self.redis_handler, MagicMock())
+        self.assertIs(third.site_status, first.site_status)
+
+        self.values[KEY_CHARGING_STATIONS] = b'{"chargers": [{"id": "C1"}]}'
+        self.cache.invalidate([KEY_CHARGING_STATIONS])
+        fourth = load_site_snapshot(self.redis_handler, MagicMock())
+        self.assertIs(fourth.site_status, first.site_status)
+        self.assertEqual([c.id for c in fourth.charging_stations_status.chargers], ['C1'])
+
+    def test_changed_value_reuses_unchanged_chargers(self):
+        for backend in json_backend.BACKENDS:
+            with self.subTest(backend=backend):
+                previous = json_backend.set_backend(backend)
+                try:
+                    self.check_unchanged_chargers_are_reused()
+                finally:
+                    json_backend.set_backend(previous.name)
+
+    def check_unchanged_chargers_are_reused(self):
+        self.cache.clear()
+        self.values[KEY_CHARGING_STATIONS] = b'{"chargers": [{"id": "C1", "status": "A"}, {"id": "C2", "status": "A"}]}'
+        first = load_site_snapshot(self.redis_handler, MagicMock()).charging_stations_status
+
+        self.values[KEY_CHARGING_STATIONS] = b'{"chargers": [{"id": "C1", "status": "A"}, {"id": "C2", "status": "B"}]}'
+        self.cache.invalidate([KEY_CHARGING_STATIONS])
+        second = load_site_snapshot(self.redis_handler, MagicMock()).charging_stations_status
+
+        self.assertIsNot(second, first)
+        self.assertIs(second.chargers[0], first.chargers[0])
+        self.assertEqual(second.chargers[1].status, 'B')
+
+    def test_invalid_value_falls_back_to_file(self):
+        self.values[KEY_SITE_STATUS] = b'not json'
+        with patch('src.site_snapshot._load_json_file', return_value=SITE_STATUS) as load_file:
+            snapshot = load_site_snapshot(self.redis_handler, MagicMock())
+
+        load_file.assert_called_once_with('site_status.json')
+        self.assertEqual(snapshot.site_status_json, SITE_STATUS)
+
+    def test_redis_error_falls_back_to_files(self):
+        self.redis_handler.get_many_cached.side_effect = redis.ConnectionError("refused")
+        with patch('src.site_snapshot._load_json_file', side_effect=[SITE_STATUS, None]) as load_file:
+            snapshot = load_site_snapshot(self.redis_handler, MagicMock())
+
+        self.assertEqual(load_file.call_count, 2)
+        self.assertEqual(snapshot.charging_stations_status.chargers, [])
+
+    def test_file_errors_are_logged_not_printed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            invalid = os.path.join(directory, 'charging_stations_status.json')
+            with open(invalid, 'wb') as f:
+                f.write(b'not json')
+            # Headless JSON output goes to stdout
+            with redirect_stdout(io.StringIO()) as stdout, self.assertLogs(level='WARNING') as logs:
+                self.assertIsNone(_load_json_file(os.path.join(directory, 'site_status.json')))
+                self.assertIsNone(_load_json_file(invalid))
+
+        self.assertEqual(stdout.getvalue(), '')
+        self.assertEqual(len(logs.records), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,7 @@ from tabulate import tabulate
 # Correct import paths
 from src.charging_stations_status import ChargingStationsStatus
 from src.dnsmasq_leases import DnsmasqLeases
-from src.site_status import SiteStatus
+from src.site_status import EV, SiteStatus
 
 class TestSiteStatus(unittest.TestCase):
     def test_display(self):
@@ -61,5 +61,13 @@ class TestSiteStatus(unittest.TestCase):
         # Asserting the outputs
         self.assertEqual(actual_output, expected_output_str)
 
+    def test_ev_extra_keys(self):
+        ev = EV(id=1, status='Charging', charger_id=2, soc=80)
+        self.assertEqual((ev.id, ev.status, ev.charger_id, ev.soc), (1, 'Charging', 2, 80))
+        self.assertIsNone(ev.start_charging_time)
+        self.assertFalse(hasattr(ev, '__dict__'))
+        with self.assertRaises(AttributeError):
+            ev.missing
+
 if __name__ == '__main__':
     unittest.main()
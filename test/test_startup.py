@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+from main import STARTUP_STATEMENT
+from src.import_profile import parse_importtime, profile_imports, format_report
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Wall-clock budget for reaching the interactive prompt, interpreter start included.
+STARTUP_BUDGET_SECONDS = 1.0
+
+# Modules that must only be imported by the command that needs them.
+HEAVY_MODULES = ('redis', 'tabulate', 'scapy')
+
+
+class TestStartup(unittest.TestCase):
+    def test_parse_importtime(self):
+        records = parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _io\n"
+            "import time:      3466 |     161673 | prompt_toolkit\n"
+        )
+        self.assertEqual([(r.name, r.self_us, r.cumulative_us, r.depth) for r in records],
+                         [('_io', 120, 120, 1), ('prompt_toolkit', 3466, 161673, 0)])
+        self.assertIn('prompt_toolkit', format_report(records))
+
+    def test_heavy_modules_not_imported_at_startup(self):
+        imported = {record.name.split('.')[0] for record in profile_imports(STARTUP_STATEMENT, cwd=REPO_DIR)}
+        self.assertIn('prompt_toolkit', imported)
+        for name in HEAVY_MODULES:
+            self.assertNotIn(name, imported)
+
+    def test_startup_within_budget(self):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', STARTUP_STATEMENT], cwd=REPO_DIR, check=True,
+                       stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, STARTUP_BUDGET_SECONDS,
+                        f"startup took {elapsed:.3f}s, budget is {STARTUP_BUDGET_SECONDS}s")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import contextlib
+import threading
+import unittest
+
+from prompt_toolkit.application import create_app_session
+from prompt_toolkit.input import create_pipe_input
+from prompt_toolkit.output import DummyOutput
+
+from src.command_registry import CommandRegistry
+from src.terminal_screen import TerminalScreen
+
+COMMANDS_DIR = './commands'
+
+
+class TestTerminalScreen(unittest.TestCase):
+    def setUp(self):
+        self.stack = contextlib.ExitStack()
+        pipe_input = self.stack.enter_context(create_pipe_input())
+        self.stack.enter_context(create_app_session(input=pipe_input, output=DummyOutput()))
+        self.terminal = TerminalScreen(COMMANDS_DIR, CommandRegistry(COMMANDS_DIR), max_refresh_rate=20)
+
+    def tearDown(self):
+        self.stack.close()
+
+    def run_app(self, coroutine_func):
+        async def main():
+            task = asyncio.ensure_future(self.terminal.application.run_async())
+            await asyncio.sleep(0.05)
+            try:
+                await coroutine_func()
+            finally:
+                self.terminal.application.exit()
+                await task
+        asyncio.run(main())
+
+    def test_display_before_run_appends_immediately(self):
+        self.terminal.display("hello")
+        self.terminal.display(None)
+        self.assertEqual(self.terminal.output_buffer[-1], "hello")
+
+    def test_background_output_is_coalesced_per_frame(self):
+        drains = []
+        drain = self.terminal._drain_display_queue
+
+        def counting_drain():
+            drains.append(threading.current_thread())
+            drain()
+
+        self.terminal._drain_display_queue = counting_drain
+
+        def worker(n):
+            for i in range(200):
+                self.terminal.display(f"{n}:{i}")
+
+        async def scenario():
+            threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            await asyncio.sleep(0.2)
+
+        self.run_app(scenario)
+
+        lines = [self.terminal.output_buffer[i] for i in range(len(self.terminal.output_buffer))]
+        self.assertEqual(len([line for line in lines if ':' in line]), 8 * 200)
+        self.assertLess(len(drains), 20)
+        self.assertTrue(all(thread is threading.main_thread() for thread in drains))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from src import timestamps
+
+
+class TestTimestamps(unittest.TestCase):
+    def setUp(self):
+        timestamps.cache_clear()
+
+    def test_format_iso(self):
+        self.assertEqual(timestamps.format_iso('2024-05-28T12:00:00.000+0000'), '240528_1200')
+        self.assertEqual(timestamps.format_iso('2024-05-28T12:34:56.123456+02:00'), '240528_1234')
+        self.assertEqual(timestamps.format_iso('2024-05-28T12:00:00Z'), '240528_1200')
+        with self.assertRaises(ValueError):
+            timestamps.format_iso('yesterday')
+        with self.assertRaises(TypeError):
+            timestamps.format_iso(None)
+
+    def test_format_iso_without_extended_fromisoformat(self):
+        class StrictDatetime(datetime):
+            # Python < 3.11 only parses the formats datetime.isoformat() emits
+            @classmethod
+            def fromisoformat(cls, timestamp):
+                raise ValueError(f"Invalid isoformat string: {timestamp!r}")
+
+        with patch.object(timestamps, 'datetime', StrictDatetime):
+            self.assertEqual(timestamps.format_iso('2024-05-28T12:00:00.000+0000'), '240528_1200')
+            with self.assertRaises(ValueError):
+                timestamps.format_iso('yesterday')
+
+    def test_format_epoch(self):
+        expected = datetime.fromtimestamp(1716897600).strftime('%y%m%d_%H%M')
+        self.assertEqual(timestamps.format_epoch('1716897600'), expected)
+        self.assertEqual(timestamps.format_epoch(1716897600), expected)
+
+    def test_memoized(self):
+        for _ in range(3):
+            timestamps.format_iso('2024-05-28T12:00:00.000+0000')
+        info = timestamps.format_iso.cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 1))
+        self.assertEqual(info.maxsize, timestamps.CACHE_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+from unittest.mock import Mock
+
+from src.watch_pane import TableSection, WatchPane
+from src.site_status import SiteStatus
+from src.charging_stations_status import ChargingStationsStatus
+
+
+def section(rows):
+    return TableSection("Connections", ["Chg ID", "Conn ID", "Status"], rows, key_columns=2)
+
+
+class TestWatchPane(unittest.TestCase):
+    def setUp(self):
+        self.changes = []
+        self.pane = WatchPane('test', on_change=self.changes.append)
+        self.rows = [["A", 1, "Available"], ["A", 2, "Charging"], ["B", 1, "Faulted"]]
+        self.pane.update([section(self.rows)])
+
+    def changed_cells(self):
+        return [text.strip() for style, text in self.pane.fragments if style == WatchPane.changed_style]
+
+    def test_first_update_renders_table_without_highlight(self):
+        self.assertEqual(self.pane.rendered_rows, 3)
+        self.assertEqual(self.changes, [self.pane])
+        self.assertIn("| A      | 2       | Charging  |", self.pane.text)
+        self.assertEqual(self.changed_cells(), [])
+
+    def test_unchanged_update_renders_nothing(self):
+        self.assertFalse(self.pane.update([section([list(row) for row in self.rows])]))
+        self.assertEqual(self.pane.rendered_rows, 0)
+        self.assertEqual(len(self.changes), 1)
+
+    def test_only_changed_rows_rerendered_and_highlighted(self):
+        rows = [list(row) for row in self.rows]
+        rows[1][2] = "Finishing"
+        self.assertTrue(self.pane.update([section(rows)]))
+        self.assertEqual(self.pane.rendered_rows, 1)
+        self.assertEqual(self.changed_cells(), ["Finishing"])
+
+        # The highlight is cleared on the next update
+        self.assertTrue(self.pane.update([section(rows)]))
+        self.assertEqual(self.pane.rendered_rows, 1)
+        self.assertEqual(self.changed_cells(), [])
+
+    def test_added_row_is_highlighted(self):
+        rows = self.rows + [["C", 1, "Available"]]
+        self.pane.update([section(rows)])
+        self.assertEqual(self.changed_cells(), ["C", "1", "Available"])
+        self.assertIn("| C      | 1       | Available |", self.pane.text)
+
+    def test_wider_cell_rerenders_layout(self):
+        rows = [list(row) for row in self.rows]
+        rows[0][2] = "SuspendedEVSE"
+        self.pane.update([section(rows)])
+        self.assertEqual(self.pane.rendered_rows, 3)
+        self.assertEqual(self.changed_cells(), ["SuspendedEVSE"])
+
+    def test_title_change_keeps_rows(self):
+        self.assertTrue(self.pane.update([TableSection("Connections 2", ["Chg ID", "Conn ID", "Status"],
+                                                       self.rows, key_columns=2)]))
+        self.assertEqual(self.pane.rendered_rows, 0)
+        self.assertIn("Connections 2:", self.pane.text)
+
+    def test_site_status_sections(self):
+        site_status = SiteStatus(
+            charging_stations=[{'id': 'A'}], datetime_str='2024-05-28 12:00:00',
+            evs=[{'id': 1, 'charger_id': 'A', 'status': 'Charging', 'start_charging_time': None}],
+            offline_chargers=[])
+        charging_stations_status = ChargingStationsStatus.from_json(
+            {'chargers': [{'id': 'A', 'ip_address': '10.0.0.1', 'connectors': [{'id': 1, 'status': 'Charging'}]}]})
+        leases = Mock()
+        leases.get_mac_from_ip.return_value = 'aa:bb'
+        leases.get_lease_time_from_ip.return_value = '240528_1200'
+
+        chargers, connections, evs = site_status.sections(leases, charging_stations_status)
+
+        self.assertEqual(chargers.rows, [('A', 'Online', '10.0.0.1', 'aa:bb', '240528_1200')])
+        self.assertEqual(connections.rows, [['A', 1, '', 'UNKNOWN', '', 'Charging', '10.0.0.1']])
+        self.assertEqual(evs.rows, [[1, 'A', 'Charging', None, None, None, None, 'UNKNOWN']])
+        self.pane.update([chargers, connections, evs], site_status.status_line())
+        self.assertIn("Electric Vehicles:", self.pane.text)
+        self.assertTrue(self.pane.text.startswith("DateTime: 2024-05-28 12:00:00\n"))
+
+    def test_status_line_is_not_diffed(self):
+        self.pane.update([section(self.rows)], "DateTime: 2024-05-28 12:00:00")
+        self.assertTrue(self.pane.update([section(self.rows)], "DateTime: 2024-05-28 12:00:02"))
+        self.assertEqual(self.pane.rendered_rows, 0)
+        self.assertEqual(self.changed_cells(), [])
+        self.assertEqual(self.pane.text.splitlines()[:2], ["DateTime: 2024-05-28 12:00:02", "Connections:"])
+        self.assertFalse(self.pane.update([section(self.rows)], "DateTime: 2024-05-28 12:00:02"))
+
+
+if __name__ == '__main__':
+    unittest.main()
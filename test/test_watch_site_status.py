@@ -0,0 +1,109 @@
+import asyncio
+import functools
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import fakeredis
+import redis
+
+from main import create_dispatcher
+from src.key_watcher import KeyWatcher
+from src.redis_handler import close_redis_handlers
+from src.site_snapshot import KEY_CHARGING_STATIONS
+from src.scheduler import JobScheduler
+
+
+class TestWatchSiteStatus(unittest.TestCase):
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        pool = functools.partial(redis.ConnectionPool, connection_class=fakeredis.FakeRedisConnection, server=server)
+        patcher = patch('src.redis_handler.redis.ConnectionPool', side_effect=pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(close_redis_handlers)
+        node, _ = create_dispatcher().registry.resolve(['watch', 'site-status'])
+        self.terminal = MagicMock()
+        self.terminal.scheduler = JobScheduler(max_workers=1)
+        self.addCleanup(self.terminal.scheduler.shutdown)
+        self.job = self.terminal.scheduler.add_job(lambda: None, 2, name='watch site-status')
+        self.terminal.start_interval_process.return_value = self.job
+        with patch('src.dnsmasq_leases.DnsmasqLeases.watch'):
+            self.command = node.load()(['watch', 'site-status'], self.terminal)
+
+    def test_panes_share_the_tracking_subscription(self):
+        triggered = threading.Event()
+        handler = self.command.redis_handler
+        other = type(self.command)(['watch', 'site-status'], self.terminal)
+        # execute() runs on the event loop: it must not wait on Redis
+        with patch.object(type(handler), 'redis_client', new_callable=PropertyMock, side_effect=AssertionError), \
+                patch('src.dnsmasq_leases.DnsmasqLeases.watch'):
+            self.assertIn('keyspace notifications', self.command.execute())
+            other.execute()
+        self.addCleanup(other.stop)
+        self.addCleanup(self.command.stop)
+
+        with patch.object(KeyWatcher, 'notifications_enabled', return_value=True):
+            self.assertTrue(handler.track(self.command.keys))
+        with patch.object(self.terminal.scheduler, 'trigger', side_effect=lambda job: triggered.set()) as trigger:
+            handler.set_value(KEY_CHARGING_STATIONS, '{"chargers": []}')
+            self.assertTrue(triggered.wait(2))
+            time.sleep(0.1)
+        self.assertEqual(len(handler._watchers), 1)
+        self.assertEqual(trigger.call_count, 2)  # Once per pane
+
+    def test_polls_again_when_notifications_are_lost(self):
+        pubsub = MagicMock()
+        pubsub.get_message.side_effect = redis.ConnectionError('lost')
+        stopped = threading.Event()
+        with patch('src.dnsmasq_leases.DnsmasqLeases.watch'):
+            self.command.execute()
+        self.addCleanup(self.command.stop)
+        self.job.interval = self.command.resync_interval
+        with patch.object(KeyWatcher, 'notifications_enabled', return_value=True), \
+                patch.object(self.command.redis_handler, 'pubsub', return_value=pubsub), \
+                patch.object(self.terminal.scheduler, 'trigger', side_effect=lambda job: stopped.set()), \
+                self.assertLogs(level='ERROR'):
+            self.command.redis_handler.track(self.command.keys)
+            self.assertTrue(stopped.wait(2))
+        self.assertEqual(self.job.interval, self.command.poll_interval)
+
+    def test_refresh_renders_off_the_loop(self):
+        threads = {}
+        self.command.pane = MagicMock()
+        self.command.pane.update.side_effect = lambda *args: threads.setdefault('update', threading.current_thread())
+
+        def render(snapshot):
+            threads['render'] = threading.current_thread()
+            return [], ''
+
+        async def main():
+            threads['loop'] = threading.current_thread()
+            with patch.object(self.command, 'render', side_effect=render), \
+                    patch.object(sys.modules[type(self.command).__module__], 'load_site_snapshot_async',
+                                 return_value=MagicMock()):
+                await self.command.refresh()
+
+        self.command.job = self.job
+        with patch.object(self.command.redis_handler, 'tracked', return_value=True):
+            asyncio.run(main())
+        self.assertIsNot(threads['render'], threads['loop'])
+        self.assertIs(threads['update'], threads['loop'])
+        self.assertEqual(self.job.interval, self.command.resync_interval)
+
+    def test_stop_joins_watchers_off_the_caller_thread(self):
+        handler = self.command.redis_handler
+        self.command.key_listener = handler.watch(self.command.keys, self.job.trigger)
+        self.command.lease_listener = MagicMock()
+        joined = threading.Event()
+        caller = threading.current_thread()
+        with patch.object(self.command.dnsmasq_leases, 'unwatch',
+                          side_effect=lambda listener: threading.current_thread() is not caller and joined.set()):
+            self.command.stop(self.job)
+            self.assertTrue(joined.wait(2))
+        self.assertEqual(handler._listeners, [])
+
+if __name__ == '__main__':
+    unittest.main()